@@ -15,17 +15,230 @@ bl_info = {
 
 import bpy
 import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import subprocess
+import threading
+import queue
+import struct
+import concurrent.futures
+import array
+import hashlib
+import fnmatch
+import glob
 import traceback
+import contextlib
 import re # Import regular expressions module for LOD matching
+import numpy as np # Bundled with Blender; used for bulk foreach_get reads
 # Ensure all necessary prop types are imported
-from bpy.props import StringProperty, BoolProperty, PointerProperty, CollectionProperty, EnumProperty, IntProperty
+from bpy.props import StringProperty, BoolProperty, PointerProperty, CollectionProperty, EnumProperty, IntProperty, FloatProperty
 from bpy.types import PropertyGroup, Operator, Panel, UIList # Import necessary types
+from bpy.app.handlers import persistent
+
+# --- Export Settings ---
+def fbx_export_settings(scene):
+    """Return the FBX operator settings shared by every export, read from the scene."""
+    return {
+        "use_active_collection": False,
+        "use_mesh_modifiers": scene.use_mesh_modifiers,
+        "mesh_smooth_type": scene.mesh_smooth_type,
+        "use_mesh_edges": scene.use_mesh_edges,
+        "use_tspace": scene.use_tspace,
+        "bake_anim_use_nla_strips": False,
+        "bake_anim_use_all_bones": True,
+        "bake_anim_force_startend_keying": True,
+        "bake_anim_step": 1.0,
+        "bake_anim_simplify_factor": 0.0,
+        "add_leaf_bones": False,
+        "primary_bone_axis": 'Y',
+        "secondary_bone_axis": 'X',
+        "axis_forward": scene.fbx_axis_forward,
+        "axis_up": scene.fbx_axis_up,
+        "bake_space_transform": True,
+        "use_subsurf": False,
+        "use_armature_deform_only": scene.use_armature_deform_only,
+        "path_mode": 'RELATIVE' if scene.texture_mode == 'STORE' else 'COPY', # Store mode references the shared copies
+        "embed_textures": scene.embed_textures and scene.texture_mode != 'STORE',
+        "batch_mode": 'OFF',
+        "use_batch_own_dir": False,
+        "use_metadata": True,
+        "global_scale": 1.0,
+        "apply_unit_scale": True,
+        "apply_scale_options": 'FBX_SCALE_NONE',
+    }
+
+
+# --- Batch Export Session ---
+# Every frame_set(), unit/pose toggle and selection change forces a depsgraph evaluation of the
+# whole rig. A session enters the export state once for a batch: export_fbx() and the fast writer
+# then skip their per-file save/restore, and only the transitions between character (rest pose at
+# the origin) and animation (posed) exports touch the scene. Everything is restored once at the end.
+active_export_session = None # ExportSession of the running batch, consulted by export_fbx()
+
+def set_if_changed(owner, attribute, value):
+    """Assign an RNA property only when it differs, since every assignment tags a depsgraph update."""
+    if getattr(owner, attribute) != value: setattr(owner, attribute, value)
+
+def select_only(context, objects, active):
+    """Select exactly these objects; skipped when already the case."""
+    if set(context.selected_objects) == set(objects) and context.view_layer.objects.active == active: return
+    bpy.ops.object.select_all(action='DESELECT')
+    for obj in objects: obj.select_set(True)
+    context.view_layer.objects.active = active
+
+class ExportSession:
+    """Scene state shared by all exports of one batch, entered once and restored once."""
+    def __init__(self, context, armature):
+        scene = context.scene
+        self.scene = scene; self.armature = armature; self.mode = None
+        self.unit_system = scene.unit_settings.system; self.scale_length = scene.unit_settings.scale_length
+        self.frame = scene.frame_current; self.frame_range = (scene.frame_start, scene.frame_end)
+        self.transform = None; self.pose_position = None
+        self.staging = None # StagingPipeline when files are written locally and copied out in the background
+        self.proxy = None # DeformProxy the FBX operator bakes instead of the control rig
+        if armature:
+            self.transform = (armature.location.copy(), armature.rotation_euler.copy(), armature.scale.copy())
+            self.pose_position = armature.data.pose_position
+
+    def begin(self):
+        global active_export_session
+        set_if_changed(self.scene.unit_settings, "system", 'METRIC')
+        active_export_session = self
+        return self
+
+    def prepare(self, bake_anim):
+        """Switch between the character (rest pose at origin, frame 0) and animation (posed) export states."""
+        armature = self.armature; scene = self.scene
+        if not bake_anim:
+            if armature and self.mode != 'CHARACTER':
+                if tuple(armature.location) != (0.0, 0.0, 0.0): armature.location = (0, 0, 0)
+                if tuple(armature.rotation_euler) != (0.0, 0.0, 0.0): armature.rotation_euler = (0, 0, 0)
+            if armature: set_if_changed(armature.data, "pose_position", 'REST')
+            if scene.frame_current != 0: scene.frame_set(0)
+            self.mode = 'CHARACTER'
+        else:
+            if armature and self.mode == 'CHARACTER': self.restore_transform()
+            if armature: set_if_changed(armature.data, "pose_position", 'POSE')
+            self.mode = 'ANIMATION'
+
+    def restore_transform(self):
+        location, rotation, scale = self.transform
+        if self.armature.location != location: self.armature.location = location
+        if self.armature.rotation_euler != rotation: self.armature.rotation_euler = rotation
+        if self.armature.scale != scale: self.armature.scale = scale
+
+    def end(self):
+        global active_export_session
+        active_export_session = None
+        scene = self.scene
+        set_if_changed(scene.unit_settings, "system", self.unit_system)
+        set_if_changed(scene.unit_settings, "scale_length", self.scale_length)
+        if (scene.frame_start, scene.frame_end) != self.frame_range: scene.frame_start, scene.frame_end = self.frame_range
+        if self.armature:
+            try:
+                if self.mode == 'CHARACTER': self.restore_transform()
+                set_if_changed(self.armature.data, "pose_position", self.pose_position)
+            except ReferenceError: pass
+        scene.frame_set(self.frame) # One evaluation to bring the scene back to its original pose
+
+    def __enter__(self): return self.begin()
+    def __exit__(self, exc_type, exc_value, exc_traceback): self.end(); return False
+
+class DepsgraphCounter:
+    """Count depsgraph evaluations (update and frame change handler calls) while active."""
+    def __init__(self): self.updates = 0; self.frame_changes = 0
+
+    def on_update(self, scene, depsgraph=None): self.updates += 1
+    def on_frame_change(self, scene, depsgraph=None): self.frame_changes += 1
+
+    @property
+    def evaluations(self): return self.updates + self.frame_changes
+
+    def begin(self):
+        bpy.app.handlers.depsgraph_update_post.append(self.on_update)
+        bpy.app.handlers.frame_change_post.append(self.on_frame_change)
+        return self
+
+    def end(self):
+        for handlers, callback in ((bpy.app.handlers.depsgraph_update_post, self.on_update), (bpy.app.handlers.frame_change_post, self.on_frame_change)):
+            if callback in handlers: handlers.remove(callback)
+
+    def __enter__(self): return self.begin()
+    def __exit__(self, exc_type, exc_value, exc_traceback): self.end(); return False
+
+
+# --- Phase Timing ---
+# Hot-path phases (selection, scene preparation, the FBX operator, sampling, writing, restores)
+# are added up in the "phases" dict of the job being exported, so the run log shows where the
+# time of a slow asset went rather than only its total.
+current_phases = None # Phase name -> seconds of the job being exported
+
+@contextlib.contextmanager
+def timed(phase, phases=None):
+    """Add the duration of the block to phases (default: the current job's phases)."""
+    phases = current_phases if phases is None else phases
+    if phases is None: yield; return
+    start_time = time.perf_counter()
+    try: yield
+    finally: phases[phase] = phases.get(phase, 0.0) + time.perf_counter() - start_time
+
+@contextlib.contextmanager
+def timing_into(phases):
+    """Make phases the target of timed() blocks for the duration of one job."""
+    global current_phases
+    previous, current_phases = current_phases, phases
+    try: yield phases
+    finally: current_phases = previous
+
+def windows_memory_counters():
+    """PROCESS_MEMORY_COUNTERS of this process on Windows, else None."""
+    try:
+        import ctypes
+        from ctypes import wintypes
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD), ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t), ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaNonPagedPoolUsage", ctypes.c_size_t), ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+        counters = ProcessMemoryCounters(); counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb): return counters
+    except (ImportError, AttributeError, OSError): pass
+    return None
+
+def peak_rss_bytes():
+    """Peak resident set size of this process so far, or 0 when the platform doesn't tell."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024 # Bytes on macOS, KiB elsewhere
+    except ImportError: pass
+    counters = windows_memory_counters()
+    return counters.PeakWorkingSetSize if counters else 0
+
+def current_rss_bytes():
+    """Resident set size of this process right now (the peak where there is no cheap way to read it)."""
+    try:
+        with open("/proc/self/statm", 'r') as f: return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError): pass
+    counters = windows_memory_counters()
+    return counters.WorkingSetSize if counters else peak_rss_bytes()
+
 
 # --- Core Export Function (with fixes) ---
-# (No changes in this section)
-def export_fbx(context, filepath, use_selection, bake_anim=False, bake_anim_use_all_actions=False):
+def export_fbx(context, filepath, use_selection, bake_anim=False, bake_anim_use_all_actions=False, bake_anim_use_nla_strips=False):
     """Common FBX export function with Unreal-friendly settings and core fixes."""
     scene = context.scene # Use context passed to function
+    settings = dict(fbx_export_settings(scene), bake_anim_use_nla_strips=bake_anim_use_nla_strips)
+
+    # Inside a batch session the scene state is managed once for the whole batch
+    session = active_export_session
+    if session is not None and session.scene == scene:
+        with timed("prepare"): session.prepare(bake_anim)
+        with timed("fbx_operator"): bpy.ops.export_scene.fbx(filepath=filepath, use_selection=use_selection, bake_anim=bake_anim, bake_anim_use_all_actions=bake_anim_use_all_actions, **settings)
+        return
 
     # Store original unit settings and time
     original_unit_system = scene.unit_settings.system
@@ -51,48 +264,26 @@ def export_fbx(context, filepath, use_selection, bake_anim=False, bake_anim_use_
             armature.data.pose_position = 'REST'
 
     try:
-        scene.unit_settings.system = 'METRIC'
+        with timed("prepare"):
+            scene.unit_settings.system = 'METRIC'
 
-        if not bake_anim:
-            scene.frame_set(0)
-        elif armature:
-            armature.data.pose_position = 'POSE'
+            if not bake_anim:
+                scene.frame_set(0)
+            elif armature:
+                armature.data.pose_position = 'POSE'
 
         # --- Perform FBX Export ---
-        bpy.ops.export_scene.fbx(
-            filepath=filepath,
-            use_selection=use_selection,
-            use_active_collection=False,
-            use_mesh_modifiers=scene.use_mesh_modifiers,
-            mesh_smooth_type=scene.mesh_smooth_type,
-            use_mesh_edges=scene.use_mesh_edges,
-            use_tspace=scene.use_tspace,
-            bake_anim=bake_anim,
-            bake_anim_use_all_actions=bake_anim_use_all_actions,
-            bake_anim_use_nla_strips=False,
-            bake_anim_use_all_bones=True,
-            bake_anim_force_startend_keying=True,
-            bake_anim_step=1.0,
-            bake_anim_simplify_factor=0.0,
-            add_leaf_bones=False,
-            primary_bone_axis='Y',
-            secondary_bone_axis='X',
-            axis_forward=scene.fbx_axis_forward,
-            axis_up=scene.fbx_axis_up,
-            bake_space_transform=True,
-            use_subsurf=False,
-            use_armature_deform_only=scene.use_armature_deform_only,
-            path_mode='COPY',
-            embed_textures=scene.embed_textures,
-            batch_mode='OFF',
-            use_batch_own_dir=False,
-            use_metadata=True,
-            global_scale=1.0,
-            apply_unit_scale=True,
-            apply_scale_options='FBX_SCALE_NONE'
-        )
+        with timed("fbx_operator"):
+            bpy.ops.export_scene.fbx(
+                filepath=filepath,
+                use_selection=use_selection,
+                bake_anim=bake_anim,
+                bake_anim_use_all_actions=bake_anim_use_all_actions,
+                **settings
+            )
     finally:
         # Restore original settings
+        restore_start = time.perf_counter()
         scene.unit_settings.system = original_unit_system
         scene.unit_settings.scale_length = original_scale_length
         scene.frame_set(original_frame)
@@ -103,15 +294,2568 @@ def export_fbx(context, filepath, use_selection, bake_anim=False, bake_anim_use_
              if original_rotation is not None: armature.rotation_euler = original_rotation
              if original_scale is not None: armature.scale = original_scale
              if original_pose_position is not None: armature.data.pose_position = original_pose_position
+        if current_phases is not None: current_phases["restore"] = current_phases.get("restore", 0.0) + time.perf_counter() - restore_start
+
+
+# --- Fast Animation Writer (NumPy + binary FBX) ---
+# Alternative backend for animation-only files. Instead of running bpy.ops.export_scene.fbx,
+# which rebuilds the whole scene graph and every FBX template per action, it reads all pose-bone
+# matrices of a frame with one foreach_get, converts them to local FBX transforms with vectorized
+# NumPy math and writes just the skeleton plus one AnimationStack/Layer/CurveNode/Curve set per take.
+# Binary encoding reuses the encoder shipped with Blender's own FBX add-on.
+try: from io_scene_fbx import encode_bin as fbx_encode_bin
+except ImportError: fbx_encode_bin = None
+
+FBX_VERSION = 7400
+FBX_KTIME = 46186158000 # FBX time ticks per second
+FBX_FILE_ID = b'\x28\xb3\x2a\xeb\xb6\x24\xcc\xc2\xbf\xc8\xb0\x2a\xa9\x2b\xfc\xf1'
+FBX_CREATION_TIME = "1970-01-01 10:00:00:000"
+FBX_KEY_ATTR_FLAGS = (1 << 2 | 1 << 8 | 1 << 13 | 1 << 14) # Linear interpolation, auto tangents
+FBX_KEY_ATTR_DATA = (0.0, 0.0, 9.419963346924634e-30, 0.0)
+AXIS_VECTORS = {'X': (0, 1), 'Y': (1, 1), 'Z': (2, 1), '-X': (0, -1), '-Y': (1, -1), '-Z': (2, -1)}
+
+def fbx_uid(*key):
+    """Stable 63-bit FBX object id derived from a key, so repeated exports are identical."""
+    return np.int64(int.from_bytes(hashlib.sha1("|".join(map(str, key)).encode('utf-8')).digest()[:8], 'little') & 0x7FFFFFFFFFFFFFFF or 1)
+
+def fbx_axis_settings(axis_up, axis_forward):
+    """Return ((up, sign), (front, sign), (coord, sign)) for the FBX GlobalSettings of the target axes."""
+    up_axis, up_sign = AXIS_VECTORS[axis_up]; fwd_axis, fwd_sign = AXIS_VECTORS[axis_forward]
+    up = np.zeros(3); up[up_axis] = up_sign
+    front = np.zeros(3); front[fwd_axis] = -fwd_sign # FBX 'front' points towards the viewer
+    coord = np.cross(up, front); coord_axis = int(np.argmax(np.abs(coord)))
+    return (up_axis, up_sign), (fwd_axis, -fwd_sign), (coord_axis, int(np.sign(coord[coord_axis])))
+
+def fbx_unit_scale(scene, settings):
+    """Factor from Blender units to FBX centimetres (FBX_SCALE_NONE bakes it into the data)."""
+    unit_scale = 100.0 * scene.unit_settings.scale_length if settings["apply_unit_scale"] else 100.0
+    return unit_scale * settings["global_scale"]
+
+def fbx_global_matrix(scene, settings):
+    """Axis conversion and unit scale applied to root objects, as the stock exporter does with bake_space_transform."""
+    from bpy_extras.io_utils import axis_conversion
+    axis = np.array(axis_conversion(to_forward=settings["axis_forward"], to_up=settings["axis_up"]).to_4x4(), dtype=np.float64)
+    return np.diag([fbx_unit_scale(scene, settings)] * 3 + [1.0]) @ axis
+
+def animation_bones(armature, deform_only):
+    """Ordered bone names (parents first) and parent indices (-1 for roots) of the exported skeleton."""
+    bones = armature.data.bones
+    keep = set()
+    for bone in bones:
+        if deform_only and not bone.use_deform: continue
+        while bone and bone.name not in keep: keep.add(bone.name); bone = bone.parent # Keep parents of deform bones
+    names = [bone.name for bone in bones if bone.name in keep] # bpy keeps bones in parent-first order
+    lookup = {name: index for index, name in enumerate(names)}
+    parents = np.array([lookup[bones[name].parent.name] if bones[name].parent else -1 for name in names], dtype=np.int64)
+    return names, parents
+
+def sample_pose_matrices(context, armature, bone_names, frames):
+    """Evaluate each frame once and read all armature-space pose matrices in bulk -> (frames, bones, 4, 4), (frames, 4, 4)."""
+    scene = context.scene
+    pose_bones = armature.pose.bones
+    total = len(pose_bones)
+    index = np.array([pose_bones.find(name) for name in bone_names], dtype=np.int64)
+    buffer = np.empty(total * 16, dtype=np.float32)
+    poses = np.empty((len(frames), len(bone_names), 4, 4), dtype=np.float32)
+    worlds = np.empty((len(frames), 4, 4), dtype=np.float32)
+    for i, frame in enumerate(frames):
+        scene.frame_set(int(frame), subframe=float(frame) - int(frame))
+        pose_bones.foreach_get("matrix", buffer)
+        poses[i] = buffer.reshape(total, 4, 4).transpose(0, 2, 1)[index] # foreach_get is column-major
+        worlds[i] = np.array(armature.matrix_world, dtype=np.float32)
+    return poses, worlds
+
+def local_matrices(matrices, parents):
+    """Convert armature-space matrices (..., bones, 4, 4) to parent-relative ones."""
+    matrices = matrices.astype(np.float64)
+    local = matrices.copy()
+    child = parents >= 0
+    if np.any(child): local[..., child, :, :] = np.linalg.inv(matrices[..., parents[child], :, :]) @ matrices[..., child, :, :]
+    return local
+
+def decompose_matrices(matrices, unwrap=False):
+    """Split (..., 4, 4) matrices into translation, XYZ Euler rotation in degrees and scale."""
+    translation = matrices[..., :3, 3]
+    basis = matrices[..., :3, :3]
+    scale = np.linalg.norm(basis, axis=-2)
+    scale = np.where(np.linalg.det(basis)[..., None] < 0, scale * np.array([-1.0, 1.0, 1.0]), scale)
+    rot = basis / np.where(scale == 0.0, 1.0, scale)[..., None, :]
+    sin_y = np.clip(-rot[..., 2, 0], -1.0, 1.0)
+    cos_y = np.sqrt(1.0 - sin_y * sin_y)
+    gimbal = cos_y < 1e-6
+    x = np.where(gimbal, np.arctan2(-rot[..., 1, 2], rot[..., 1, 1]), np.arctan2(rot[..., 2, 1], rot[..., 2, 2]))
+    z = np.where(gimbal, 0.0, np.arctan2(rot[..., 1, 0], rot[..., 0, 0]))
+    euler = np.stack((x, np.arcsin(sin_y), z), axis=-1)
+    if unwrap: euler = np.unwrap(euler, axis=0) # Keep rotations continuous across frames
+    return translation, np.degrees(euler), scale
+
+def fbx_node(parent, name, *values):
+    """Append a child element with typed values: bool, np.int64, int (int32), float, str, bytes."""
+    elem = fbx_encode_bin.FBXElem(name)
+    for value in values:
+        if isinstance(value, bool): elem.add_bool(value)
+        elif isinstance(value, np.int64): elem.add_int64(int(value))
+        elif isinstance(value, int): elem.add_int32(value)
+        elif isinstance(value, float): elem.add_float64(value)
+        elif isinstance(value, str): elem.add_string_unicode(value)
+        else: elem.add_string(value)
+    parent.elems.append(elem)
+    return elem
+
+def fbx_props(parent, *props):
+    """Append a Properties70 block; each prop is (name, type, label, flags, *values)."""
+    block = fbx_node(parent, b"Properties70")
+    for name, ptype, label, flags, *values in props:
+        prop = fbx_node(block, b"P", name.encode(), ptype.encode(), label.encode(), flags.encode())
+        for value in values:
+            if ptype == "KTime": prop.add_int64(int(value))
+            elif isinstance(value, int) and not isinstance(value, bool) and ptype in ("int", "enum", "bool", "Integer"): prop.add_int32(value)
+            elif isinstance(value, str): prop.add_string_unicode(value)
+            else: prop.add_float64(float(value))
+    return block
+
+def fbx_array(parent, name, typecode, values):
+    """Append a child element holding one typed array (typecode 'i', 'q' or 'f')."""
+    data = array.array(typecode); data.frombytes(np.ascontiguousarray(values, dtype={'i': np.int32, 'q': np.int64, 'f': np.float32}[typecode]).tobytes())
+    elem = fbx_encode_bin.FBXElem(name)
+    {'i': elem.add_int32_array, 'q': elem.add_int64_array, 'f': elem.add_float32_array}[typecode](data)
+    parent.elems.append(elem)
+    return elem
+
+def fbx_lcl_props(translation, rotation, scale):
+    return (("Lcl Translation", "Lcl Translation", "", "A", *map(float, translation)),
+            ("Lcl Rotation", "Lcl Rotation", "", "A", *map(float, rotation)),
+            ("Lcl Scaling", "Lcl Scaling", "", "A", *map(float, scale)))
+
+def write_animation_fbx(filepath, scene, armature, bone_names, parents, rest_local, local, root, frames, take_name, settings, tolerances=None):
+    """Write a skeleton + single-take animation FBX from sampled local transforms.
+
+    rest_local: (bones, 4, 4) rest matrices, local: (frames, bones, 4, 4), root: (frames, 4, 4) armature node matrices.
+    tolerances: optional (translation cm, rotation degrees, scale) for key reduction. Returns the reduction report or None.
+    """
+    return write_animation_takes_fbx(filepath, scene, armature, bone_names, parents, rest_local, [(take_name, local, root, frames, tolerances)], settings)[0]
+
+def write_animation_takes_fbx(filepath, scene, armature, bone_names, parents, rest_local, takes, settings):
+    """Write one skeleton and one AnimationStack per take; takes are (take_name, local, root, frames, tolerances).
+
+    Returns the key reduction report (or None) of every take, in order.
+    """
+    fps = scene.render.fps / scene.render.fps_base
+    (up_axis, up_sign), (front_axis, front_sign), (coord_axis, coord_sign) = fbx_axis_settings(settings["axis_up"], settings["axis_forward"])
+    armature_id = fbx_uid(armature.name, "Model")
+    bone_ids = [fbx_uid(armature.name, name, "Model") for name in bone_names]
+    connections = [(b"OO", armature_id, np.int64(0), None)]
+
+    # Transforms: static rest values on the models, baked values on the curves of each take
+    rest_t, rest_r, rest_s = decompose_matrices(rest_local)
+    prepared = []
+    for take_name, local, root, frames, tolerances in takes:
+        key_times = np.round(np.asarray(frames, dtype=np.float64) / fps * FBX_KTIME).astype(np.int64)
+        anim_t, anim_r, anim_s = decompose_matrices(local, unwrap=True)
+        root_t, root_r, root_s = decompose_matrices(root, unwrap=True)
+        root_animated = bool(np.ptp(root, axis=0).max() > 1e-6) if len(root) > 1 else False
+        curve_channels = [(bone_ids[i], (anim_t[:, i], anim_r[:, i], anim_s[:, i])) for i in range(len(bone_names))]
+        if root_animated: curve_channels.insert(0, (armature_id, (root_t, root_r, root_s)))
+        keep_masks, report = {}, None
+        if tolerances is not None:
+            keep_masks, report = reduce_curve_channels(curve_channels, armature_id, tolerances, fbx_unit_scale(scene, settings))
+        prepared.append((take_name, key_times, (root_t[0], root_r[0], root_s[0]), curve_channels, keep_masks, report))
+    curve_node_count = sum(len(curve_channels) * 3 for _, _, _, curve_channels, _, _ in prepared)
+    time_start = min(key_times[0] for _, key_times, *_ in prepared); time_stop = max(key_times[-1] for _, key_times, *_ in prepared)
+    elem_root = fbx_encode_bin.FBXElem(b"")
+
+    # Header
+    header = fbx_node(elem_root, b"FBXHeaderExtension")
+    fbx_node(header, b"FBXHeaderVersion", 1003); fbx_node(header, b"FBXVersion", FBX_VERSION); fbx_node(header, b"EncryptionType", 0)
+    fbx_node(header, b"Creator", "Batch FBX Exporter fast animation writer")
+    fbx_node(elem_root, b"FileId", FBX_FILE_ID)
+    fbx_node(elem_root, b"CreationTime", FBX_CREATION_TIME)
+    fbx_node(elem_root, b"Creator", f"Blender {bpy.app.version_string} - Batch FBX Exporter")
+    global_settings = fbx_node(elem_root, b"GlobalSettings"); fbx_node(global_settings, b"Version", 1000)
+    fbx_props(global_settings,
+              ("UpAxis", "int", "Integer", "", up_axis), ("UpAxisSign", "int", "Integer", "", up_sign),
+              ("FrontAxis", "int", "Integer", "", front_axis), ("FrontAxisSign", "int", "Integer", "", front_sign),
+              ("CoordAxis", "int", "Integer", "", coord_axis), ("CoordAxisSign", "int", "Integer", "", coord_sign),
+              ("OriginalUpAxis", "int", "Integer", "", 2), ("OriginalUpAxisSign", "int", "Integer", "", 1),
+              ("UnitScaleFactor", "double", "Number", "", 1.0), ("OriginalUnitScaleFactor", "double", "Number", "", 1.0),
+              ("TimeMode", "enum", "", "", 14), ("CustomFrameRate", "double", "Number", "", fps),
+              ("TimeSpanStart", "KTime", "Time", "", time_start), ("TimeSpanStop", "KTime", "Time", "", time_stop))
+    fbx_node(elem_root, b"Documents"); fbx_node(elem_root, b"References")
+
+    definitions = fbx_node(elem_root, b"Definitions"); fbx_node(definitions, b"Version", 100)
+    type_counts = ((b"GlobalSettings", 1), (b"Model", len(bone_names) + 1), (b"NodeAttribute", len(bone_names)),
+                   (b"AnimationStack", len(prepared)), (b"AnimationLayer", len(prepared)), (b"AnimationCurveNode", curve_node_count), (b"AnimationCurve", curve_node_count * 3))
+    fbx_node(definitions, b"Count", sum(count for _, count in type_counts))
+    for type_name, count in type_counts: fbx_node(fbx_node(definitions, b"ObjectType", type_name), b"Count", count)
+
+    objects = fbx_node(elem_root, b"Objects")
+    model = fbx_node(objects, b"Model", armature_id, armature.name.encode() + b"\x00\x01Model", b"Null"); fbx_node(model, b"Version", 232)
+    fbx_props(model, ("InheritType", "enum", "", "", 1), ("DefaultAttributeIndex", "int", "Integer", "", 0), *fbx_lcl_props(*prepared[0][2]))
+    fbx_node(model, b"MultiLayer", 0); fbx_node(model, b"MultiTake", 0); fbx_node(model, b"Shading", True); fbx_node(model, b"Culling", b"CullingOff")
+    for i, name in enumerate(bone_names):
+        attribute_id = fbx_uid(armature.name, name, "NodeAttribute")
+        attribute = fbx_node(objects, b"NodeAttribute", attribute_id, name.encode() + b"\x00\x01NodeAttribute", b"LimbNode")
+        fbx_node(attribute, b"TypeFlags", b"Skeleton")
+        model = fbx_node(objects, b"Model", bone_ids[i], name.encode() + b"\x00\x01Model", b"LimbNode"); fbx_node(model, b"Version", 232)
+        fbx_props(model, ("InheritType", "enum", "", "", 1), ("DefaultAttributeIndex", "int", "Integer", "", 0), *fbx_lcl_props(rest_t[i], rest_r[i], rest_s[i]))
+        fbx_node(model, b"MultiLayer", 0); fbx_node(model, b"MultiTake", 0); fbx_node(model, b"Shading", True); fbx_node(model, b"Culling", b"CullingOff")
+        connections.append((b"OO", attribute_id, bone_ids[i], None))
+        connections.append((b"OO", bone_ids[i], bone_ids[parents[i]] if parents[i] >= 0 else armature_id, None))
+
+    for take_name, key_times, _, curve_channels, keep_masks, _ in prepared:
+        stack_id = fbx_uid(take_name, "AnimStack"); layer_id = fbx_uid(take_name, "AnimLayer")
+        connections.append((b"OO", layer_id, stack_id, None))
+        stack = fbx_node(objects, b"AnimationStack", stack_id, take_name.encode() + b"\x00\x01AnimStack", b"")
+        fbx_props(stack, ("LocalStart", "KTime", "Time", "", key_times[0]), ("LocalStop", "KTime", "Time", "", key_times[-1]),
+                  ("ReferenceStart", "KTime", "Time", "", key_times[0]), ("ReferenceStop", "KTime", "Time", "", key_times[-1]))
+        fbx_node(objects, b"AnimationLayer", layer_id, b"BaseLayer\x00\x01AnimLayer", b"")
+
+        for model_id, channels in curve_channels:
+            for (prop_name, short), values in zip((("Lcl Translation", "T"), ("Lcl Rotation", "R"), ("Lcl Scaling", "S")), channels):
+                node_id = fbx_uid(take_name, model_id, short)
+                curve_node = fbx_node(objects, b"AnimationCurveNode", node_id, short.encode() + b"\x00\x01AnimCurveNode", b"")
+                fbx_props(curve_node, *(("d|" + axis, "Number", "", "A", float(values[0, j])) for j, axis in enumerate("XYZ")))
+                connections.append((b"OO", node_id, layer_id, None)); connections.append((b"OP", node_id, model_id, prop_name.encode()))
+                mask = keep_masks.get((model_id, short))
+                for j, axis in enumerate("XYZ"):
+                    times, channel = (key_times, values[:, j]) if mask is None else (key_times[mask[j]], values[mask[j], j])
+                    curve_id = fbx_uid(take_name, model_id, short, axis)
+                    curve = fbx_node(objects, b"AnimationCurve", curve_id, b"\x00\x01AnimCurve", b"")
+                    fbx_node(curve, b"Default", float(channel[0])); fbx_node(curve, b"KeyVer", 4009)
+                    fbx_array(curve, b"KeyTime", 'q', times)
+                    fbx_array(curve, b"KeyValueFloat", 'f', channel)
+                    fbx_array(curve, b"KeyAttrFlags", 'i', (FBX_KEY_ATTR_FLAGS,))
+                    fbx_array(curve, b"KeyAttrDataFloat", 'f', FBX_KEY_ATTR_DATA)
+                    fbx_array(curve, b"KeyAttrRefCount", 'i', (len(times),))
+                    connections.append((b"OP", curve_id, node_id, ("d|" + axis).encode()))
+
+    connection_root = fbx_node(elem_root, b"Connections")
+    for kind, child, parent, prop in connections:
+        if prop is None: fbx_node(connection_root, b"C", kind, child, parent)
+        else: fbx_node(connection_root, b"C", kind, child, parent, prop)
+    takes_node = fbx_node(elem_root, b"Takes"); fbx_node(takes_node, b"Current", b"")
+    for take_name, key_times, *_ in prepared:
+        take = fbx_node(takes_node, b"Take", take_name.encode())
+        fbx_node(take, b"FileName", (take_name + ".tak").encode())
+        fbx_node(take, b"LocalTime", key_times[0], key_times[-1]); fbx_node(take, b"ReferenceTime", key_times[0], key_times[-1])
+    fbx_encode_bin.write(filepath, elem_root, FBX_VERSION)
+    return [report for *_, report in prepared]
+
+@contextlib.contextmanager
+def fast_writer_state(scene):
+    """Scene state for sampling: the batch session's animation state, or a temporary metric unit system."""
+    if fbx_encode_bin is None: raise RuntimeError("Fast animation writer needs Blender's bundled 'io_scene_fbx' add-on.")
+    original_frame = scene.frame_current
+    original_unit_system = scene.unit_settings.system
+    session = active_export_session if active_export_session is not None and active_export_session.scene == scene else None
+    try:
+        with timed("prepare"):
+            if session: session.prepare(True)
+            else: scene.unit_settings.system = 'METRIC'
+        yield
+    finally:
+        if not session:
+            with timed("restore"):
+                scene.unit_settings.system = original_unit_system
+                scene.frame_set(original_frame)
+
+class FastWriterTake:
+    """The armature's current action sampled once over a frame range; written whole or in slices."""
+    def __init__(self, context, armature, action, frame_start, frame_end):
+        scene = context.scene
+        self.scene = scene; self.armature = armature; self.action = action
+        self.settings = settings = fbx_export_settings(scene)
+        self.bone_names, self.parents = animation_bones(armature, settings["use_armature_deform_only"])
+        if not self.bone_names: raise RuntimeError(f"Armature '{armature.name}' has no bones to export.")
+        self.frames = np.arange(frame_start, frame_end + 1, settings["bake_anim_step"], dtype=np.float64)
+        with timed("sample"): samples = action_samples(context, armature, action, self.frames)
+        index = [samples.bone_index[name] for name in self.bone_names]
+        rest = np.array([np.array(armature.data.bones[name].matrix_local, dtype=np.float64) for name in self.bone_names])
+        self.rest_local = local_matrices(rest, self.parents)
+        self.local = samples.local_matrices(index)
+        self.root = fbx_global_matrix(scene, settings) @ samples.world_matrices()
+        self.tolerances = None
+        if scene.use_key_reduction and not (action and action.export_dense):
+            self.tolerances = (scene.reduction_translation_tolerance, scene.reduction_rotation_tolerance, scene.reduction_scale_tolerance)
+
+    def write(self, filepath, take_name, frame_start=None, frame_end=None):
+        """Write the frames in [frame_start, frame_end] (default: all) and return the key reduction report."""
+        frames = self.frames; local = self.local; root = self.root
+        if frame_start is not None or frame_end is not None:
+            keep = (frames >= (frames[0] if frame_start is None else frame_start) - 1e-6) & (frames <= (frames[-1] if frame_end is None else frame_end) + 1e-6)
+            if not keep.any(): raise RuntimeError(f"No sampled frames between {frame_start} and {frame_end}.")
+            frames = frames[keep]; local = local[keep]; root = root[keep]
+        with timed("write"):
+            return write_animation_fbx(filepath, self.scene, self.armature, self.bone_names, self.parents, self.rest_local,
+                                       local, root, frames, take_name, self.settings, self.tolerances)
+
+def export_animation_fast(context, filepath, armature, take_name, action=None):
+    """Export the armature's current action over the scene frame range with the fast writer.
+
+    Returns the key reduction report, or None when reduction is off for this action.
+    """
+    scene = context.scene
+    with fast_writer_state(scene):
+        return FastWriterTake(context, armature, action, scene.frame_start, scene.frame_end).write(filepath, take_name)
+
+
+# --- Keyframe Reduction ---
+# Baking keys every bone channel on every frame. This stage removes keys that linear
+# interpolation between their neighbours reproduces within the user tolerances. It works like
+# Douglas-Peucker, vectorized over all channels at once: each pass adds the worst-fitting frame of
+# every segment that is still out of tolerance. Constant channels collapse to a single key.
+def reduce_keys(values, tolerance):
+    """Return the keep mask (channels, frames) and the max error per channel for linear key reduction."""
+    channels, frame_count = values.shape
+    keep = np.zeros((channels, frame_count), dtype=bool)
+    keep[:, 0] = keep[:, -1] = True
+    tolerance = np.broadcast_to(np.asarray(tolerance, dtype=np.float64), (channels,))[:, None]
+    frame_index = np.broadcast_to(np.arange(frame_count), (channels, frame_count))
+    row_offset = (np.arange(channels) * frame_count)[:, None]
+    constant = np.ptp(values, axis=1) <= tolerance[:, 0]
+    while True:
+        previous = np.maximum.accumulate(np.where(keep, frame_index, 0), axis=1)
+        following = np.minimum.accumulate(np.where(keep, frame_index, frame_count - 1)[:, ::-1], axis=1)[:, ::-1]
+        v0 = np.take_along_axis(values, previous, axis=1); v1 = np.take_along_axis(values, following, axis=1)
+        span = np.maximum(following - previous, 1)
+        error = np.abs(v0 + (v1 - v0) * (frame_index - previous) / span - values)
+        error[constant] = 0.0
+        over = error > tolerance
+        if not over.any(): break
+        segment = (previous + row_offset)[over]
+        worst = np.zeros(channels * frame_count); np.maximum.at(worst, segment, error[over])
+        keep |= over & (error >= worst[previous + row_offset])
+    max_error = error.max(axis=1) if frame_count else np.zeros(channels)
+    keep[constant] = False; keep[constant, 0] = True
+    max_error[constant] = np.ptp(values[constant], axis=1) if frame_count else 0.0
+    return keep, max_error
+
+def reduce_curve_channels(curve_channels, root_id, tolerances, unit_scale):
+    """Reduce all T/R/S channels of the written models; returns keep masks by (model_id, 'T'|'R'|'S') and a report."""
+    translation_cm, rotation_deg, scale_tolerance = tolerances
+    keep_masks = {}
+    report = {"keys_before": 0, "keys_after": 0, "max_error": {}}
+    for kind, short, label in ((0, "T", "translation"), (1, "R", "rotation"), (2, "S", "scale")):
+        rows = np.concatenate([channels[kind].T for _, channels in curve_channels], axis=0)
+        factors = np.repeat([1.0 if model_id == root_id else unit_scale for model_id, _ in curve_channels], 3) # Root is already in cm
+        tolerance = {0: translation_cm / factors, 1: rotation_deg, 2: scale_tolerance}[kind]
+        keep, error = reduce_keys(rows, tolerance)
+        if kind == 0: error = error * factors
+        for i, (model_id, _) in enumerate(curve_channels): keep_masks[(model_id, short)] = keep[i * 3:i * 3 + 3]
+        report["keys_before"] += int(keep.size); report["keys_after"] += int(keep.sum())
+        report["max_error"][label] = float(error.max()) if error.size else 0.0
+    return keep_masks, report
+
+
+# --- FBX Reader (post-export verification and asset index) ---
+# A streaming reader for binary FBX files. It walks node records by their end offsets and descends
+# only into GlobalSettings, Objects and Connections. From those it takes the skeleton (LimbNode
+# models), the animation stacks and the vertex/index counts of each geometry. Array payloads are
+# never decompressed, only their element count is read. Each exported file is checked against what
+# it was asked to hold. asset index files summarize every FBX in an export directory, and only
+# files whose size or mtime changed are read again.
+FBX_BINARY_MAGIC = b"Kaydara FBX Binary  \x00"
+FBX_SCALAR_FORMATS = {b"Y": "<h", b"C": "<?", b"I": "<i", b"F": "<f", b"D": "<d", b"L": "<q"}
+FBX_ARRAY_CODES = frozenset(b"fdlib")
+FBX_TIME_MODE_FPS = {1: 120.0, 2: 100.0, 3: 60.0, 4: 50.0, 5: 48.0, 6: 30.0, 7: 30.0, 8: 29.97, 9: 29.97, 10: 25.0, 11: 24.0, 12: 1000.0, 13: 23.976, 15: 96.0, 16: 72.0, 17: 59.94}
+ASSET_INDEX_NAME = "batch_fbx_index.json"
+
+class FBXReader:
+    """Sequential access to the node records of an open binary FBX file."""
+    def __init__(self, f):
+        header = f.read(27)
+        if len(header) < 27 or not header.startswith(FBX_BINARY_MAGIC): raise ValueError("not a binary FBX file")
+        self.f = f; self.version = struct.unpack_from("<I", header, 23)[0]
+        self.record = struct.Struct("<QQQB" if self.version >= 7500 else "<IIIB") # 64-bit offsets from FBX 7.5
+
+    def nodes(self, end=None):
+        """Yield (name, end offset, property count, property bytes) of sibling records, positioned at the properties.
+
+        Whatever the caller leaves unread is skipped when the next record is requested.
+        """
+        f = self.f
+        while end is None or f.tell() < end:
+            raw = f.read(self.record.size)
+            if len(raw) < self.record.size: return
+            end_offset, count, length, name_length = self.record.unpack(raw)
+            if end_offset == 0: return # Null record closes a nested list
+            name = f.read(name_length)
+            yield name, end_offset, count, length
+            f.seek(end_offset)
+
+    def children(self, end, length):
+        """Child records of the current record (skips its properties)."""
+        self.f.seek(length, 1)
+        return self.nodes(end)
+
+    def properties(self, count):
+        """Property values of the current record; arrays are returned as their element count."""
+        f = self.f; values = []
+        for _ in range(count):
+            code = f.read(1)
+            if code in FBX_SCALAR_FORMATS:
+                fmt = FBX_SCALAR_FORMATS[code]; values.append(struct.unpack(fmt, f.read(struct.calcsize(fmt)))[0])
+            elif code in (b"S", b"R"):
+                size = struct.unpack("<I", f.read(4))[0]; values.append(f.read(size))
+            elif code and code[0] in FBX_ARRAY_CODES:
+                array_length, encoding, size = struct.unpack("<III", f.read(12))
+                f.seek(size, 1); values.append(array_length) # Payload skipped, compressed or not
+            else: raise ValueError(f"unknown FBX property type {code!r}")
+        return values
+
+    def properties70(self, end, length):
+        """{name: values} of the Properties70 child of the current record."""
+        props = {}
+        for name, child_end, count, child_length in self.children(end, length):
+            if name != b"Properties70": continue
+            for _, _, prop_count, _ in self.nodes(child_end):
+                values = self.properties(prop_count)
+                props[values[0].decode('utf-8', 'replace')] = values[4:]
+        return props
+
+def fbx_object_name(value):
+    """'Name' from an FBX 'Name\\x00\\x01Class' object name."""
+    return value.split(b"\x00\x01")[0].decode('utf-8', 'replace')
+
+def read_fbx_summary(path):
+    """Skeleton, takes (times in seconds) and geometry counts of a binary FBX file."""
+    summary = {"version": 0, "fps": 0.0, "bones": [], "meshes": [], "takes": []}
+    mesh_models = {}; geometries = {}; links = []
+    with open(path, 'rb') as f:
+        reader = FBXReader(f); summary["version"] = reader.version
+        for name, end, count, length in reader.nodes():
+            if name == b"GlobalSettings":
+                props = reader.properties70(end, length)
+                custom = props.get("CustomFrameRate", [0.0])[0]; mode = props.get("TimeMode", [0])[0]
+                summary["fps"] = custom if custom > 0.0 else FBX_TIME_MODE_FPS.get(mode, 0.0)
+            elif name == b"Objects":
+                for child, child_end, child_count, child_length in reader.children(end, length):
+                    if child == b"Model":
+                        model_id, model_name, model_type = reader.properties(child_count)[:3]
+                        if model_type == b"LimbNode": summary["bones"].append(fbx_object_name(model_name))
+                        elif model_type == b"Mesh": mesh_models[model_id] = fbx_object_name(model_name)
+                    elif child == b"Geometry":
+                        geometry_id = reader.properties(child_count)[0]
+                        counts = geometries[geometry_id] = {"vertices": 0, "indices": 0}
+                        for data, data_end, data_count, data_length in reader.nodes(child_end):
+                            if data == b"Vertices": counts["vertices"] = reader.properties(data_count)[0] // 3
+                            elif data == b"PolygonVertexIndex": counts["indices"] = reader.properties(data_count)[0]
+                    elif child == b"AnimationStack":
+                        stack_name = fbx_object_name(reader.properties(child_count)[1])
+                        props = reader.properties70(child_end, 0) # Properties already read
+                        start = props.get("LocalStart", [0])[0]; stop = props.get("LocalStop", [0])[0]
+                        summary["takes"].append({"name": stack_name, "start": start / FBX_KTIME, "stop": stop / FBX_KTIME})
+            elif name == b"Connections":
+                for _, _, child_count, _ in reader.children(end, length):
+                    values = reader.properties(child_count)
+                    if values[0] == b"OO": links.append((values[1], values[2]))
+    mesh_geometry = {parent: child for child, parent in links if child in geometries and parent in mesh_models}
+    for model_id, mesh_name in mesh_models.items():
+        summary["meshes"].append({"name": mesh_name, **geometries.get(mesh_geometry.get(model_id), {"vertices": 0, "indices": 0})})
+    return summary
+
+def export_expectation(scene, armature, frame_start=None, frame_end=None, meshes=None, takes=None):
+    """What a file is asked to hold, for verify_fbx(); None when verification is off. takes: [(name, frame start, frame end)]."""
+    if not scene.use_export_verify or not armature: return None
+    bones = armature.data.bones
+    expected = {"bones": [bone.name for bone in bones], "required": [bone.name for bone in bones if bone.use_deform or not scene.use_armature_deform_only]}
+    if frame_start is not None: expected.update(frames=(frame_start, frame_end), fps=scene.render.fps / scene.render.fps_base)
+    if meshes is not None: expected["meshes"] = list(meshes)
+    if takes is not None: expected.update(takes=[list(take) for take in takes], fps=scene.render.fps / scene.render.fps_base)
+    return expected
+
+def verify_fbx(path, expected):
+    """Differences between a written FBX and its expectation (empty when it matches)."""
+    try: summary = read_fbx_summary(path)
+    except (OSError, ValueError, struct.error) as e: return [f"unreadable FBX ({e})"]
+    problems = []
+    written = set(summary["bones"])
+    missing = [name for name in expected["required"] if name not in written]
+    unknown = sorted(written - set(expected["bones"]))
+    if missing: problems.append(f"{len(missing)} bone(s) missing: {', '.join(missing[:5])}")
+    if unknown: problems.append(f"{len(unknown)} unknown bone(s): {', '.join(unknown[:5])}")
+    if "frames" in expected:
+        fps = summary["fps"] or expected["fps"]; first, last = expected["frames"]
+        if not summary["takes"]: problems.append("no animation take")
+        else:
+            take = summary["takes"][0]; start = take["start"] * fps; stop = take["stop"] * fps
+            if abs(start - first) > 0.5 or abs(stop - last) > 0.5: problems.append(f"take '{take['name']}' spans frames {start:g}-{stop:g}, expected {first:g}-{last:g}")
+    if "takes" in expected:
+        # Multi-take files: the stock exporter starts NLA takes at zero, so only names and lengths are compared
+        fps = summary["fps"] or expected["fps"]; written_takes = {take["name"]: take for take in summary["takes"]}
+        missing = [name for name, first, last in expected["takes"] if name not in written_takes]
+        if missing: problems.append(f"{len(missing)} take(s) missing: {', '.join(missing[:5])}")
+        for name, first, last in expected["takes"]:
+            take = written_takes.get(name)
+            if take and abs((take["stop"] - take["start"]) * fps - (last - first)) > 0.5: problems.append(f"take '{name}' is {(take['stop'] - take['start']) * fps:g} frames long, expected {last - first:g}")
+    if "meshes" in expected:
+        written_meshes = {mesh["name"] for mesh in summary["meshes"]}
+        missing = [name for name in expected["meshes"] if name not in written_meshes]
+        if missing: problems.append(f"{len(missing)} mesh(es) missing: {', '.join(missing[:5])}")
+    return problems
+
+def update_asset_index(export_path):
+    """Summarize every FBX of the export directory into the asset index (reading only changed files) and return it."""
+    index_file = os.path.join(export_path, ASSET_INDEX_NAME)
+    try:
+        with open(index_file, 'r', encoding='utf-8') as f: previous = json.load(f).get("assets", {})
+    except (OSError, ValueError): previous = {}
+    assets = {}
+    with os.scandir(export_path) as scan:
+        for entry in scan:
+            if not entry.is_file() or entry.name.startswith(".") or not entry.name.lower().endswith(".fbx"): continue
+            stat = entry.stat(); record = previous.get(entry.name)
+            if record and record.get("size") == stat.st_size and record.get("mtime") == stat.st_mtime: assets[entry.name] = record; continue
+            record = {"size": stat.st_size, "mtime": stat.st_mtime}
+            try:
+                summary = read_fbx_summary(entry.path)
+                record.update(summary, skeleton=hashlib.sha1("\n".join(summary["bones"]).encode('utf-8')).hexdigest()[:16] if summary["bones"] else "",
+                              kind='CHARACTER' if summary["meshes"] else ('ANIMATION' if summary["takes"] else 'OTHER'))
+            except (OSError, ValueError, struct.error) as e: record["error"] = str(e)
+            assets[entry.name] = record
+    index = {"version": 1, "generated": time.time(), "assets": dict(sorted(assets.items()))}
+    temp_file = index_file + f".{os.getpid()}.tmp"
+    with open(temp_file, 'w', encoding='utf-8') as f: json.dump(index, f, indent=1)
+    os.replace(temp_file, index_file)
+    return index
+
+def run_asset_index(export_path, pattern=None):
+    """Command-line entry: rebuild the asset index of a directory and list the assets matching a file name pattern."""
+    index = update_asset_index(export_path)
+    for name, record in index["assets"].items():
+        if pattern and not fnmatch.fnmatch(name.lower(), pattern.lower()): continue
+        if "error" in record: print(f"{name}: ERROR {record['error']}"); continue
+        takes = ", ".join(f"{take['name']} {take['start'] * record['fps']:g}-{take['stop'] * record['fps']:g}" for take in record["takes"])
+        meshes = ", ".join(f"{mesh['name']} ({mesh['vertices']} verts)" for mesh in record["meshes"])
+        print(f"{name}: {record['kind']}, {len(record['bones'])} bones [{record['skeleton']}]" + (f", takes: {takes}" if takes else "") + (f", meshes: {meshes}" if meshes else ""))
+    print(f"{len(index['assets'])} asset(s) indexed in {os.path.join(export_path, ASSET_INDEX_NAME)}")
+    return 0
+
+
+# --- Export Result Records ---
+# Every exported (or skipped/failed) file is described by one plain dict so results can be
+# reported by the operator, passed between worker processes and printed as JSON by the CLI.
+last_export_results = [] # Records of the most recent batch export run
+last_export_stats = {} # Run-level counters of the most recent batch export run
+
+def new_result(name, fbx_file, kind='ANIMATION', status='ERROR', error=""):
+    """Create an export result record."""
+    return {"name": name, "kind": kind, "file": fbx_file, "status": status, "error": error, "traceback": "", "duration": 0.0, "transfer": 0.0, "size": 0, "phases": {}, "peak_rss": 0, "rss": 0}
+
+
+# --- Run Log ---
+# Every batch appends one JSON line per job to a log in the export directory (plus one line for
+# the batch itself), so slow assets and slow phases can be tracked across runs and machines.
+RUN_LOG_NAME = ".batch_fbx_runlog.jsonl"
+RUN_LOG_MAX_BYTES = 16 << 20 # Rotated to .1 beyond this
+
+def write_run_log(export_path, plan, results, batch_phases, stats, cancelled=False):
+    """Append the records of one batch to the run log."""
+    run_id = time.strftime("%Y-%m-%dT%H:%M:%S"); jobs = {(job["kind"], job["name"]): job for job in plan.jobs}
+    lines = []
+    for record in results:
+        job = jobs.get((record["kind"], record["name"]), {})
+        lines.append({"run": run_id, "kind": record["kind"], "name": record["name"], "file": os.path.basename(record["file"]), "status": record["status"],
+                      "error": record["error"], "duration": round(record["duration"], 4), "transfer": round(record["transfer"], 4),
+                      "phases": {phase: round(seconds, 4) for phase, seconds in record["phases"].items()},
+                      "frames": job.get("frames", 0), "bones": job.get("bones", 0), "bytes": record["size"], "peak_rss": record["peak_rss"], "rss": record["rss"]})
+    lines.append({"run": run_id, "kind": 'BATCH', "name": bpy.data.filepath, "status": 'CANCELLED' if cancelled else 'ERROR' if any(record["status"] == 'ERROR' for record in results) else 'OK',
+                  "duration": round(sum(batch_phases.values()), 4), "phases": {phase: round(seconds, 4) for phase, seconds in batch_phases.items()},
+                  "jobs": len(results), "bytes": sum(record["size"] for record in results), "peak_rss": peak_rss_bytes(), "stats": stats})
+    log_file = os.path.join(export_path, RUN_LOG_NAME)
+    if os.path.exists(log_file) and os.path.getsize(log_file) > RUN_LOG_MAX_BYTES: os.replace(log_file, log_file + ".1")
+    with open(log_file, 'a', encoding='utf-8') as f: f.writelines(json.dumps(line) + "\n" for line in lines)
+
+def slowest_results(count):
+    """The count slowest exported files of the last run, slowest first."""
+    return sorted((record for record in last_export_results if record["status"] != 'SKIPPED'), key=lambda record: record["duration"] + record["transfer"], reverse=True)[:count]
+
+
+# --- Memory-Bounded Runs ---
+# Blender's memory grows over long batches, from datablocks that exports leave behind. The batch
+# operator pushes no undo step (the scene is restored at the end anyway), so a run never stores a
+# copy of the whole file in the undo history. In memory-bounded mode a batch also does two things:
+# - after every file it removes datablocks that were created during the batch and have no users
+#   left (datablocks that existed before are never touched, so unused actions survive);
+# - it records the resident memory after every file.
+# Headless runs that cross the memory ceiling stop between actions and hand the remaining ones to a
+# fresh Blender process.
+ORPHAN_COLLECTIONS = ("actions", "armatures", "meshes", "materials", "images", "textures", "node_groups", "curves", "objects")
+memory_handoff = None # Set to a list by headless runs that can hand off; collects the actions left over
+
+class MemoryGuard:
+    """Orphan sweeping and the memory ceiling of one memory-bounded batch."""
+    def __init__(self, context):
+        self.ceiling = context.scene.export_memory_limit_mb * 1024 * 1024
+        self.known = {name: {block.as_pointer() for block in getattr(bpy.data, name)} for name in ORPHAN_COLLECTIONS}
+        self.rss = current_rss_bytes(); self.removed = 0
+
+    def sweep(self):
+        """Remove the user-less datablocks created since the batch began."""
+        orphans = [block for name in ORPHAN_COLLECTIONS for block in getattr(bpy.data, name) if block.users == 0 and block.as_pointer() not in self.known[name]]
+        if orphans: bpy.data.batch_remove(orphans); self.removed += len(orphans)
+
+    def after_export(self, result):
+        """Sweep orphans and record the resident memory once a file is written."""
+        with timed("sweep", result["phases"]): self.sweep()
+        self.rss = result["rss"] = current_rss_bytes()
+
+    @property
+    def over_ceiling(self):
+        return bool(self.ceiling) and self.rss > self.ceiling
+
+def memory_guard(context):
+    """MemoryGuard when the scene runs memory-bounded, else None."""
+    return MemoryGuard(context) if context.scene.use_memory_bound else None
+
+def remaining_action_names(memory, actions, index):
+    """Names of actions[index:] when a memory-bounded run has to hand them off, else None."""
+    if memory is None or not memory.over_ceiling or index >= len(actions): return None
+    print(f"Memory ceiling reached ({memory.rss // (1024 * 1024)} MB); handing {len(actions) - index} action(s) to a fresh process.")
+    return [action if isinstance(action, str) else action.name for action in actions[index:]]
+
+
+# --- Scratch Staging (local write, background copy-out) ---
+# FBX files are written to a local scratch directory and copied to the export directory by a
+# small thread pool while the next file is exported. Each copy lands under a hidden temporary
+# name next to its target and is renamed into place, so a crash or a failed transfer never leaves
+# a half-written FBX where an importer could pick it up. The pool is bounded: when too many files
+# are waiting, the export blocks until a transfer finishes (which also caps the scratch space).
+# A staged record has status 'STAGED' until its transfer is done. The transfer threads never touch
+# the records; they post their outcome to a queue that the main thread applies in collect(), so a
+# file is reported as exported (and enters the manifest) only once it is in the export directory.
+PARTIAL_SUFFIX = ".partial"
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""): digest.update(chunk)
+    return digest.hexdigest()
+
+class StagingPipeline:
+    """Local scratch directory plus a bounded pool that moves finished files to their targets."""
+    def __init__(self, threads=2, verify=False, scratch_root=""):
+        self.verify = verify
+        self.scratch = tempfile.mkdtemp(prefix="batch_fbx_stage_", dir=scratch_root or None)
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=threads, thread_name_prefix="batch_fbx_transfer")
+        self.slots = threading.BoundedSemaphore(threads * 2)
+        self.pending = []
+        self.done = queue.Queue() # (record, outcome) of finished transfers, filled by the pool threads
+
+    def stage_path(self, target):
+        """Local path to write instead of target."""
+        return os.path.join(self.scratch, os.path.basename(target))
+
+    def submit(self, result, staged_file):
+        """Queue the transfer of a written file to result["file"]; blocks while the pool is full."""
+        self.slots.acquire()
+        try: future = self.pool.submit(self.transfer, result, staged_file)
+        except Exception: self.slots.release(); raise
+        future.add_done_callback(lambda f: self.slots.release())
+        self.pending.append(future)
+
+    def transfer(self, result, staged_file):
+        """Copy a staged file to its target (runs on a pool thread) and post the outcome."""
+        target = result["file"]; start_time = time.perf_counter(); outcome = {}
+        partial = os.path.join(os.path.dirname(target), f".{os.path.basename(target)}{PARTIAL_SUFFIX}")
+        try:
+            checksum = file_sha256(staged_file) if self.verify else None
+            shutil.copyfile(staged_file, partial)
+            if checksum is not None:
+                if file_sha256(partial) != checksum: raise OSError(f"checksum mismatch after copying to {partial}")
+                outcome["sha256"] = checksum
+            os.replace(partial, target)
+            os.remove(staged_file)
+        except Exception as e_transfer:
+            outcome["error"] = f"Failed transferring '{os.path.basename(target)}': {e_transfer}"; outcome["traceback"] = traceback.format_exc()
+            try: os.remove(partial)
+            except OSError: pass
+        finally:
+            outcome["transfer"] = time.perf_counter() - start_time
+            self.done.put((result, outcome))
+
+    def collect(self):
+        """Apply the outcomes of the finished transfers to their records and return those records."""
+        records = []
+        while True:
+            try: result, outcome = self.done.get_nowait()
+            except queue.Empty: return records
+            result["transfer"] = outcome["transfer"]
+            if "error" in outcome: result.update(status='ERROR', error=outcome["error"], traceback=outcome["traceback"])
+            else:
+                result["status"] = 'OK'
+                if "sha256" in outcome: result["sha256"] = outcome["sha256"]
+            records.append(result)
+
+    def wait(self):
+        """Block until every queued transfer has finished and return the records finished since the last collect()."""
+        pending, self.pending = self.pending, []
+        concurrent.futures.wait(pending)
+        return self.collect()
+
+    def close(self):
+        records = self.wait()
+        self.pool.shutdown(wait=True)
+        shutil.rmtree(self.scratch, ignore_errors=True)
+        return records
+
+def remove_partial_files(export_path):
+    """Delete the temporary files of transfers that a crash or a kill left behind in the export directory."""
+    try:
+        with os.scandir(export_path) as scan:
+            for entry in scan:
+                if entry.name.startswith(".") and entry.name.endswith(".fbx" + PARTIAL_SUFFIX) and entry.is_file():
+                    try: os.remove(entry.path)
+                    except OSError: pass
+    except OSError: pass
+
+def staging_pipeline(scene):
+    """StagingPipeline for the scene's settings, or None when exports write directly to the target."""
+    if not scene.use_export_staging: return None
+    return StagingPipeline(scene.export_transfer_threads, scene.export_verify_checksum, bpy.path.abspath(scene.export_staging_dir))
+
+def write_target(fbx_file):
+    """Path an export should write to: the scratch copy while a staging session is active."""
+    staging = active_export_session.staging if active_export_session else None
+    return staging.stage_path(fbx_file) if staging else fbx_file
+
+def finish_write(result, written_file, expected=None):
+    """Record the size of a successful write and hand a staged file to the transfer pool.
+
+    With an expectation (see export_expectation()), the file is verified first and a mismatch fails the record.
+    """
+    if expected is not None:
+        with timed("verify"): problems = verify_fbx(written_file, expected)
+        if problems:
+            result["status"] = 'ERROR'; result["error"] = f"Verification of '{os.path.basename(result['file'])}' failed: " + "; ".join(problems)
+            return
+    with timed("stat"): result["size"] = os.path.getsize(written_file) if os.path.exists(written_file) else 0
+    if written_file != result["file"]:
+        result["status"] = 'STAGED' # 'OK' once the transfer to the export directory is done
+        with timed("stage_queue"): active_export_session.staging.submit(result, written_file)
+
+
+# --- Texture Store (content-addressed textures shared by every export) ---
+# With path_mode 'COPY' every character export copies all of its images next to the FBX again
+# (or embeds them with Embed Textures). In Store mode each image file is hashed and kept once in
+# a store directory, named by its content hash, and the FBX references that copy by relative path.
+# Hashes are cached by path, mtime and size, so unchanged images are not read again. Files are
+# cloned into the store (reflink, on file systems that support it) or copied, never hardlinked: a
+# hardlink would change along with a source edited in place and no longer match its hash. Packed
+# images are written into the store from their packed data, under the hash of that data.
+FICLONE = 0x40049409 # Linux ioctl that shares a file's extents copy-on-write (Btrfs, XFS)
+TEXTURE_STORE_DIR = "Textures"
+TEXTURE_STORE_INDEX = ".texture_store.json"
+TEXTURE_STORE_VERSION = 1
+IMAGE_FORMAT_EXTENSIONS = {'PNG': ".png", 'JPEG': ".jpg", 'JPEG2000': ".jp2", 'TARGA': ".tga", 'TARGA_RAW': ".tga", 'BMP': ".bmp", 'TIFF': ".tif",
+                           'OPEN_EXR': ".exr", 'OPEN_EXR_MULTILAYER': ".exr", 'HDR': ".hdr", 'WEBP': ".webp", 'DDS': ".dds"}
+
+def material_images(objects):
+    """File-backed and packed images used by the node materials of these objects, including inside node groups."""
+    images = {}; visited = set()
+    def visit(tree):
+        if tree is None or tree.as_pointer() in visited: return
+        visited.add(tree.as_pointer())
+        for node in tree.nodes:
+            if node.type == 'TEX_IMAGE' and node.image: images[node.image.as_pointer()] = node.image
+            elif node.type == 'GROUP': visit(node.node_tree)
+    for obj in objects:
+        if obj.type != 'MESH': continue
+        for slot in obj.material_slots:
+            if slot.material and slot.material.use_nodes: visit(slot.material.node_tree)
+    return [image for image in images.values() if image.source == 'FILE']
+
+def clone_file(source, target):
+    """Copy a file, as a copy-on-write clone where the file system supports it. True when cloned."""
+    try:
+        import fcntl
+        with open(source, 'rb') as src, open(target, 'wb') as dst: fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        shutil.copystat(source, target)
+        return True
+    except (ImportError, OSError): pass
+    shutil.copy2(source, target)
+    return False
+
+def texture_store_root(scene, export_path):
+    return bpy.path.abspath(scene.texture_store_dir) if scene.texture_store_dir.strip() else os.path.join(export_path, TEXTURE_STORE_DIR)
+
+class TextureStore:
+    """Content-addressed copies of image files; counts what was copied, cloned and reused."""
+    def __init__(self, root):
+        self.root = root
+        self.index_file = os.path.join(root, TEXTURE_STORE_INDEX)
+        self.sources = self.read_index()
+        self.stats = {"images": 0, "copied": 0, "cloned": 0, "reused": 0, "bytes_copied": 0, "bytes_saved": 0}
+
+    def store_file(self, source):
+        """Path of a source file in the store, hashing it only when its size or mtime changed."""
+        stat = os.stat(source); entry = self.sources.get(source)
+        if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size: return entry["file"], stat.st_size
+        file_name = file_sha256(source)[:32] + os.path.splitext(source)[1].lower()
+        self.sources[source] = {"mtime": stat.st_mtime, "size": stat.st_size, "file": file_name}
+        return file_name, stat.st_size
+
+    def add(self, source):
+        """Put one file into the store (unless its content is there already) and return its store path."""
+        file_name, size = self.store_file(source)
+        return self.put(file_name, size, lambda partial: clone_file(source, partial))
+
+    def add_packed(self, image):
+        """Write a packed image's data into the store (unless it is there already) and return its store path."""
+        data = bytes(image.packed_file.data)
+        extension = os.path.splitext(image.filepath)[1].lower() or IMAGE_FORMAT_EXTENSIONS.get(image.file_format, ".png")
+        def write(partial):
+            with open(partial, 'wb') as f: f.write(data)
+            return False
+        return self.put(hashlib.sha256(data).hexdigest()[:32] + extension, len(data), write)
+
+    def put(self, file_name, size, write):
+        """Create file_name in the store with write(partial path), True when it cloned, unless it is stored already; returns its path."""
+        target = os.path.join(self.root, file_name); self.stats["images"] += 1
+        if os.path.exists(target): self.stats["reused"] += 1; self.stats["bytes_saved"] += size; return target
+        os.makedirs(self.root, exist_ok=True)
+        partial = f"{target}.{os.getpid()}.partial" # Parallel workers may store the same image
+        try: os.remove(partial)
+        except OSError: pass
+        if write(partial): self.stats["cloned"] += 1; self.stats["bytes_saved"] += size
+        else: self.stats["copied"] += 1; self.stats["bytes_copied"] += size
+        os.replace(partial, target)
+        return target
+
+    def summary(self):
+        stats = self.stats
+        return f"Texture store: {stats['images']} image(s), {stats['bytes_copied'] / 1048576:.1f} MB copied, {stats['bytes_saved'] / 1048576:.1f} MB saved ({stats['cloned']} cloned, {stats['reused']} already stored)."
+
+    def read_index(self):
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f: index = json.load(f)
+            if index.get("version") == TEXTURE_STORE_VERSION: return index["sources"]
+        except (OSError, ValueError, KeyError): pass
+        return {}
+
+    def save(self):
+        """Merge the hash cache into the index on disk; parallel workers each write their own temp file."""
+        self.sources = {**self.read_index(), **self.sources} # Keep what other workers hashed meanwhile
+        temp_file = f"{self.index_file}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            with open(temp_file, 'w', encoding='utf-8') as f: json.dump({"version": TEXTURE_STORE_VERSION, "sources": self.sources}, f, indent=1, sort_keys=True)
+            os.replace(temp_file, self.index_file)
+        except OSError as e_save: # Only a cache: the next run hashes again
+            print(f"Could not save texture store index {self.index_file}: {e_save}")
+            try: os.remove(temp_file)
+            except OSError: pass
+
+    @contextlib.contextmanager
+    def referenced(self, images):
+        """Point the images at their store copies (without reloading them) for the duration of an export."""
+        originals = []
+        try:
+            with timed("textures"):
+                for image in images:
+                    if image.packed_file: target = self.add_packed(image) # Would otherwise be lost: nothing is embedded in Store mode
+                    else:
+                        source = os.path.normpath(bpy.path.abspath(image.filepath, library=image.library))
+                        if not os.path.isfile(source): continue
+                        target = self.add(source)
+                    originals.append((image, image.filepath_raw)); image.filepath_raw = target
+                self.save()
+            yield
+        finally:
+            for image, filepath in originals: image.filepath_raw = filepath
+
+# --- Split Character Export (one FBX per LOD level or mesh part) ---
+# A single character file bundles every listed mesh and all discovered LODs, so one edited LOD
+# re-evaluates and rewrites the whole set. Split mode writes one file per LOD level or per mesh
+# part (a base mesh with its LODs), each with the armature. With Incremental on, a file is
+# skipped while the geometry, weights, shape keys, materials and modifier stacks of its meshes are
+# unchanged. With Parallel Export on, the files are shared out to headless worker processes.
+# Hashing a mesh's data (vertex weights have no bulk accessor) is cached per mesh and dropped from
+# the depsgraph handler when its geometry changes; undo and file loads clear the cache.
+ATTRIBUTE_FIELDS = {'FLOAT': ("value", np.float32, 1), 'INT': ("value", np.int32, 1), 'INT8': ("value", np.int32, 1), 'BOOLEAN': ("value", np.bool_, 1),
+                    'FLOAT_VECTOR': ("vector", np.float32, 3), 'FLOAT2': ("vector", np.float32, 2), 'FLOAT_COLOR': ("color", np.float32, 4), 'BYTE_COLOR': ("color", np.float32, 4)}
+
+def character_parts(scene, armature, view_layer=None):
+    """Files of a split character export: [{"name", "file_name", "meshes": [names], "cost": vertices}], by LOD level or by mesh part."""
+    index = lod_index(scene)
+    members = [(*index.classify(item.object.name), item.object) for item in scene.character_objects if item.object and item.export and item.object.name in scene.objects]
+    if scene.export_lods:
+        known = {obj.name for _, _, obj in members}
+        members += [(base, level, obj) for base, levels in index.lod_groups(scene, armature, view_layer).items() for level, obj in levels if level > 0 and obj.name not in known]
+    groups = {}
+    for base, level, obj in members: groups.setdefault(level if scene.character_split == 'LOD' else base, []).append(obj)
+    character = character_file_name(scene)[:-4]; parts = []
+    for key, objects in sorted(groups.items(), key=lambda item: item[0]):
+        name = f"{character}_LOD{key}" if scene.character_split == 'LOD' else f"{character}_{key}"
+        parts.append({"name": name, "file_name": f"{name}.fbx", "meshes": [obj.name for obj in objects], "cost": sum(len(obj.data.vertices) for obj in objects)})
+    return parts
+
+NODE_LAYOUT_PROPERTIES = {"name", "label", "location", "width", "height", "width_hidden", "select", "hide", "color", "use_custom_color", "parent",
+                          "show_options", "show_preview", "show_texture"} # Node editor layout, no effect on the material
+mesh_data_hashes = {} # Mesh pointer -> (name, element counts, hash of geometry, attributes, weights and shape key positions)
+
+def rna_fingerprint(owner, skip=()):
+    """Editable RNA and custom property values of a struct (IDs by name), as text."""
+    values = []
+    for prop in owner.bl_rna.properties:
+        if prop.is_readonly or prop.type == 'COLLECTION' or prop.identifier == "rna_type" or prop.identifier in skip: continue
+        value = getattr(owner, prop.identifier, None)
+        if prop.type == 'POINTER': value = getattr(value, "name_full", getattr(value, "name", None))
+        elif getattr(prop, "is_array", False): value = tuple(value)
+        values.append(f"{prop.identifier}={value!r}")
+    for key in owner.keys(): # Geometry Nodes inputs
+        value = owner[key]
+        values.append(f"[{key}]={value.to_list() if hasattr(value, 'to_list') else getattr(value, 'name_full', value)!r}")
+    return ";".join(values)
+
+def material_fingerprint(material):
+    """Hash a material's settings and node tree (node values, unlinked socket values and links), including node groups."""
+    digest = hashlib.sha1(rna_fingerprint(material).encode('utf-8')); visited = set()
+    def visit(tree):
+        if tree is None or tree.as_pointer() in visited: return
+        visited.add(tree.as_pointer()); digest.update(f"<{tree.name_full}>".encode('utf-8'))
+        for node in tree.nodes:
+            digest.update(f"{node.name}:{node.bl_idname}:{rna_fingerprint(node, NODE_LAYOUT_PROPERTIES)}\n".encode('utf-8'))
+            for socket in node.inputs:
+                value = getattr(socket, "default_value", None)
+                if value is not None and not socket.is_linked: digest.update(f"{socket.identifier}={tuple(value) if hasattr(value, '__len__') and not isinstance(value, str) else value!r}\n".encode('utf-8'))
+            if node.type == 'GROUP': visit(node.node_tree)
+        for link in tree.links: digest.update(f"{link.from_node.name}.{link.from_socket.identifier}>{link.to_node.name}.{link.to_socket.identifier}:{link.is_muted}\n".encode('utf-8'))
+    if material.use_nodes: visit(material.node_tree)
+    return digest.hexdigest()
+
+def mesh_data_fingerprint(mesh):
+    """Hash a mesh's topology, attributes, vertex weights and shape key positions, cached until its geometry changes."""
+    counts = (len(mesh.vertices), len(mesh.edges), len(mesh.loops), len(mesh.polygons))
+    cached = mesh_data_hashes.get(mesh.as_pointer())
+    if cached and cached[0] == mesh.name_full and cached[1] == counts: return cached[2]
+    digest = hashlib.sha1(f"{counts}\n".encode('utf-8'))
+    for collection, field in ((mesh.loops, "vertex_index"), (mesh.polygons, "loop_total")):
+        values = np.empty(len(collection), dtype=np.int32); collection.foreach_get(field, values); digest.update(values.tobytes())
+    for attribute in mesh.attributes: # Positions, UV maps, sharp faces, material indices, colors...
+        if attribute.name.startswith("."): continue # Internal selection/visibility state and topology (hashed above)
+        digest.update(f"{attribute.name}:{attribute.domain}:{attribute.data_type}\n".encode('utf-8'))
+        field = ATTRIBUTE_FIELDS.get(attribute.data_type)
+        if field is None: continue
+        name, dtype, width = field
+        values = np.empty(len(attribute.data) * width, dtype=dtype); attribute.data.foreach_get(name, values); digest.update(values.tobytes())
+    # Vertex group weights have no bulk accessor; one pass, then cached
+    group_counts = np.fromiter((len(vertex.groups) for vertex in mesh.vertices), dtype=np.int32, count=counts[0])
+    if group_counts.any():
+        weights = np.fromiter((value for vertex in mesh.vertices for group in vertex.groups for value in (group.group, group.weight)), dtype=np.float32, count=int(group_counts.sum()) * 2)
+        digest.update(group_counts.tobytes()); digest.update(weights.tobytes())
+    if mesh.shape_keys:
+        for key in mesh.shape_keys.key_blocks:
+            values = np.empty(len(key.data) * 3, dtype=np.float32); key.data.foreach_get("co", values); digest.update(values.tobytes())
+    mesh_data_hashes[mesh.as_pointer()] = (mesh.name_full, counts, digest.hexdigest())
+    return digest.hexdigest()
+
+def mesh_fingerprint(obj, visited=None):
+    """Hash a mesh object's geometry, attributes, vertex weights, shape keys, materials, local transform and modifier stack."""
+    mesh = obj.data; digest = hashlib.sha1(); visited = (visited or set()) | {obj.as_pointer()}
+    digest.update(f"{mesh.name}|{mesh_data_fingerprint(mesh)}\n".encode('utf-8'))
+    digest.update("|".join(group.name for group in obj.vertex_groups).encode('utf-8'))
+    if mesh.shape_keys:
+        for key in mesh.shape_keys.key_blocks: digest.update(f"{key.name}:{key.value}:{key.mute}:{key.relative_key.name}\n".encode('utf-8'))
+    for slot in obj.material_slots: digest.update(f"{slot.link}:{slot.material.name_full + ':' + material_fingerprint(slot.material) if slot.material else ''}\n".encode('utf-8'))
+    digest.update(np.array(obj.matrix_local, dtype=np.float32).tobytes()) # Local, so moving the rig doesn't count
+    world_inverse = np.linalg.inv(np.array(obj.matrix_world, dtype=np.float64))
+    for modifier in obj.modifiers:
+        digest.update(f"{modifier.type}:{rna_fingerprint(modifier)}\n".encode('utf-8'))
+        if modifier.type == 'ARMATURE': continue # The rig is hashed with the part
+        targets = [getattr(modifier, prop.identifier) for prop in modifier.bl_rna.properties if prop.type == 'POINTER' and prop.identifier != "rna_type"]
+        targets += [modifier[key] for key in modifier.keys()] # Geometry Nodes object inputs
+        for target in targets:
+            if not isinstance(target, bpy.types.Object) or target.as_pointer() in visited: continue
+            # Relative to this mesh, so moving the whole character doesn't count
+            digest.update((world_inverse @ np.array(target.matrix_world, dtype=np.float64)).astype(np.float32).tobytes())
+            if target.type == 'MESH': digest.update(mesh_fingerprint(target, visited).encode('utf-8'))
+    return digest.hexdigest()
+
+@persistent
+def mesh_hash_depsgraph_update(scene, depsgraph):
+    """Drop the cached data hash of every mesh whose geometry changed."""
+    if not mesh_data_hashes: return
+    for update in depsgraph.updates:
+        if not update.is_updated_geometry: continue
+        data = update.id.original
+        if isinstance(data, bpy.types.Object): data = data.data if data.type == 'MESH' else None
+        if isinstance(data, bpy.types.Mesh): mesh_data_hashes.pop(data.as_pointer(), None)
+
+@persistent
+def mesh_hash_invalidate(*args):
+    """Undo/redo and file loads replace datablocks wholesale (and reuse their addresses)."""
+    mesh_data_hashes.clear()
+
+def character_part_fingerprint(scene, armature, part, rig_hash=None):
+    """Hash everything about a character part export that can change the written FBX."""
+    digest = hashlib.sha1((rig_hash or armature_fingerprint(armature)).encode('utf-8'))
+    digest.update(f"{scene.unit_settings.system}:{scene.unit_settings.scale_length:.6f}:{scene.texture_mode}\n".encode('utf-8'))
+    digest.update(json.dumps(fbx_export_settings(scene), sort_keys=True).encode('utf-8'))
+    for name in sorted(part["meshes"]):
+        obj = bpy.data.objects.get(name)
+        digest.update(f"{name}:{mesh_fingerprint(obj) if obj and obj.type == 'MESH' else ''}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+def export_character_part(context, armature, part, export_path, texture_store=None):
+    """Export the armature with one part's meshes to its own FBX file and return a result record."""
+    scene = context.scene
+    fbx_file = os.path.join(export_path, part["file_name"])
+    result = new_result(part["name"], fbx_file, kind='CHARACTER')
+    meshes = [bpy.data.objects.get(name) for name in part["meshes"]]
+    missing = [name for name, obj in zip(part["meshes"], meshes) if obj is None]
+    if missing: result["error"] = f"Mesh(es) {', '.join(missing)} of '{part['name']}' no longer exist. Skipping."; return result
+    start_time = time.perf_counter()
+    try:
+        written_file = fbx_file if texture_store else write_target(fbx_file) # Relative texture paths must resolve from the final location
+        with timing_into(result["phases"]):
+            with timed("select"): select_only(context, [armature] + meshes, armature)
+            with timed("prepare"):
+                if active_export_session is not None: active_export_session.prepare(False)
+            with timed("evaluate_shared"):
+                # The view layer's depsgraph evaluates the modifier stacks of every part at once: the first part pays, later ones reuse it
+                depsgraph = context.evaluated_depsgraph_get()
+                for obj in meshes: obj.evaluated_get(depsgraph)
+            with texture_store.referenced(material_images(meshes)) if texture_store else contextlib.nullcontext():
+                export_fbx(context, written_file, use_selection=True, bake_anim=False)
+        result["status"] = 'OK'; result["duration"] = time.perf_counter() - start_time
+        with timing_into(result["phases"]): finish_write(result, written_file, export_expectation(scene, armature, meshes=part["meshes"]))
+    except Exception as e_part:
+        result["status"] = 'ERROR'; result["error"] = f"Failed exporting character part '{part['name']}': {e_part}"; result["traceback"] = traceback.format_exc()
+        result["duration"] = time.perf_counter() - start_time
+    result["peak_rss"] = peak_rss_bytes()
+    return result
+
+# --- Single Action Export (shared by the serial path and worker processes) ---
+def export_action(context, armature, action, export_path):
+    """Export one action on the armature to its own FBX file and return a result record."""
+    fbx_file = os.path.join(export_path, action_file_name(action.name))
+    result = new_result(action.name, fbx_file); written_file = write_target(fbx_file)
+    with timing_into(result["phases"]):
+        export_action_into(context, armature, action, result, written_file)
+    result["peak_rss"] = peak_rss_bytes()
+    return result
+
+def export_action_into(context, armature, action, result, written_file):
+    """Body of export_action(), timed into result["phases"]."""
+    scene = context.scene
+    proxy = active_export_session.proxy if active_export_session else None
+    start_time = time.perf_counter()
+    try:
+        with timed("select"): select_only(context, [armature], armature)
+    except ReferenceError: result["error"] = f"Armature not found for exporting action '{action.name}'. Skipping."; return
+    try:
+        with timed("set_action"): set_if_changed(armature.data, "pose_position", 'POSE'); armature.animation_data.action = action; set_if_changed(scene, "frame_start", int(action.frame_range[0])); set_if_changed(scene, "frame_end", int(action.frame_range[1]))
+    except Exception as e_set: result["error"] = f"Failed setting action/range for '{action.name}': {e_set}. Skipping."; return
+    try:
+        if scene.animation_backend == 'FAST': result["reduction"] = export_animation_fast(context, written_file, armature, action.name, action)
+        else:
+            if proxy: proxy.use_action(context, action)
+            with proxy.exporting() if proxy else contextlib.nullcontext():
+                export_fbx(context, written_file, use_selection=True, bake_anim=True, bake_anim_use_all_actions=False)
+        result["status"] = 'OK'
+        result["duration"] = time.perf_counter() - start_time
+        finish_write(result, written_file, export_expectation(scene, armature, scene.frame_start, scene.frame_end))
+    except Exception as e_anim:
+        result["error"] = f"Failed exporting animation '{action.name}': {e_anim}"; result["traceback"] = traceback.format_exc()
+    finally:
+        if proxy: proxy.release_action()
+        if not result["duration"]: result["duration"] = time.perf_counter() - start_time
+
+
+# --- Marker Clips (several files from one bake) ---
+# Long takes (e.g. mocap) can carry clip ranges as markers named "clip_start:Walk" and
+# "clip_end:Walk", on the action (pose markers) or on the timeline. With clip splitting on, such an
+# action is sampled once over the span of its clips and every clip is written from a slice of the
+# shared samples by the fast writer, instead of one duplicated action and one bake per clip.
+CLIP_MARKER = re.compile(r"^clip_(?P<edge>start|end)\s*:\s*(?P<name>.+?)\s*$")
+
+def marker_clips(scene, action):
+    """Clips marked for an action: ([(clip name, start, end)] ordered by start, [problems])."""
+    markers = action.pose_markers if scene.clip_marker_source == 'ACTION' else scene.timeline_markers
+    edges = {"start": {}, "end": {}}; problems = []
+    for marker in markers:
+        match = CLIP_MARKER.match(marker.name)
+        if not match: continue
+        edge, name = match.group("edge"), match.group("name")
+        if name in edges[edge]: problems.append(f"'{action.name}': clip '{name}' has several clip_{edge} markers (frame {edges[edge][name]} used, {marker.frame} ignored)"); continue
+        edges[edge][name] = marker.frame
+    clips = []
+    for name, start in edges["start"].items():
+        end = edges["end"].get(name)
+        if end is None: problems.append(f"'{action.name}': clip '{name}' has no clip_end marker")
+        elif end < start: problems.append(f"'{action.name}': clip '{name}' ends before it starts")
+        else: clips.append((name, start, end))
+    problems.extend(f"'{action.name}': clip '{name}' has no clip_start marker" for name in sorted(edges["end"].keys() - edges["start"].keys()))
+    return sorted(clips, key=lambda clip: clip[1]), problems
+
+def action_targets(scene, action, problems=None):
+    """Files an action exports to: [(name, file name, frame start, frame end, is clip)]."""
+    if scene.split_clips_by_markers:
+        clips, clip_problems = marker_clips(scene, action)
+        if problems is not None: problems.extend(clip_problems)
+        if clips:
+            names = [scene.clip_name_format.replace("{action}", action.name).replace("{clip}", clip) for clip, start, end in clips]
+            return [(name, action_file_name(name), start, end, True) for name, (clip, start, end) in zip(names, clips)]
+    return [(action.name, action_file_name(action.name), int(action.frame_range[0]), int(action.frame_range[1]), False)]
+
+def write_export(result, write, expected=None):
+    """Run write(path) for a result record (into the staging area when active) and record the outcome."""
+    written_file = write_target(result["file"]); start_time = time.perf_counter()
+    try:
+        with timing_into(result["phases"]):
+            report = write(written_file)
+            if report is not None: result["reduction"] = report
+            result["status"] = 'OK'; result["duration"] = time.perf_counter() - start_time
+            finish_write(result, written_file, expected)
+    except Exception as e_write:
+        result["status"] = 'ERROR'; result["error"] = f"Failed exporting animation '{result['name']}': {e_write}"; result["traceback"] = traceback.format_exc()
+        result["duration"] = time.perf_counter() - start_time
+    result["peak_rss"] = peak_rss_bytes()
+
+def export_action_clips(context, armature, action, export_path, targets):
+    """Export every marker clip of an action to its own file from one bake (fast writer) and return the result records."""
+    scene = context.scene
+    results = [new_result(name, os.path.join(export_path, file_name)) for name, file_name, start, end, is_clip in targets]
+    for result in results: result["action"] = action.name
+    shared_phases = {} # Selection, setup and the one sampling pass, split evenly across the clips
+    start_time = time.perf_counter()
+    try:
+        with timing_into(shared_phases):
+            with timed("select"): select_only(context, [armature], armature)
+            with timed("set_action"):
+                set_if_changed(armature.data, "pose_position", 'POSE'); armature.animation_data.action = action
+                set_if_changed(scene, "frame_start", int(min(target[2] for target in targets))); set_if_changed(scene, "frame_end", int(max(target[3] for target in targets)))
+            if scene.animation_backend == 'FAST':
+                with fast_writer_state(scene):
+                    take = FastWriterTake(context, armature, action, scene.frame_start, scene.frame_end)
+                    for result, (name, file_name, start, end, is_clip) in zip(results, targets):
+                        write_export(result, lambda path, name=name, start=start, end=end: take.write(path, name, start, end), export_expectation(scene, armature, start, end))
+            else:
+                # The stock exporter bakes the scene range, so each clip is its own bake here
+                proxy = active_export_session.proxy if active_export_session else None
+                if proxy: proxy.use_action(context, action) # Keyed once over the span of all clips
+                def write_clip(path, start, end):
+                    set_if_changed(scene, "frame_start", int(start)); set_if_changed(scene, "frame_end", int(end))
+                    with proxy.exporting() if proxy else contextlib.nullcontext():
+                        export_fbx(context, path, use_selection=True, bake_anim=True, bake_anim_use_all_actions=False)
+                try:
+                    for result, (name, file_name, start, end, is_clip) in zip(results, targets):
+                        write_export(result, lambda path, start=start, end=end: write_clip(path, start, end), export_expectation(scene, armature, start, end))
+                finally:
+                    if proxy: proxy.release_action()
+    except Exception as e_clips:
+        for result in results:
+            if result["status"] not in ('OK', 'STAGED') and not result["error"]:
+                result["error"] = f"Failed exporting clips of '{action.name}': {e_clips}"; result["traceback"] = traceback.format_exc()
+    shared = max(0.0, time.perf_counter() - start_time - sum(result["duration"] for result in results)) / len(results)
+    for result in results:
+        result["duration"] += shared
+        for phase, seconds in shared_phases.items(): result["phases"][phase] = result["phases"].get(phase, 0.0) + seconds / len(results)
+    return results
+
+def export_action_results(context, armature, action, export_path):
+    """Export an action to its file, or one file per marker clip, and return the result records."""
+    targets = action_targets(context.scene, action)
+    if not targets[0][4]: return [export_action(context, armature, action, export_path)]
+    return export_action_clips(context, armature, action, export_path, targets)
+
+
+# --- Multi-Take Files (one FBX per action group) ---
+# Per-action export pays skeleton setup and file overhead once per clip. In Takes mode the flagged
+# actions are grouped by name prefix ("Hero_Walk", "Hero_Run" -> Hero.fbx), or all strips on the
+# armature's unmuted NLA tracks (as built by "Push to NLA") go into one file, with one take per
+# action. The fast writer samples each action and writes the skeleton once; the stock exporter
+# bakes temporary NLA strips with bake_anim_use_nla_strips. Unreal's importer splits the takes.
+def take_group_name(scene, name):
+    """Group an action belongs to: its name up to the first separator (the whole name without one)."""
+    separator = scene.take_group_separator
+    return name.split(separator, 1)[0] if separator and separator in name else name
+
+def take_groups(scene, armature, actions):
+    """Takes per multi-take file: {group name: [(take name, action, frame start, frame end)]}."""
+    groups = {}
+    if scene.take_grouping == 'NLA':
+        animation_data = armature.animation_data
+        tracks = [track for track in animation_data.nla_tracks if not track.mute] if animation_data else []
+        takes = [(strip.name, strip.action, int(strip.action.frame_range[0]), int(strip.action.frame_range[1]))
+                 for track in tracks for strip in track.strips if strip.action and not strip.mute]
+        if takes: groups[f"{character_file_name(scene)[:-4]}_Anims"] = takes
+    else:
+        for action in actions:
+            groups.setdefault(take_group_name(scene, action.name), []).append((action.name, action, int(action.frame_range[0]), int(action.frame_range[1])))
+    return groups
+
+def take_group_fingerprint(scene, armature, takes, rig_hash=None):
+    """Hash of a multi-take file: every take's name, range and action fingerprint, in order."""
+    rig_hash = rig_hash or armature_fingerprint(armature)
+    digest = hashlib.sha1(f"takes:{scene.take_grouping}\n".encode('utf-8'))
+    for take_name, action_name, start, end in takes:
+        action = bpy.data.actions.get(action_name)
+        digest.update(f"{take_name}:{start}:{end}:{action_fingerprint(action, armature, scene, rig_hash) if action else ''}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+@contextlib.contextmanager
+def muted_nla_tracks(animation_data):
+    """Mute every NLA track (so only the takes being baked are evaluated) and restore them and the active action afterwards."""
+    muted = [(track, track.mute) for track in animation_data.nla_tracks]
+    original_action = animation_data.action
+    try:
+        for track, mute in muted: track.mute = True
+        yield
+    finally:
+        for track, mute in muted: track.mute = mute
+        animation_data.action = original_action
+
+def export_nla_takes(context, filepath, armature, takes):
+    """Bake takes [(take name, action, start, end)] with the stock exporter, one temporary NLA strip each."""
+    animation_data = armature.animation_data; temp_tracks = []
+    with muted_nla_tracks(animation_data):
+        try:
+            with timed("set_action"):
+                for take_name, action, start, end in takes:
+                    track = animation_data.nla_tracks.new(); track.name = take_name; temp_tracks.append(track)
+                    strip = track.strips.new(take_name, start, action); strip.frame_end = end
+                animation_data.action = None # The active action would be layered over every strip
+            export_fbx(context, filepath, use_selection=True, bake_anim=True, bake_anim_use_nla_strips=True)
+        finally:
+            with timed("restore"):
+                for track in temp_tracks: animation_data.nla_tracks.remove(track)
+
+def export_take_group(context, armature, name, takes, export_path):
+    """Export takes [(take name, action name, start, end)] into one FBX file and return its result record."""
+    scene = context.scene
+    result = new_result(name, os.path.join(export_path, action_file_name(name)))
+    resolved = [(take_name, bpy.data.actions.get(action_name), start, end) for take_name, action_name, start, end in takes]
+    missing = [take[0] for take in resolved if take[1] is None]
+    if missing: result["error"] = f"Actions of take(s) {', '.join(missing)} no longer exist. Skipping '{name}'."; return result
+    setup_start = time.perf_counter()
+    with timing_into(result["phases"]):
+        try:
+            with timed("select"): select_only(context, [armature], armature)
+            with timed("set_action"):
+                set_if_changed(armature.data, "pose_position", 'POSE')
+                set_if_changed(scene, "frame_start", min(take[2] for take in resolved)); set_if_changed(scene, "frame_end", max(take[3] for take in resolved))
+        except ReferenceError: result["error"] = f"Armature not found for exporting '{name}'. Skipping."; return result
+    setup_seconds = time.perf_counter() - setup_start
+
+    def write_fast(path):
+        with fast_writer_state(scene), muted_nla_tracks(armature.animation_data):
+            sampled = []
+            for take_name, action, start, end in resolved:
+                armature.animation_data.action = action
+                take = FastWriterTake(context, armature, action, start, end)
+                sampled.append((take_name, take.local, take.root, take.frames, take.tolerances))
+            with timed("write"): reports = [report for report in write_animation_takes_fbx(path, scene, armature, take.bone_names, take.parents, take.rest_local, sampled, take.settings) if report]
+        if not reports: return None
+        return {"keys_before": sum(report["keys_before"] for report in reports), "keys_after": sum(report["keys_after"] for report in reports),
+                "max_error": {label: max(report["max_error"][label] for report in reports) for label in reports[0]["max_error"]}}
+    write = write_fast if scene.animation_backend == 'FAST' else lambda path: export_nla_takes(context, path, armature, resolved)
+    write_export(result, write, export_expectation(scene, armature, takes=[(take_name, start, end) for take_name, action, start, end in resolved]))
+    result["duration"] += setup_seconds
+    return result
+
+
+# --- Incremental Export (Content-Hash Manifest) ---
+# Each exported action is fingerprinted from its keyframes, frame range, the armature's bone
+# hierarchy and rest pose, the unit scale and every FBX setting that reaches export_fbx().
+# Fingerprints are stored in a manifest next to the FBX files; unchanged actions are skipped.
+MANIFEST_NAME = ".batch_fbx_manifest.json"
+MANIFEST_VERSION = 1
+
+def armature_fingerprint(armature):
+    """Hash the armature's bone hierarchy and rest pose."""
+    digest = hashlib.sha1()
+    bones = armature.data.bones
+    for bone in bones: digest.update(f"{bone.name}|{bone.parent.name if bone.parent else ''}|{bone.use_deform}\n".encode('utf-8'))
+    rest = np.empty(len(bones) * 16, dtype=np.float32)
+    bones.foreach_get("matrix_local", rest)
+    digest.update(rest.tobytes())
+    return digest.hexdigest()
+
+def action_keys_fingerprint(action):
+    """Hash an action's frame range and fcurve keyframes."""
+    digest = hashlib.sha1()
+    digest.update(f"{action.frame_range[0]:.4f}:{action.frame_range[1]:.4f}\n".encode('utf-8'))
+    for fcurve in action.fcurves:
+        points = fcurve.keyframe_points
+        digest.update(f"{fcurve.data_path}[{fcurve.array_index}]:{len(points)}:{fcurve.mute}\n".encode('utf-8'))
+        if not points: continue
+        values = np.empty(len(points) * 2, dtype=np.float32)
+        for attribute in ("co", "handle_left", "handle_right"):
+            points.foreach_get(attribute, values); digest.update(values.tobytes())
+        modes = np.empty(len(points), dtype=np.int32)
+        points.foreach_get("interpolation", modes); digest.update(modes.tobytes())
+    return digest.hexdigest()
+
+def action_fingerprint(action, armature, scene, rig_hash=None):
+    """Hash everything about an action export that can change the written FBX."""
+    digest = hashlib.sha1()
+    digest.update(action_keys_fingerprint(action).encode('utf-8'))
+    digest.update((rig_hash or armature_fingerprint(armature)).encode('utf-8'))
+    digest.update(f"{scene.unit_settings.system}:{scene.unit_settings.scale_length:.6f}\n".encode('utf-8'))
+    digest.update(json.dumps(fbx_export_settings(scene), sort_keys=True).encode('utf-8'))
+    digest.update(scene.animation_backend.encode('utf-8'))
+    if scene.use_key_reduction and not action.export_dense:
+        digest.update(f"reduce:{scene.reduction_translation_tolerance}:{scene.reduction_rotation_tolerance}:{scene.reduction_scale_tolerance}".encode('utf-8'))
+    return digest.hexdigest()
+
+def load_export_manifest(export_path):
+    """Read the manifest in the export directory, or return an empty one."""
+    manifest_file = os.path.join(export_path, MANIFEST_NAME)
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f: manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION: return manifest
+    except (OSError, ValueError): pass
+    return {"version": MANIFEST_VERSION, "entries": {}}
+
+def save_export_manifest(export_path, manifest):
+    """Write the manifest atomically so an interrupted run never leaves it half-written."""
+    manifest_file = os.path.join(export_path, MANIFEST_NAME)
+    temp_file = manifest_file + ".tmp"
+    with open(temp_file, 'w', encoding='utf-8') as f: json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(temp_file, manifest_file)
+
+def filter_unchanged_actions(scene, armature, actions, export_path, manifest, existing_files=None):
+    """Split actions into (to_export, skipped) and return the fresh fingerprints by file name.
+
+    existing_files: names present in the export directory (from the export plan's scan), to avoid a stat per action.
+    """
+    rig_hash = armature_fingerprint(armature)
+    entries = manifest["entries"]
+    to_export, skipped, fingerprints = [], [], {}
+    for action in actions:
+        base_fingerprint = action_fingerprint(action, armature, scene, rig_hash)
+        unchanged = not scene.export_force
+        for name, file_name, start, end, is_clip in action_targets(scene, action): # Marker clips are skipped only all together (they share one bake)
+            fingerprint = hashlib.sha1(f"{base_fingerprint}:{start}:{end}".encode('utf-8')).hexdigest() if is_clip else base_fingerprint
+            fingerprints[file_name] = fingerprint
+            entry = entries.get(file_name)
+            unchanged = unchanged and bool(entry) and entry.get("fingerprint") == fingerprint \
+                and (file_name in existing_files if existing_files is not None else os.path.exists(os.path.join(export_path, file_name)))
+        (skipped if unchanged else to_export).append(action)
+    return to_export, skipped, fingerprints
+
+def filter_unchanged_jobs(scene, jobs, fingerprint_of, manifest, existing_files=None):
+    """Split plan jobs that export one file each into (to_export, skipped) and return the fresh fingerprints by file name."""
+    to_export, skipped, fingerprints = [], [], {}
+    for job in jobs:
+        fingerprint = fingerprints[job["file_name"]] = fingerprint_of(job)
+        entry = manifest["entries"].get(job["file_name"])
+        unchanged = not scene.export_force and bool(entry) and entry.get("fingerprint") == fingerprint \
+            and (job["file_name"] in existing_files if existing_files is not None else os.path.exists(job["path"]))
+        (skipped if unchanged else to_export).append(job)
+    return to_export, skipped, fingerprints
+
+
+# --- Bake Cache (sampled bone transforms shared by every export variant) ---
+# Sampling an action drives scene.frame_set() once per frame, which is the expensive part of an
+# animation export. The fast writer therefore pulls every action's sampled transforms from this
+# cache. Entries hold the parent-relative matrices of *all* bones plus the armature's world matrix
+# as compact float32 arrays, so changing the axis preset or deform-only setting reuses them.
+# Entries are keyed by action keyframes + rig (including the constraint and driver targets, NLA
+# state and drivers that shape its pose) + sample frames, kept in memory for the session and
+# persisted as .npz sidecars in the local per-user cache directory (not the export directory, which
+# may be a network share seen by other users); the least recently used sidecars are evicted past a
+# disk budget. BATCH_FBX_CACHE_DIR overrides the location.
+BAKE_CACHE_DIR = os.path.join("batch_fbx_exporter", "bake")
+BAKE_CACHE_MEMORY_ENTRIES = 16
+
+class BakeSamples:
+    """Sampled local bone transforms of one action: local (frames, bones, 3, 4), world (frames, 3, 4)."""
+    def __init__(self, bone_names, local, world):
+        self.bone_names = list(bone_names); self.local = local; self.world = world
+        self.bone_index = {name: index for index, name in enumerate(self.bone_names)}
+
+    @staticmethod
+    def expand(matrices):
+        full = np.zeros(matrices.shape[:-2] + (4, 4), dtype=np.float64)
+        full[..., :3, :] = matrices; full[..., 3, 3] = 1.0
+        return full
+
+    def local_matrices(self, index=None):
+        return self.expand(self.local if index is None else self.local[:, index])
+
+    def world_matrices(self):
+        return self.expand(self.world)
+
+    @property
+    def nbytes(self):
+        return self.local.nbytes + self.world.nbytes
+
+class BakeCache:
+    """Two-level (memory + .npz on disk) LRU cache of BakeSamples."""
+    def __init__(self):
+        self.memory = {} # key -> BakeSamples, insertion order is recency
+
+    def get(self, key, cache_dir):
+        if key in self.memory:
+            samples = self.memory.pop(key); self.memory[key] = samples
+            return samples
+        if not cache_dir: return None
+        cache_file = os.path.join(cache_dir, key + ".npz")
+        try:
+            with np.load(cache_file, allow_pickle=False) as data:
+                samples = BakeSamples(data["bones"].tolist(), data["local"], data["world"])
+            os.utime(cache_file) # Touch for LRU eviction
+        except (OSError, ValueError, KeyError):
+            return None
+        self.remember(key, samples)
+        return samples
+
+    def put(self, key, samples, cache_dir, budget_bytes):
+        self.remember(key, samples)
+        if not cache_dir: return
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            cache_file = os.path.join(cache_dir, key + ".npz")
+            temp_file = cache_file + f".{os.getpid()}.tmp"
+            with open(temp_file, 'wb') as f: np.savez(f, bones=np.array(samples.bone_names), local=samples.local, world=samples.world)
+            os.replace(temp_file, cache_file)
+            self.evict(cache_dir, budget_bytes)
+        except OSError as e: print(f"Could not write bake cache entry {key}: {e}")
+
+    def remember(self, key, samples):
+        self.memory.pop(key, None); self.memory[key] = samples
+        while len(self.memory) > BAKE_CACHE_MEMORY_ENTRIES: self.memory.pop(next(iter(self.memory)))
+
+    def evict(self, cache_dir, budget_bytes):
+        """Delete the least recently used sidecars until the directory fits the disk budget."""
+        entries = []
+        with os.scandir(cache_dir) as scan:
+            for entry in scan:
+                if entry.name.endswith(".npz"):
+                    stat = entry.stat(); entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= budget_bytes: break
+            try: os.remove(path); total -= size
+            except FileNotFoundError: pass
+
+    def clear(self, cache_dir):
+        self.memory.clear()
+        if cache_dir: shutil.rmtree(cache_dir, ignore_errors=True)
+
+bake_cache = BakeCache()
+
+def nla_fingerprint(animation_data):
+    """NLA and action blending state of an animation data block, as text."""
+    if animation_data is None: return ""
+    parts = [f"{animation_data.use_nla}:{animation_data.use_tweak_mode}:{animation_data.action_blend_type}:{animation_data.action_influence:.4f}:{animation_data.action_extrapolation}"]
+    for track in animation_data.nla_tracks:
+        parts.append(f"{track.name}:{track.mute}:{track.is_solo}")
+        for strip in track.strips:
+            action = strip.action
+            parts.append(f"{strip.name}:{action_keys_fingerprint(action) if action else ''}:{strip.mute}:{strip.frame_start:.4f}:{strip.frame_end:.4f}:{strip.action_frame_start:.4f}:{strip.action_frame_end:.4f}"
+                         f":{strip.scale:.4f}:{strip.repeat:.4f}:{strip.blend_type}:{strip.extrapolation}:{strip.influence:.4f}:{strip.use_reverse}")
+    return "|".join(parts)
+
+def driver_fingerprint(driver):
+    """Expression, variables and variable targets of a driver, as text."""
+    parts = [f"{driver.type}:{driver.expression}:{driver.use_self}"]
+    for variable in driver.variables:
+        parts.append(f"{variable.name}:{variable.type}")
+        for target in variable.targets:
+            parts.append(f"{target.id.name if target.id else ''}:{target.data_path}:{target.bone_target}:{target.transform_type}:{target.transform_space}:{target.rotation_mode}")
+    return "|".join(parts)
+
+def rig_pose_fingerprint(armature):
+    """Hash the rig plus everything besides keyframes that drives its evaluated pose."""
+    digest = hashlib.sha1(armature_fingerprint(armature).encode('utf-8'))
+    digest.update(np.array(armature.matrix_world, dtype=np.float32).tobytes())
+    targets = {} # Objects and other IDs the pose depends on, hashed with their own state below
+    for pose_bone in armature.pose.bones:
+        digest.update(f"{pose_bone.name}:{pose_bone.rotation_mode}".encode('utf-8'))
+        for constraint in pose_bone.constraints:
+            digest.update(f"|{constraint.type}:{constraint.mute}:{constraint.influence:.4f}".encode('utf-8'))
+            bindings = [(getattr(constraint, "target", None), getattr(constraint, "subtarget", "")), (getattr(constraint, "pole_target", None), getattr(constraint, "pole_subtarget", ""))]
+            bindings += [(target.target, target.subtarget) for target in getattr(constraint, "targets", ())] # Armature constraint
+            for target, subtarget in bindings:
+                digest.update(f":{target.name if target else ''}:{subtarget}".encode('utf-8'))
+                if target is not None and target != armature: targets[target.name_full] = target
+    if armature.animation_data:
+        digest.update(nla_fingerprint(armature.animation_data).encode('utf-8'))
+        for fcurve in armature.animation_data.drivers:
+            digest.update(f"|{fcurve.data_path}[{fcurve.array_index}]:{fcurve.mute}:{driver_fingerprint(fcurve.driver)}".encode('utf-8'))
+            for variable in fcurve.driver.variables:
+                for target in variable.targets:
+                    if target.id is not None and target.id != armature: targets[target.id.name_full] = target.id
+    for name in sorted(targets):
+        # A target's transform, animation and drivers move the constrained or driven bones
+        target = targets[name]; digest.update(f"|{name}".encode('utf-8'))
+        if hasattr(target, "matrix_world"): digest.update(np.array(target.matrix_world, dtype=np.float32).tobytes())
+        if getattr(target, "type", None) == 'ARMATURE' and target.pose:
+            matrices = np.empty(len(target.pose.bones) * 16, dtype=np.float32); target.pose.bones.foreach_get("matrix", matrices); digest.update(matrices.tobytes())
+        animation_data = getattr(target, "animation_data", None)
+        if animation_data:
+            action = animation_data.action
+            digest.update(f"{action_keys_fingerprint(action) if action else ''}:{nla_fingerprint(animation_data)}".encode('utf-8'))
+            for fcurve in animation_data.drivers: digest.update(f"|{fcurve.data_path}[{fcurve.array_index}]:{driver_fingerprint(fcurve.driver)}".encode('utf-8'))
+    return digest.hexdigest()
+
+def bake_cache_key(action, armature, frames):
+    """Cache key: action keyframes + rig + sample frames (start, end and step)."""
+    step = float(frames[1] - frames[0]) if len(frames) > 1 else 1.0
+    source = f"{action_keys_fingerprint(action)}:{rig_pose_fingerprint(armature)}:{frames[0]:.4f}:{frames[-1]:.4f}:{step:.4f}"
+    return hashlib.sha1(source.encode('utf-8')).hexdigest()
+
+def user_cache_root():
+    """Local per-user cache directory of the platform."""
+    home = os.path.expanduser("~")
+    if sys.platform == 'win32': return os.environ.get("LOCALAPPDATA") or os.path.join(home, "AppData", "Local")
+    if sys.platform == 'darwin': return os.path.join(home, "Library", "Caches")
+    return os.environ.get("XDG_CACHE_HOME") or os.path.join(home, ".cache")
+
+def bake_cache_dir():
+    """Directory of the persistent cache sidecars."""
+    return os.environ.get("BATCH_FBX_CACHE_DIR") or os.path.join(user_cache_root(), BAKE_CACHE_DIR)
+
+def bake_action_samples(context, armature, frames):
+    """Sample every bone of the armature's current action once per frame."""
+    bone_names = [bone.name for bone in armature.data.bones]
+    lookup = {name: index for index, name in enumerate(bone_names)}
+    parents = np.array([lookup[bone.parent.name] if bone.parent else -1 for bone in armature.data.bones], dtype=np.int64)
+    poses, worlds = sample_pose_matrices(context, armature, bone_names, frames)
+    local = local_matrices(poses, parents)[..., :3, :].astype(np.float32)
+    return BakeSamples(bone_names, local, worlds[..., :3, :].astype(np.float32))
+
+def action_samples(context, armature, action, frames):
+    """Sampled transforms for an action, from the bake cache when possible."""
+    scene = context.scene
+    if action is None or not scene.use_bake_cache: return bake_action_samples(context, armature, frames)
+    key = bake_cache_key(action, armature, frames)
+    cache_dir = bake_cache_dir()
+    samples = bake_cache.get(key, cache_dir)
+    if samples is None:
+        samples = bake_action_samples(context, armature, frames)
+        bake_cache.put(key, samples, cache_dir, scene.bake_cache_budget_mb * 1024 * 1024)
+    return samples
+
+
+# --- Deform-Only Proxy Armature (FBX operator backend) ---
+# The stock exporter evaluates the whole control rig (constraints, drivers, IK) again on every
+# baked frame. With the proxy on, each action is sampled once through the bake cache and its bone
+# transforms are keyed onto a plain armature that holds only the exported bones. The operator then
+# bakes that armature instead. Only for the duration of each operator call does the proxy take the
+# character armature's object name (so the skeleton in the FBX is unchanged) and the original lose
+# its action; both are given back right after the call, even when it fails. The proxy is deleted
+# when the batch ends.
+PROXY_SUFFIX = ".deform_proxy"
+PROXY_SOURCE_SUFFIX = ".proxy_source"
+LINEAR_INTERPOLATION = 1 # Enum index of 'LINEAR' in Keyframe.interpolation
+
+def key_channel(action, data_path, index, group, frames, values):
+    """Add one fcurve with a linear key per sampled frame, written in bulk."""
+    curve = action.fcurves.new(data_path, index=index, action_group=group)
+    points = curve.keyframe_points
+    points.add(len(frames))
+    points.foreach_set("co", np.column_stack((frames, values)).astype(np.float32).ravel())
+    points.foreach_set("interpolation", np.full(len(frames), LINEAR_INTERPOLATION, dtype=np.int32))
+    curve.update()
+
+class DeformProxy:
+    """Constraint-free copy of an armature's exported bones that carries one pre-baked action at a time."""
+    def __init__(self, armature):
+        self.armature = armature; self.name = armature.name
+        self.object = None; self.action = None; self.bone_names = None; self.rest_local = None
+
+    def build(self, context):
+        """Create the proxy armature with the same bone names, hierarchy and rest pose."""
+        armature = self.armature; source_bones = armature.data.bones
+        self.bone_names, parents = animation_bones(armature, context.scene.use_armature_deform_only)
+        if not self.bone_names: raise RuntimeError(f"Armature '{armature.name}' has no bones to export.")
+        data = bpy.data.armatures.new(armature.data.name + PROXY_SUFFIX)
+        self.object = proxy = bpy.data.objects.new(self.name + PROXY_SUFFIX, data)
+        context.scene.collection.objects.link(proxy)
+        select_only(context, [proxy], proxy)
+        bpy.ops.object.mode_set(mode='EDIT')
+        try:
+            for name, parent in zip(self.bone_names, parents):
+                bone = source_bones[name]
+                edit_bone = data.edit_bones.new(name)
+                edit_bone.head = (0.0, 0.0, 0.0); edit_bone.tail = (0.0, bone.length, 0.0)
+                edit_bone.matrix = bone.matrix_local # Head, orientation and roll of the original rest pose
+                edit_bone.use_deform = bone.use_deform
+                if parent >= 0: edit_bone.parent = data.edit_bones[self.bone_names[parent]]
+        finally:
+            bpy.ops.object.mode_set(mode='OBJECT')
+        for pose_bone in proxy.pose.bones: pose_bone.rotation_mode = 'XYZ'
+        rest = np.array([np.array(data.bones[name].matrix_local, dtype=np.float64) for name in self.bone_names])
+        self.rest_local = local_matrices(rest, parents)
+
+    @contextlib.contextmanager
+    def exporting(self):
+        """Give the proxy the armature's name and unassign the original's action for one operator call."""
+        armature, proxy = self.armature, self.object
+        animation_data = armature.animation_data; action = animation_data.action if animation_data else None
+        armature.name = self.name + PROXY_SOURCE_SUFFIX; proxy.name = self.name
+        # Unassigned, the original rig (and the meshes skinned to it) is not re-evaluated per baked frame
+        if animation_data: animation_data.action = None
+        try: yield
+        finally:
+            try:
+                proxy.name = self.name + PROXY_SUFFIX; armature.name = self.name
+                if animation_data: animation_data.action = action
+            except ReferenceError: pass
+
+    def use_action(self, context, action):
+        """Key the action over the scene frame range onto the proxy and select the proxy for export."""
+        scene = context.scene
+        if active_export_session is not None and active_export_session.scene == scene: active_export_session.prepare(True)
+        if self.object is None:
+            with timed("proxy_build"): self.build(context)
+        self.release_action()
+        frames = np.arange(scene.frame_start, scene.frame_end + 1, fbx_export_settings(scene)["bake_anim_step"], dtype=np.float64)
+        with timed("sample"): samples = action_samples(context, self.armature, action, frames)
+        with timed("proxy_keys"):
+            # Proxy bones inherit fully, so pose = parent pose @ rest local @ basis for every bone
+            local = samples.local_matrices([samples.bone_index[name] for name in self.bone_names])
+            location, rotation, scale = decompose_matrices(np.linalg.inv(self.rest_local) @ local, unwrap=True)
+            self.action = proxy_action = bpy.data.actions.new(action.name + PROXY_SUFFIX)
+            proxy_action["export"] = False # Raw write, keeps it out of the export registry
+            for index, name in enumerate(self.bone_names):
+                path = f'pose.bones["{bpy.utils.escape_identifier(name)}"]'
+                for attribute, values in (("location", location), ("rotation_euler", np.radians(rotation)), ("scale", scale)):
+                    for axis in range(3): key_channel(proxy_action, f"{path}.{attribute}", axis, name, frames, values[:, index, axis])
+            world = samples.world_matrices()
+            location, rotation, scale = decompose_matrices(world, unwrap=True)
+            if np.ptp(world, axis=0).max() > 1e-6: # Object-level animation on the original armature
+                for attribute, values in (("location", location), ("rotation_euler", np.radians(rotation)), ("scale", scale)):
+                    for axis in range(3): key_channel(proxy_action, attribute, axis, "Object Transforms", frames, values[:, axis])
+            else:
+                proxy = self.object
+                proxy.location = location[0]; proxy.rotation_euler = np.radians(rotation[0]); proxy.scale = scale[0]
+            self.object.animation_data_create().action = proxy_action
+        with timed("select"): select_only(context, [self.object], self.object)
+
+    def release_action(self):
+        """Delete the proxy action of the previous export."""
+        if self.action is None: return
+        try: bpy.data.actions.remove(self.action)
+        except ReferenceError: pass
+        self.action = None
+
+    def cleanup(self):
+        """Delete the proxy and make sure the character armature has its name."""
+        self.release_action()
+        if self.object is not None:
+            try:
+                data = self.object.data
+                bpy.data.objects.remove(self.object); bpy.data.armatures.remove(data)
+            except ReferenceError: pass
+            self.object = None
+        try:
+            if self.armature.name != self.name: self.armature.name = self.name
+        except ReferenceError: pass
+
+def deform_proxy(scene, armature):
+    """DeformProxy for a batch when the option applies (FBX operator backend), else None."""
+    if not armature or not scene.use_deform_proxy or scene.animation_backend != 'OPERATOR': return None
+    return DeformProxy(armature)
+
+
+# --- Export Plan ---
+# The plan lists every job of a batch with its target path, whether the file exists, name
+# collisions and an estimated cost (frames x bones x meshes). It is built once from a single
+# os.scandir() of the export directory (one round trip on network shares) and consumed by the
+# overwrite dialog, the export itself and the dry run. Estimated seconds come from per-kind cost
+# rates that are recalibrated from the measured durations after every run.
+DEFAULT_COST_RATES = {"CHARACTER": 2e-4, "ANIMATION:OPERATOR": 6e-5, "ANIMATION:FAST": 1e-5} # Seconds per cost unit
+INVALID_FILE_CHARS = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+
+def action_file_name(action_name):
+    """File name an action is exported to."""
+    return f"{action_name if action_name.strip() else 'UnnamedAnimation'}.fbx"
+
+def character_file_name(scene):
+    return f"{scene.character_name if scene.character_name.strip() else 'Character'}.fbx"
+
+def cost_rates(scene):
+    rates = dict(DEFAULT_COST_RATES)
+    try: rates.update(json.loads(scene.export_cost_rates or "{}"))
+    except ValueError: pass
+    return rates
+
+class ExportPlan:
+    """Jobs of a batch export with targets, collisions, existing files and cost, computed once.
+
+    scope ({"character": bool, "actions": [names]}) limits the plan to those jobs, e.g. for watch mode.
+    """
+    def __init__(self, context, scope=None):
+        scene = context.scene
+        self.export_path = bpy.path.abspath(scene.batch_export_path)
+        self.backend = scene.animation_backend
+        self.workers = scene.export_workers if scene.export_parallel and scene.animation_file_mode == 'PER_ACTION' else 1
+        self.character_workers = scene.export_workers if scene.export_parallel and scene.character_split != 'NONE' else 1
+        self.rates = cost_rates(scene)
+        self.jobs = []; self.warnings = []; self.mismatches = [] # (action name, bone match %) below the threshold
+        self.existing = set()
+        if self.export_path and os.path.isdir(self.export_path):
+            with os.scandir(self.export_path) as scan: self.existing = {entry.name for entry in scan if entry.is_file()}
+
+        armature = scene.character_armature
+        bone_count = len(animation_bones(armature, scene.use_armature_deform_only)[0]) if armature and armature.type == 'ARMATURE' else 0
+        self.export_character = scene.export_character and (scope is None or scope["character"])
+        self.export_animations = scene.export_animations and (scope is None or bool(scope["actions"]))
+        if self.export_character and armature and scene.character_split != 'NONE':
+            for part in character_parts(scene, armature, context.view_layer):
+                job = self.add_job('CHARACTER', part["name"], part["file_name"], 1, bone_count, max(1, len(part["meshes"])))
+                job["part"] = part
+        elif self.export_character:
+            meshes = [item.object for item in scene.character_objects if item.object and item.export and item.object.name in scene.objects]
+            if scene.export_lods and armature:
+                known = {obj.name for obj in meshes}
+                meshes += [obj for levels in lod_index(scene).lod_groups(scene, armature, context.view_layer).values() for level, obj in levels if level > 0 and obj.name not in known]
+            name = character_file_name(scene)[:-4]
+            self.add_job('CHARACTER', name, character_file_name(scene), 1, bone_count, max(1, len(meshes)))
+        if self.export_animations and armature:
+            scoped = None if scope is None else set(scope["actions"])
+            policy = scene.rig_mismatch_policy; reported = set()
+            def check(action):
+                match, low = rig_mismatch(scene, action, armature)
+                if low and action.name not in reported: reported.add(action.name); self.mismatches.append((action.name, match)) # Once per action, even if several NLA strips use it
+                return match, low
+            if scene.animation_file_mode == 'TAKES':
+                # One job per group; an edited action re-exports its whole group. Prefix groups and NLA strips get the same rig check.
+                for group, takes in take_groups(scene, armature, export_registry.flagged_actions()).items():
+                    if scoped is not None and not any(action.name in scoped for _, action, _, _ in takes): continue
+                    kept, matches = [], []
+                    for take_name, action, start, end in takes:
+                        match, low = check(action)
+                        if match is not None: matches.append(match)
+                        if not (low and policy == 'SKIP'): kept.append((take_name, action.name, start, end))
+                    job = self.add_job('ANIMATION', group, action_file_name(group), sum(end - start + 1 for _, _, start, end in kept), bone_count, 1)
+                    job["takes"] = kept; job["match"] = min(matches) if matches else None
+                    if not kept: job["skip"] = f"none of its takes match '{armature.name}'"
+            else:
+                for action in export_registry.flagged_actions():
+                    if scoped is not None and action.name not in scoped: continue
+                    match, low = check(action)
+                    for name, file_name, start, end, is_clip in action_targets(scene, action, self.warnings):
+                        job = self.add_job('ANIMATION', name, file_name, int(end) - int(start) + 1, bone_count, 1, action.name)
+                        job["match"] = match
+                        if low and policy == 'SKIP': job["skip"] = f"only {match:.0f}% of its animated bones are on '{armature.name}'"
+        self.find_collisions()
+
+    def add_job(self, kind, name, file_name, frames, bones, meshes, action=None):
+        job = {"kind": kind, "name": name, "action": action, "file_name": file_name, "path": os.path.join(self.export_path, file_name),
+               "exists": file_name in self.existing, "collision": "", "skip": "", "match": None, "takes": None, "part": None, "frames": frames, "bones": bones, "meshes": meshes,
+               "cost": frames * max(1, bones) * meshes}
+        self.jobs.append(job)
+        return job
+
+    def find_collisions(self):
+        """Flag jobs whose file name is invalid or already claimed by an earlier job (case-insensitive, like SMB/NTFS)."""
+        claimed = {}
+        for job in self.jobs:
+            if INVALID_FILE_CHARS.search(job["file_name"]):
+                job["collision"] = "invalid characters in file name"; continue
+            key = job["file_name"].casefold()
+            if key in claimed:
+                owner = claimed[key]
+                job["collision"] = f"same file as the character export '{owner['name']}'" if owner["kind"] == 'CHARACTER' else f"same file as {'take group' if owner['takes'] is not None else 'action'} '{owner['name']}'"
+            else: claimed[key] = job
+        # Clips of one action share a bake and are exported together, so a collision blocks its siblings too
+        blocked = {job["action"]: job["name"] for job in self.jobs if job["collision"] and job["action"]}
+        for job in self.jobs:
+            if not job["collision"] and job["action"] in blocked: job["collision"] = f"clip '{blocked[job['action']]}' of the same action collides"
+
+    @property
+    def collisions(self):
+        return [job for job in self.jobs if job["collision"]]
+
+    def actions(self):
+        """Actions of the animation jobs that can be exported (no collision, not skipped)."""
+        names = dict.fromkeys(job["action"] for job in self.jobs if job["kind"] == 'ANIMATION' and job["action"] and not job["collision"] and not job["skip"])
+        return [action for action in (bpy.data.actions.get(name) for name in names) if action]
+
+    def take_jobs(self):
+        """Multi-take jobs that can be exported (no collision, not skipped)."""
+        return [job for job in self.jobs if job["takes"] is not None and not job["collision"] and not job["skip"]]
+
+    def rate(self, job):
+        return self.rates["CHARACTER"] if job["kind"] == 'CHARACTER' else self.rates[f"ANIMATION:{self.backend}"]
+
+    def estimate_seconds(self, job=None):
+        if job is not None: return job["cost"] * self.rate(job)
+        character = sum(self.estimate_seconds(job) for job in self.jobs if job["kind"] == 'CHARACTER' and not job["collision"])
+        animation = sum(self.estimate_seconds(job) for job in self.jobs if job["kind"] == 'ANIMATION' and not job["collision"] and not job["skip"])
+        return character / max(1, self.character_workers) + animation / max(1, self.workers)
+
+    def calibrate(self, scene, results):
+        """Update the cost rates from measured durations (moving average, stored on the scene)."""
+        costs = {(job["kind"], job["name"]): job["cost"] for job in self.jobs}
+        rates = cost_rates(scene); changed = False
+        for kind, key in (('CHARACTER', "CHARACTER"), ('ANIMATION', f"ANIMATION:{self.backend}")):
+            measured = [(record["duration"], costs[(kind, record["name"])]) for record in results if record["status"] == 'OK' and record["kind"] == kind and (kind, record["name"]) in costs]
+            total_cost = sum(cost for _, cost in measured)
+            if total_cost:
+                rate = sum(duration for duration, _ in measured) / total_cost
+                rates[key] = 0.5 * rates[key] + 0.5 * rate; changed = True
+        if changed:
+            try: scene.export_cost_rates = json.dumps(rates)
+            except Exception as e: print(f"Could not store export cost rates: {e}")
+
+    def summary_lines(self, limit=None):
+        lines = []
+        for job in self.jobs[:limit]:
+            state = f"COLLISION: {job['collision']}" if job["collision"] else (f"SKIP: {job['skip']}" if job["skip"] else ("overwrite" if job["exists"] else "new"))
+            if job["match"] is not None and job["match"] < 100.0: state += f", {job['match']:.0f}% bone match"
+            if job["takes"] is not None: state += f", {len(job['takes'])} takes"
+            lines.append(f"{job['kind'][:4]}  {job['file_name']}  [{state}]  {job['frames']}f x {job['bones']}b x {job['meshes']}m  ~{self.estimate_seconds(job):.1f}s")
+        return lines
+
+
+# --- Parallel Export (Headless Worker Pool) ---
+# The coordinator saves a snapshot of the current .blend, splits the flagged actions (or the
+# files of a split character export) into shards and runs one `blender -b` process per shard.
+# Every worker re-registers this add-on, exports its shard through export_action() or
+# export_character_part() (the same code paths as the serial export) and writes its result
+# records to a JSON file that the coordinator merges into the final report.
+def shard_actions(actions, worker_count):
+    """Split actions into balanced shards, longest clips first, by frame count."""
+    shards = [[] for _ in range(max(1, worker_count))]
+    loads = [0] * len(shards)
+    for action in sorted(actions, key=lambda a: a.frame_range[1] - a.frame_range[0], reverse=True):
+        index = loads.index(min(loads))
+        shards[index].append(action.name)
+        loads[index] += int(action.frame_range[1] - action.frame_range[0]) + 1
+    return [shard for shard in shards if shard]
+
+def shard_parts(parts, worker_count):
+    """Split character parts into balanced shards, largest first, by vertex count."""
+    shards = [[] for _ in range(max(1, worker_count))]
+    loads = [0] * len(shards)
+    for part in sorted(parts, key=lambda part: part["cost"], reverse=True):
+        index = loads.index(min(loads))
+        shards[index].append(part); loads[index] += max(1, part["cost"])
+    return [shard for shard in shards if shard]
+
+def worker_command(blend_file, spec_file):
+    """Build the command line for a headless Blender worker process."""
+    script_file = os.path.abspath(__file__)
+    return [bpy.app.binary_path, "-b", "--factory-startup", blend_file, "--python", script_file, "--", "--worker", spec_file]
+
+def run_parallel_action_export(context, armature, actions, export_path, worker_count):
+    """Export actions across a pool of headless Blender workers and return the merged result records."""
+    return run_worker_pool(context, armature, export_path, [{"actions": shard} for shard in shard_actions(actions, worker_count)], worker_count)
+
+def run_parallel_character_export(context, armature, parts, export_path, worker_count):
+    """Export character parts across a pool of headless Blender workers and return the merged result records."""
+    return run_worker_pool(context, armature, export_path, [{"parts": shard} for shard in shard_parts(parts, worker_count)], worker_count)
+
+def run_worker_pool(context, armature, export_path, shards, worker_count):
+    """Run one headless worker per shard ({"actions": names} or {"parts": parts}), at most worker_count at once, on a snapshot and merge their result records."""
+    if not os.path.isfile(os.path.abspath(__file__)): raise RuntimeError("Parallel export requires the add-on to be installed from a .py file.")
+    scene = context.scene
+    work_dir = tempfile.mkdtemp(prefix="batch_fbx_")
+    results = []
+    try:
+        snapshot_file = os.path.join(work_dir, "snapshot.blend")
+        bpy.ops.wm.save_as_mainfile(filepath=snapshot_file, copy=True, check_existing=False)
+
+        def collect(worker):
+            process, log, spec, log_file = worker
+            return_code = process.wait(); log.close()
+            worker_results = []
+            if os.path.exists(spec["result_file"]):
+                try:
+                    with open(spec["result_file"], 'r', encoding='utf-8') as f: worker_results = json.load(f)
+                except (OSError, ValueError) as e_read: print(f"Could not read worker results {spec['result_file']}: {e_read}")
+            done = {record.get("action", record["name"]) for record in worker_results}
+            expected = [(name, action_file_name(name), 'ANIMATION') for name in spec.get("actions", [])] + [(part["name"], part["file_name"], 'CHARACTER') for part in spec.get("parts", [])]
+            for name, file_name, kind in expected:
+                if name not in done:
+                    worker_results.append(new_result(name, os.path.join(export_path, file_name), kind=kind, error=f"Worker exited with code {return_code} before exporting '{name}'. See {os.path.basename(log_file)}."))
+            if return_code != 0:
+                with open(log_file, 'r', encoding='utf-8', errors='replace') as f: print(f.read())
+            results.extend(worker_results)
+
+        running = []
+        for index, shard in enumerate(shards):
+            if len(running) >= max(1, worker_count): collect(running.pop(0)) # Never more Blender processes at once than workers
+            spec_file = os.path.join(work_dir, f"worker_{index}.json")
+            result_file = os.path.join(work_dir, f"worker_{index}_result.json")
+            log_file = os.path.join(work_dir, f"worker_{index}.log")
+            spec = dict(shard, scene=scene.name, armature=armature.name, export_path=export_path, result_file=result_file)
+            with open(spec_file, 'w', encoding='utf-8') as f: json.dump(spec, f)
+            log = open(log_file, 'w', encoding='utf-8')
+            process = subprocess.Popen(worker_command(snapshot_file, spec_file), stdout=log, stderr=subprocess.STDOUT)
+            running.append((process, log, spec, log_file))
+        for worker in running: collect(worker)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+def run_worker(spec_file):
+    """Worker entry point: export one shard of actions or character parts from the snapshot and write the result records."""
+    with open(spec_file, 'r', encoding='utf-8') as f: spec = json.load(f)
+    context = bpy.context
+    scene = bpy.data.scenes.get(spec["scene"])
+    if scene and context.window and context.window.scene != scene: context.window.scene = scene
+    scene = context.scene
+    armature = bpy.data.objects.get(spec["armature"])
+    results = []; remaining = None
+    memory = memory_guard(context)
+    with ExportSession(context, armature) as session:
+        session.staging = staging_pipeline(scene); session.proxy = deform_proxy(scene, armature)
+        try:
+            if spec.get("parts"):
+                if armature and armature.animation_data: armature.animation_data.action = None # Rest pose meshes, as in the batch
+                texture_store = TextureStore(texture_store_root(scene, spec["export_path"])) if scene.texture_mode == 'STORE' else None
+                for part in spec["parts"]:
+                    result = export_character_part(context, armature, part, spec["export_path"], texture_store)
+                    if memory: memory.after_export(result)
+                    results.append(result)
+            for index, name in enumerate(spec.get("actions", [])):
+                remaining = remaining_action_names(memory, spec["actions"], index)
+                if remaining: break
+                action = bpy.data.actions.get(name)
+                if not armature or not armature.animation_data or not action:
+                    results.append(new_result(name, os.path.join(spec["export_path"], action_file_name(name)), error=f"Armature or action '{name}' missing in worker snapshot."))
+                    continue
+                for result in export_action_results(context, armature, action, spec["export_path"]):
+                    if memory: memory.after_export(result)
+                    results.append(result)
+                if session.staging is None:
+                    with open(spec["result_file"], 'w', encoding='utf-8') as f: json.dump(results, f)
+        finally:
+            if session.proxy: session.proxy.cleanup()
+        if session.staging: session.staging.close() # Results are final only once their transfer is done
+    if remaining: results.extend(hand_off_worker(spec, remaining))
+    with open(spec["result_file"], 'w', encoding='utf-8') as f: json.dump(results, f)
+    return 0 if all(record["status"] == 'OK' for record in results) else 1
+
+def hand_off_worker(spec, action_names):
+    """Export the rest of a worker's shard in a fresh worker process and return its result records."""
+    child = dict(spec, actions=action_names, result_file=spec["result_file"] + ".handoff.json")
+    spec_file = child["result_file"] + ".spec.json" # Next to the shard's files, removed with the pool's work directory
+    with open(spec_file, 'w', encoding='utf-8') as f: json.dump(child, f)
+    subprocess.run(worker_command(bpy.data.filepath, spec_file)) # Output goes to the same worker log
+    try:
+        with open(child["result_file"], 'r', encoding='utf-8') as f: return json.load(f)
+    except (OSError, ValueError): return [] # The pool reports the missing actions as errors
+
+
+# --- Character Profiles (several characters in one run) ---
+# Each enabled profile is turned into a job (the same format as headless job files) exporting into
+# its own subdirectory with an export_summary.json next to its files. Profiles run one after the
+# other in this process, or, with Parallel Export on, as concurrent headless Blender processes on a
+# snapshot of the .blend, scheduled longest first by their total action frame count.
+PROFILE_SUMMARY_NAME = "export_summary.json"
+
+def split_patterns(text):
+    return [pattern.strip() for pattern in text.split(";") if pattern.strip()]
+
+def profile_job(scene, profile, export_path):
+    """Job dict exporting one profile into its subdirectory of export_path."""
+    subdirectory = bpy.path.clean_name(profile.subdirectory.strip() or profile.name)
+    job = {"scene": scene.name, "export_path": os.path.join(export_path, subdirectory, ""), "character_name": profile.name,
+           "export_character": profile.export_character, "export_animations": profile.export_animations, "export_lods": profile.export_lods,
+           "meshes": [item.object.name for item in profile.objects if item.object and item.export],
+           "actions": {"include": split_patterns(profile.action_include) or ["*"], "exclude": split_patterns(profile.action_exclude), "flagged_only": profile.flagged_only}}
+    if profile.armature: job["armature"] = profile.armature.name
+    return job
+
+def profile_cost(job):
+    """Frames the profile's actions bake; used to start the longest profiles first."""
+    if not job["export_animations"]: return 0
+    filters = job["actions"]
+    return sum(action_frame_count(action) for action in bpy.data.actions
+               if any(fnmatch.fnmatchcase(action.name, pattern) for pattern in filters["include"]) and not any(fnmatch.fnmatchcase(action.name, pattern) for pattern in filters["exclude"])
+               and (action.export or not filters["flagged_only"]))
+
+def error_summary(job, error):
+    return {"job": job["character_name"], "blend": bpy.data.filepath, "status": 'ERROR', "errors": [error], "files": [], "duration": 0.0}
+
+def blender_job_command(blend_file, job_file, result_file):
+    """Command line running one job file on a .blend in a headless Blender process."""
+    return [bpy.app.binary_path, "-b", "--factory-startup", blend_file, "--python", os.path.abspath(__file__), "--", "--job", job_file, "--result", result_file]
+
+def read_job_summary(result_file, log_file):
+    """The JSON summary a job process wrote, or None (its log is printed) if it crashed before writing one."""
+    try:
+        with open(result_file, 'r', encoding='utf-8') as f: return json.load(f)
+    except (OSError, ValueError):
+        with open(log_file, 'r', encoding='utf-8', errors='replace') as f: print(f.read())
+        return None
+
+def run_process_queue(tasks, worker_count, launch, finished, work_dir):
+    """Run tasks as subprocesses in queue order, at most worker_count at a time.
+
+    launch(task, index, log) starts the process; finished(task, process, log_file) handles its exit and
+    returns True to run the task again (it is requeued at the front).
+    """
+    waiting = list(tasks); running = []; started = 0
+    try:
+        while waiting or running:
+            while waiting and len(running) < worker_count:
+                task = waiting.pop(0); log_file = os.path.join(work_dir, f"process_{started}.log")
+                log = open(log_file, 'w', encoding='utf-8')
+                try: running.append((launch(task, started, log), log, task, log_file))
+                except Exception: log.close(); raise
+                started += 1
+            time.sleep(0.1)
+            for entry in [entry for entry in running if entry[0].poll() is not None]:
+                process, log, task, log_file = entry
+                running.remove(entry); log.close()
+                if finished(task, process, log_file): waiting.insert(0, task)
+    finally:
+        # On an error or Ctrl+C, no Blender process may outlive the queue (or hold the work directory open)
+        for process, log, task, log_file in running:
+            if process.poll() is None: process.terminate()
+        for process, log, task, log_file in running:
+            try: process.wait(timeout=10)
+            except subprocess.TimeoutExpired: process.kill(); process.wait()
+            log.close()
+
+def run_profiles_serial(jobs):
+    """Export the profiles one by one in this process; returns {character name: summary}."""
+    summaries = {}
+    for job in jobs:
+        summary = export_job(job, job["character_name"])
+        with open(os.path.join(job["export_path"], PROFILE_SUMMARY_NAME), 'w', encoding='utf-8') as f: json.dump(summary, f, indent=1)
+        summaries[job["character_name"]] = summary
+    return summaries
+
+def run_profiles_parallel(jobs, worker_count):
+    """Export the profiles in up to worker_count concurrent headless Blender processes; returns {character name: summary}."""
+    if not os.path.isfile(os.path.abspath(__file__)): raise RuntimeError("Parallel export requires the add-on to be installed from a .py file.")
+    work_dir = tempfile.mkdtemp(prefix="batch_fbx_profiles_")
+    summaries = {}
+    try:
+        snapshot_file = os.path.join(work_dir, "snapshot.blend")
+        bpy.ops.wm.save_as_mainfile(filepath=snapshot_file, copy=True, check_existing=False)
+        def launch(job, index, log):
+            job = dict(job, options=dict(job.get("options", {}), parallel=False)) # One process per profile, no nested pools
+            job_file = os.path.join(work_dir, f"profile_{index}.json")
+            result_file = os.path.join(job["export_path"], PROFILE_SUMMARY_NAME)
+            with open(job_file, 'w', encoding='utf-8') as f: json.dump(job, f)
+            if os.path.exists(result_file): os.remove(result_file)
+            return subprocess.Popen(blender_job_command(snapshot_file, job_file, result_file), stdout=log, stderr=subprocess.STDOUT)
+        def finished(job, process, log_file):
+            summary = read_job_summary(os.path.join(job["export_path"], PROFILE_SUMMARY_NAME), log_file)
+            summary = summary or error_summary(job, f"Profile process exited with code {process.returncode} without a summary.")
+            summary["job"] = job["character_name"]
+            summaries[job["character_name"]] = summary
+        # Longest first keeps the workers evenly busy at the end
+        run_process_queue(sorted(jobs, key=profile_cost, reverse=True), worker_count, launch, finished, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return summaries
+
+
+# --- Library Driver (many .blend files) ---
+# Exports a whole directory tree of .blend files, each in its own headless Blender process using
+# the settings saved in that file. To schedule without opening every file, saving a .blend writes a
+# small hidden sidecar (".<name>.blend.batchfbx.json") with its export settings and cost (flagged
+# action frames x exported bones). Files without a current sidecar are peeked at through
+# bpy.data.libraries.load (datablock names only) and costed by their action count. Every file is
+# queued: its own process reads the saved settings plus the --job overrides, and reports the file as
+# skipped when they name no export path or armature. Files run longest first; a process that dies
+# without writing its summary is retried; one report covers everything.
+SIDECAR_SUFFIX = ".batchfbx.json"
+SIDECAR_VERSION = 1
+LIBRARY_REPORT_NAME = "batch_fbx_library_report.json"
+PEEK_FRAMES_PER_ACTION = 100; PEEK_BONES = 100 # Cost assumed for files without a sidecar
+SIDECAR_MTIME_TOLERANCE = 2.0 # Seconds; FAT and SMB shares store modification times at 2 s resolution
+
+def sidecar_path(blend_file):
+    folder, name = os.path.split(blend_file)
+    return os.path.join(folder, f".{name}{SIDECAR_SUFFIX}")
+
+def unconfigured_reason(scene):
+    """Why the scene's export settings can't run a batch, or "" when they can."""
+    if not scene.batch_export_path: return "No export path saved in this file."
+    if not (scene.export_character or scene.export_animations): return "Neither character nor animation export is enabled."
+    if scene.character_armature is None: return "No armature saved in this file."
+    return ""
+
+def export_sidecar(scene):
+    """Export settings and cost of the scene, as stored next to the saved .blend."""
+    armature = scene.character_armature
+    actions = export_registry.flagged_actions() if scene.export_animations and armature else []
+    bones = len(animation_bones(armature, scene.use_armature_deform_only)[0]) if armature and armature.type == 'ARMATURE' else 0
+    return {"version": SIDECAR_VERSION, "scene": scene.name, "blend_mtime": os.path.getmtime(bpy.data.filepath),
+            "configured": not unconfigured_reason(scene),
+            "armature": armature.name if armature else None, "actions": len(actions), "frames": sum(action_frame_count(action) for action in actions), "bones": bones,
+            "settings": {key: getattr(scene, prop) for key, prop in list(JOB_SCENE_KEYS.items()) + list(JOB_OPTION_KEYS.items())}}
+
+@persistent
+def library_sidecar_save(*args):
+    """Write the export sidecar of the file just saved."""
+    scene = bpy.context.scene
+    if not bpy.data.filepath or scene is None or not hasattr(scene, "batch_export_path"): return
+    try:
+        sidecar = export_sidecar(scene); target = sidecar_path(bpy.data.filepath)
+        with open(target + ".tmp", 'w', encoding='utf-8') as f: json.dump(sidecar, f, indent=1)
+        os.replace(target + ".tmp", target)
+    except Exception as e: print(f"Could not write export sidecar: {e}")
+
+def library_entry(blend_file):
+    """Scheduling record for one .blend: cost from its sidecar, or from a datablock peek when the sidecar is missing or stale."""
+    entry = {"file": blend_file, "source": 'SIDECAR', "configured": None, "actions": 0, "frames": 0, "bones": 0, "attempts": 0}
+    try:
+        with open(sidecar_path(blend_file), 'r', encoding='utf-8') as f: sidecar = json.load(f)
+        if sidecar.get("version") == SIDECAR_VERSION and abs(sidecar.get("blend_mtime", 0) - os.path.getmtime(blend_file)) <= SIDECAR_MTIME_TOLERANCE:
+            entry.update({key: sidecar[key] for key in ("configured", "actions", "frames", "bones")})
+            entry["cost"] = max(1, entry["frames"]) * max(1, entry["bones"])
+            return entry
+    except (OSError, ValueError, KeyError): pass
+    entry["source"] = 'PEEK' # Settings unknown until the file's own process opens it
+    try:
+        with bpy.data.libraries.load(blend_file) as (data_from, data_to): entry["actions"] = len(data_from.actions)
+    except Exception as e_peek: print(f"Could not read {blend_file}: {e_peek}"); entry["source"] = 'SIZE'
+    entry["cost"] = max(1, entry["actions"]) * PEEK_FRAMES_PER_ACTION * PEEK_BONES if entry["source"] == 'PEEK' else os.path.getsize(blend_file) // 1024
+    return entry
+
+def scan_library(root):
+    """Every .blend below root (no backups, no hidden directories)."""
+    blend_files = []
+    for folder, directories, files in os.walk(root):
+        directories[:] = [name for name in directories if not name.startswith(".")]
+        blend_files.extend(os.path.join(folder, name) for name in files if name.lower().endswith(".blend"))
+    return sorted(blend_files)
+
+def run_library(root, worker_count, retries=1, report_file=None, job_file=None):
+    """Export every .blend below root across worker_count headless processes; returns the exit code."""
+    root = os.path.abspath(root); start_time = time.perf_counter()
+    entries = [dict(library_entry(blend_file), id=index) for index, blend_file in enumerate(scan_library(root))]
+    pending = sorted(entries, key=lambda entry: entry["cost"], reverse=True)
+    print(f"Library: {len(entries)} .blend files on {worker_count} workers (longest first).")
+    work_dir = tempfile.mkdtemp(prefix="batch_fbx_library_")
+    try:
+        overrides_file = os.path.join(work_dir, "overrides.json")
+        overrides = load_job_file(job_file) if job_file else {} # Applied on top of each file's saved settings
+        with open(overrides_file, 'w', encoding='utf-8') as f: json.dump(overrides, f)
+        def result_file(entry): return os.path.join(work_dir, f"result_{entry['id']}.json")
+        def launch(entry, index, log):
+            entry["attempts"] += 1
+            if os.path.exists(result_file(entry)): os.remove(result_file(entry))
+            return subprocess.Popen(blender_job_command(entry["file"], overrides_file, result_file(entry)), stdout=log, stderr=subprocess.STDOUT)
+        def finished(entry, process, log_file):
+            summary = read_job_summary(result_file(entry), log_file)
+            if summary is None and entry["attempts"] <= retries:
+                print(f"{entry['file']}: process exited with code {process.returncode}, retrying ({entry['attempts']}/{retries})"); return True
+            if summary is None: entry.update(status='CRASHED', errors=[f"Process exited with code {process.returncode} without a summary ({entry['attempts']} attempts)."], files=[], duration=0.0)
+            else: entry.update(status=summary["status"], errors=summary["errors"], files=summary["files"], duration=summary["duration"])
+            print(f"[{sum(1 for other in entries if 'status' in other)}/{len(entries)}] {entry['status']:7s} {os.path.relpath(entry['file'], root)} ({entry['duration']:.1f}s)")
+            return False
+        run_process_queue(pending, max(1, worker_count), launch, finished, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {"root": root, "workers": worker_count, "duration": time.perf_counter() - start_time, "blend_files": entries,
+              "totals": {status: sum(1 for entry in entries if entry["status"] == status) for status in ('OK', 'ERROR', 'CRASHED', 'SKIPPED')}}
+    report["totals"]["exported_files"] = sum(1 for entry in entries for record in entry["files"] if record["status"] == 'OK')
+    report["totals"]["bytes"] = sum(record.get("size", 0) for entry in entries for record in entry["files"] if record["status"] == 'OK')
+    report_file = report_file or os.path.join(root, LIBRARY_REPORT_NAME)
+    with open(report_file, 'w', encoding='utf-8') as f: json.dump(report, f, indent=1)
+    print(f"Library export finished in {format_duration(report['duration'])}: {report['totals']}. Report: {report_file}")
+    return 0 if report["totals"]["ERROR"] == 0 and report["totals"]["CRASHED"] == 0 else 1
+
+
+# --- LOD Index ---
+# Finding LODs used to scan every object in the scene with a regex and walk its modifiers on each
+# export. Instead, each scene keeps an index of armature -> skinned meshes -> (base mesh, LOD level)
+# that is built once and then updated per object from the depsgraph update handler. A query that
+# finds a deleted or renamed entry, or an update from a skinned mesh the index doesn't know, marks
+# the index for a rebuild; so do undo and file loads.
+DEFAULT_LOD_PATTERN = r"^(?P<base>.+)_LOD(?P<level>[1-9]\d*)$"
+lod_indices = {} # scene name -> LODIndex
+
+def compile_lod_patterns(pattern_text):
+    """Compile ';'-separated LOD name patterns, each with 'base' and 'level' groups."""
+    patterns = []
+    for text in pattern_text.split(";"):
+        text = text.strip()
+        if not text: continue
+        try: pattern = re.compile(text)
+        except re.error as e: print(f"Invalid LOD pattern '{text}': {e}"); continue
+        if {"base", "level"} <= set(pattern.groupindex): patterns.append(pattern)
+        else: print(f"LOD pattern '{text}' needs (?P<base>...) and (?P<level>...) groups. Ignored.")
+    return patterns or [re.compile(DEFAULT_LOD_PATTERN)]
+
+class LODIndex:
+    """Armature -> skinned mesh -> (base mesh, LOD level) index for one scene."""
+    def __init__(self, pattern_text):
+        self.patterns = compile_lod_patterns(pattern_text)
+        self.entries = {} # mesh name -> (armature pointers, base name, level)
+        self.by_armature = {} # armature pointer -> set of mesh names
+        self.dirty = True
+
+    def classify(self, name):
+        """Return (base name, level); meshes not matching any pattern are their own base at level 0."""
+        for pattern in self.patterns:
+            match = pattern.search(name)
+            if match: return match.group("base"), int(match.group("level"))
+        return name, 0
+
+    def remove(self, name):
+        entry = self.entries.pop(name, None)
+        if entry:
+            for pointer in entry[0]: self.by_armature.get(pointer, set()).discard(name)
+
+    def index_object(self, obj):
+        self.remove(obj.name)
+        if obj.type != 'MESH': return
+        armatures = frozenset(mod.object.as_pointer() for mod in obj.modifiers if mod.type == 'ARMATURE' and mod.object)
+        if not armatures: return
+        base, level = self.classify(obj.name)
+        self.entries[obj.name] = (armatures, base, level)
+        for pointer in armatures: self.by_armature.setdefault(pointer, set()).add(obj.name)
+
+    def rebuild(self, scene):
+        self.entries.clear(); self.by_armature.clear()
+        for obj in scene.objects: self.index_object(obj)
+        self.dirty = False
+
+    def lod_groups(self, scene, armature, view_layer=None):
+        """Meshes skinned to the armature grouped by base name: {base: [(level, obj), ...]} sorted by level."""
+        rebuilt = self.dirty
+        if self.dirty: self.rebuild(scene)
+        groups = {}
+        for name in list(self.by_armature.get(armature.as_pointer(), ())):
+            obj = scene.objects.get(name)
+            if obj is None: # Deleted, unlinked or renamed since indexing; a renamed LOD is only found again by a rebuild
+                if not rebuilt: self.dirty = True; return self.lod_groups(scene, armature, view_layer)
+                self.remove(name); continue
+            if view_layer is not None and name not in view_layer.objects: continue
+            groups.setdefault(self.entries[name][1], []).append((self.entries[name][2], obj))
+        for levels in groups.values(): levels.sort(key=lambda item: item[0])
+        return groups
+
+def lod_index(scene):
+    """The LOD index of a scene, created on first use."""
+    index = lod_indices.get(scene.name)
+    if index is None: index = lod_indices[scene.name] = LODIndex(scene.lod_name_pattern)
+    return index
+
+def update_lod_pattern(self, context):
+    lod_indices.pop(self.name, None) # Rebuilt with the new pattern on next use
+
+@persistent
+def lod_index_depsgraph_update(scene, depsgraph):
+    """Keep the scene's LOD index current by re-indexing only the objects that changed."""
+    index = lod_indices.get(scene.name)
+    if index is None or index.dirty: return
+    for update in depsgraph.updates:
+        if not isinstance(update.id, bpy.types.Object): continue
+        if update.is_updated_transform and not update.is_updated_geometry: continue # Moving objects doesn't change the index
+        obj = update.id.original
+        if obj.name not in scene.objects: index.remove(obj.name); continue
+        if obj.type == 'MESH' and obj.name not in index.entries and any(mod.type == 'ARMATURE' for mod in obj.modifiers):
+            index.dirty = True; return # Unknown skinned mesh, possibly a renamed one still indexed under its old name
+        index.index_object(obj)
+
+@persistent
+def lod_index_invalidate(*args):
+    """Undo/redo and file loads replace datablocks wholesale; rebuild indices on next use."""
+    for index in lod_indices.values(): index.dirty = True
+
+
+# --- Export Registry (cached set of flagged actions) ---
+# The panel, polls and operators used to walk all of bpy.data.actions to find flagged ones. The
+# registry keeps that set up to date from the Action.export update callback, so asking "is any
+# action flagged?" is O(1). Bulk changes write the raw ID property to avoid per-action update
+# callbacks and rebuild the registry once. New or deleted actions (which fire no callback) are
+# caught by comparing the action count; undo and file loads force a rebuild.
+action_list_shown = [] # Names shown by the filtered action list, for the bulk flag operators
+
+class ExportRegistry:
+    """Actions flagged for export, keyed by pointer."""
+    def __init__(self):
+        self.flagged = {} # action pointer -> name
+        self.action_count = -1
+
+    def rebuild(self):
+        self.flagged = {action.as_pointer(): action.name for action in bpy.data.actions if getattr(action, "export", False)}
+        self.action_count = len(bpy.data.actions)
+
+    def invalidate(self):
+        self.action_count = -1
+
+    def ensure(self):
+        if self.action_count != len(bpy.data.actions): self.rebuild()
+
+    def set_flag(self, action, value):
+        if self.action_count == -1: return # Rebuilt on next use anyway
+        if value: self.flagged[action.as_pointer()] = action.name
+        else: self.flagged.pop(action.as_pointer(), None)
+
+    def has_any(self):
+        self.ensure(); return bool(self.flagged)
+
+    def count(self):
+        self.ensure(); return len(self.flagged)
+
+    def flagged_pointers(self):
+        self.ensure(); return self.flagged
+
+    def flagged_actions(self):
+        """Flagged actions sorted by name; rebuilds once if an entry went stale (rename/delete)."""
+        self.ensure()
+        actions = []
+        for pointer, name in self.flagged.items():
+            action = bpy.data.actions.get(name)
+            if action is None or action.as_pointer() != pointer or not action.export:
+                self.rebuild(); return sorted((action for action in bpy.data.actions if action.export), key=lambda action: action.name)
+            actions.append(action)
+        return sorted(actions, key=lambda action: action.name)
+
+export_registry = ExportRegistry()
+
+def set_actions_export(actions, value):
+    """Flag many actions at once without firing Action.export's update callback for each of them."""
+    for action in actions:
+        if action.export != value:
+            action["export"] = value # Raw ID property write bypasses update_export_sync
+            if hasattr(action, "select") and action.select != value: action.select = value # Keep Animation Manager in sync
+    export_registry.rebuild()
+
+@persistent
+def export_registry_invalidate(*args):
+    export_registry.invalidate(); rig_compatibility.clear()
+
+
+# --- Rig Compatibility Index ---
+# Shared action libraries hold actions for many rigs. The index maps every action to the bone names
+# its fcurves target (pose.bones["..."] data paths) and every armature to its bone names. An
+# action's match on a rig is the percentage of its animated bones that the rig has (None for an
+# action that animates no bones, e.g. object-level only, which no rig check applies to). An entry is
+# rebuilt when the depsgraph reports its action or armature as changed, or when its fcurve or bone
+# count differs, so the action list filter and the export plan never re-parse unchanged actions.
+POSE_BONE_PATH = re.compile(r'^pose\.bones\["((?:[^"\\]|\\.)*)"\]')
+
+class RigCompatibility:
+    """Cached bone sets of actions and armatures, and the match of an action on a rig."""
+    def __init__(self):
+        self.actions = {} # action pointer -> (fcurve count, frozenset of bone names)
+        self.rigs = {} # armature data pointer -> (bone count, frozenset of bone names)
+
+    def action_bones(self, action):
+        key = action.as_pointer(); fcurve_count = len(action.fcurves)
+        cached = self.actions.get(key)
+        if cached is None or cached[0] != fcurve_count:
+            names = set()
+            for fcurve in action.fcurves:
+                match = POSE_BONE_PATH.match(fcurve.data_path)
+                if match: names.add(match.group(1).replace('\\"', '"').replace('\\\\', '\\'))
+            cached = self.actions[key] = (fcurve_count, frozenset(names))
+        return cached[1]
+
+    def rig_bones(self, armature):
+        bones = armature.data.bones; key = armature.data.as_pointer()
+        cached = self.rigs.get(key)
+        if cached is None or cached[0] != len(bones): cached = self.rigs[key] = (len(bones), frozenset(bone.name for bone in bones))
+        return cached[1]
+
+    def match(self, action, armature):
+        """Percentage of the action's animated bones that exist on the armature (None when it animates no bones)."""
+        bones = self.action_bones(action)
+        return 100.0 * len(bones & self.rig_bones(armature)) / len(bones) if bones else None
+
+    def forget(self, block):
+        self.actions.pop(block.as_pointer(), None); self.rigs.pop(block.as_pointer(), None)
+
+    def clear(self):
+        self.actions.clear(); self.rigs.clear()
+
+rig_compatibility = RigCompatibility()
+
+def rig_mismatch(scene, action, armature):
+    """(bone match %, below the threshold) of an action under the scene's mismatch policy; (None, False) when no check applies."""
+    match = rig_compatibility.match(action, armature) if scene.rig_mismatch_policy != 'OFF' else None
+    return match, match is not None and match < scene.rig_match_threshold
+
+@persistent
+def rig_compatibility_depsgraph_update(scene, depsgraph):
+    """Drop the cached bone sets of edited actions and armatures."""
+    for update in depsgraph.updates:
+        if isinstance(update.id, (bpy.types.Action, bpy.types.Armature)): rig_compatibility.forget(update.id.original)
+
+
+# --- Batch Progress ---
+# Tracks jobs of a running batch for the modal operator's progress bar. The ETA uses the measured
+# cost per baked frame of the finished animation jobs.
+active_batch_progress = None # BatchProgress of the running modal export, read by the panel
+
+def action_frame_count(action):
+    return int(action.frame_range[1]) - int(action.frame_range[0]) + 1
+
+class BatchProgress:
+    """Job counters, current asset and timing of a batch export."""
+    def __init__(self):
+        self.total = 0; self.done = 0; self.current = ""
+        self.start_time = time.perf_counter(); self.job_start = self.start_time; self.job_frames = 0
+        self.frames_total = 0; self.frames_done = 0; self.frame_seconds = 0.0
+
+    def add_jobs(self, count, frames=0):
+        self.total += count; self.frames_total += frames
+
+    def begin_job(self, name, frames=0):
+        self.current = name; self.job_frames = frames; self.job_start = time.perf_counter()
+
+    def end_job(self):
+        self.done += 1
+        if self.job_frames:
+            self.frames_done += self.job_frames; self.frame_seconds += time.perf_counter() - self.job_start
+        self.job_frames = 0
+
+    def fraction(self):
+        if self.frames_total and self.frames_done: return min(1.0, self.frames_done / self.frames_total)
+        return self.done / self.total if self.total else 0.0
+
+    def elapsed(self):
+        return time.perf_counter() - self.start_time
+
+    def eta(self):
+        """Seconds left, from the measured cost per frame; None until a frame has been measured."""
+        if not self.frames_done: return None
+        return (self.frames_total - self.frames_done) * self.frame_seconds / self.frames_done
+
+    def status_text(self):
+        eta = self.eta()
+        eta_text = f", ETA {format_duration(eta)}" if eta is not None else ""
+        return f"Batch FBX export {self.done}/{self.total}: {self.current} ({format_duration(self.elapsed())} elapsed{eta_text}) - Esc to cancel"
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}:{seconds:02d}"
+
+
+# --- Watch Mode (re-export what changed) ---
+# With watch mode on, a depsgraph handler records which flagged actions, character meshes and
+# armature rest pose were edited since the last export. When the .blend is saved, or once edits
+# have paused for the debounce delay, the background batch runs for just those jobs, so one edited
+# clip re-exports alone instead of the whole library. Updates made while a batch runs are ignored,
+# and so are skinned-mesh updates that come from posing the armature.
+class ExportWatcher:
+    """Jobs of the watched scene changed since its last export."""
+    def __init__(self):
+        self.actions = set(); self.character = False; self.rig = False
+        self.rig_hash = None; self.last_change = 0.0; self.scheduled = False
+
+    def start(self, scene):
+        self.actions.clear(); self.character = False; self.rig = False
+        armature = scene.character_armature
+        self.rig_hash = armature_fingerprint(armature) if armature and armature.type == 'ARMATURE' else None
 
+    def pending(self):
+        return bool(self.actions or self.character or self.rig)
 
-# Removed export_action function
+    def note(self, scene, depsgraph):
+        """Record the export jobs touched by one depsgraph update."""
+        armature = scene.character_armature
+        if not armature: return
+        changed = False; posed = False; meshes = []
+        for update in depsgraph.updates:
+            block = update.id.original
+            if isinstance(block, bpy.types.Action):
+                if block.export: self.actions.add(block.name); changed = True
+            elif block == armature.data: self.rig = changed = True # Confirmed against the rest pose fingerprint in take()
+            elif block == armature: posed = True
+            elif isinstance(block, bpy.types.Object) and block.type == 'MESH' and update.is_updated_geometry: meshes.append(block)
+        if meshes and not posed: # Skinned meshes re-evaluate with every pose change; only direct edits count
+            listed = {item.object for item in scene.character_objects if item.object}
+            if any(obj in listed or any(modifier.type == 'ARMATURE' and modifier.object == armature for modifier in obj.modifiers) for obj in meshes):
+                self.character = changed = True
+        if changed:
+            self.last_change = time.monotonic()
+            if scene.export_watch_trigger == 'IDLE': self.schedule(scene.export_watch_delay)
+
+    def take(self, scene):
+        """Pop the changed jobs: (export the character?, sorted action names)."""
+        character = self.character; names = set(self.actions)
+        armature = scene.character_armature
+        if self.rig and armature:
+            rig_hash = armature_fingerprint(armature)
+            if rig_hash != self.rig_hash: # A rest pose or hierarchy edit changes every export
+                self.rig_hash = rig_hash; character = True; names.update(action.name for action in export_registry.flagged_actions())
+        self.actions.clear(); self.character = False; self.rig = False
+        return character and scene.export_character, sorted(names) if scene.export_animations else []
+
+    def schedule(self, delay):
+        if self.scheduled: return
+        self.scheduled = True
+        bpy.app.timers.register(export_watch_tick, first_interval=max(0.0, delay))
+
+export_watcher = ExportWatcher()
+
+def export_watch_tick():
+    """Timer: start the background batch for the changed jobs once edits have paused."""
+    scene = bpy.context.scene
+    if scene is None or not scene.use_export_watch or not export_watcher.pending(): export_watcher.scheduled = False; return None
+    if active_batch_progress is not None or active_export_session is not None: return 1.0 # Retry after the running batch
+    if scene.export_watch_trigger == 'IDLE':
+        wait = export_watcher.last_change + scene.export_watch_delay - time.monotonic()
+        if wait > 0.0: return wait
+    export_watcher.scheduled = False
+    character, actions = export_watcher.take(scene)
+    window = next(iter(bpy.context.window_manager.windows), None)
+    if (character or actions) and window:
+        print(f"Watch mode: re-exporting {'the character and ' if character else ''}{len(actions)} action(s).")
+        with bpy.context.temp_override(window=window, screen=window.screen):
+            outcome = bpy.ops.export.batch_fbx_modal('EXEC_DEFAULT', watch_scope=json.dumps({"character": character, "actions": actions}))
+        if 'RUNNING_MODAL' not in outcome: export_watcher.actions.update(actions); export_watcher.character |= character # Try again next time
+    return None
+
+def update_export_watch(self, context):
+    if self.use_export_watch: export_watcher.start(self)
+
+@persistent
+def export_watch_depsgraph_update(scene, depsgraph):
+    """Note edited actions, meshes and rig of a watched scene."""
+    if not scene.use_export_watch or active_export_session is not None or active_batch_progress is not None: return
+    export_watcher.note(scene, depsgraph)
+
+@persistent
+def export_watch_save_post(*args):
+    """Re-export the changed jobs right after a save (save trigger)."""
+    scene = bpy.context.scene
+    if scene and scene.use_export_watch and scene.export_watch_trigger == 'SAVE' and export_watcher.pending(): export_watcher.schedule(0.0)
 
 
 # --- UI List Classes ---
-# (No changes in this section)
 class ACTION_UL_list(UIList):
     bl_idname = "ACTION_UL_batch_export_actions"
+    filter_prefix: StringProperty(name="Prefix", description="Only show actions whose name starts with this text", default="")
+    filter_flagged: BoolProperty(name="Flagged", description="Only show actions flagged for export", default=False)
+    filter_rig: BoolProperty(name="On Rig", description="Only show actions compatible with the character armature (bone match at or above the threshold)", default=False)
+    sort_by: EnumProperty(name="Sort", items=[('NAME', "Name", "Sort by name"), ('LENGTH', "Length", "Sort by frame count"), ('FLAGGED', "Flagged", "Flagged actions first")], default='NAME')
+
+    def draw_filter(self, context, layout):
+        row = layout.row(align=True)
+        row.prop(self, "filter_name", text="", icon='VIEWZOOM')
+        row.prop(self, "use_filter_invert", text="", icon='ARROW_LEFTRIGHT')
+        row = layout.row(align=True)
+        row.prop(self, "filter_prefix", text="", icon='SORTALPHA')
+        row.prop(self, "filter_flagged", toggle=True)
+        row.prop(self, "filter_rig", toggle=True)
+        row = layout.row(align=True)
+        row.prop(self, "sort_by", expand=True)
+        row.prop(self, "use_filter_sort_reverse", text="", icon='SORT_DESC' if self.use_filter_sort_reverse else 'SORT_ASC')
+
+    def filter_items(self, context, data, propname):
+        actions = getattr(data, propname)
+        helper = bpy.types.UI_UL_list
+        visible = self.bitflag_filter_item
+        flags = helper.filter_items_by_name(self.filter_name, visible, actions, "name") if self.filter_name else [visible] * len(actions)
+        prefix = self.filter_prefix
+        armature = context.scene.character_armature if self.filter_rig else None
+        threshold = context.scene.rig_match_threshold
+        flagged = export_registry.flagged_pointers() if self.filter_flagged or self.sort_by == 'FLAGGED' else None
+        if prefix or armature or self.filter_flagged:
+            for i, action in enumerate(actions):
+                if not flags[i]: continue
+                match = rig_compatibility.match(action, armature) if armature else None # None: animates no bones, fits any rig
+                if (prefix and not action.name.startswith(prefix)) or (self.filter_flagged and action.as_pointer() not in flagged) \
+                   or (match is not None and match < threshold): flags[i] = 0
+        if self.sort_by == 'NAME': order = helper.sort_items_by_name(actions, "name")
+        elif self.sort_by == 'LENGTH': order = helper.sort_items_helper([(i, action_frame_count(action)) for i, action in enumerate(actions)], key=lambda item: item[1])
+        else: order = helper.sort_items_helper([(i, (action.as_pointer() not in flagged, action.name)) for i, action in enumerate(actions)], key=lambda item: item[1])
+        action_list_shown[:] = [action.name for i, action in enumerate(actions) if flags[i]] # For the 'shown' bulk operators
+        return flags, order
+
     def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
         action = item
         if self.layout_type in {'DEFAULT', 'COMPACT'}:
@@ -119,10 +2863,23 @@ class ACTION_UL_list(UIList):
             if hasattr(action, "export"): row.prop(action, "export", text="")
             else: row.label(text="", icon='ERROR')
             row.prop(action, "name", text="", emboss=False, icon_value=icon)
+            scene = context.scene; armature = scene.character_armature
+            if armature and armature.type == 'ARMATURE' and scene.rig_mismatch_policy != 'OFF':
+                match = rig_compatibility.match(action, armature)
+                if match is not None and match < 100.0: row.label(text=f"{match:.0f}%", icon='ERROR' if match < scene.rig_match_threshold else 'NONE')
+            if context.scene.use_key_reduction and context.scene.animation_backend == 'FAST': row.prop(action, "export_dense", text="", icon='KEYFRAME_HLT' if action.export_dense else 'KEYFRAME')
             op = row.operator("anim.set_active_action", text="", icon='PLAY'); op.action_name = action.name
             row.prop(action, "use_fake_user", text="", toggle=True) # Auto icon
         elif self.layout_type in {'GRID'}: layout.alignment = 'CENTER'; layout.label(text="", icon_value=icon)
 
+class SCENE_UL_character_profiles(UIList):
+    bl_idname = "SCENE_UL_batch_export_profiles"
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        row = layout.row(align=True)
+        row.prop(item, "enabled", text="")
+        row.prop(item, "name", text="", emboss=False, icon='ARMATURE_DATA' if item.armature else 'ERROR')
+        row.label(text=item.armature.name if item.armature else "No armature")
+
 class OBJECT_UL_character_objects(UIList):
     bl_idname = "OBJECT_UL_batch_export_meshes"
     def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
@@ -134,14 +2891,26 @@ class OBJECT_UL_character_objects(UIList):
 
 
 # --- Property Group ---
-# (No changes in this section)
 class MeshObject(PropertyGroup):
     object: PointerProperty(type=bpy.types.Object)
     export: BoolProperty(default=True)
 
+class CharacterProfile(PropertyGroup):
+    """One character of a multi-character run: armature, meshes, LOD setting and action filter."""
+    name: StringProperty(name="Character Name", description="Character name (file name of the character FBX)", default="Character")
+    enabled: BoolProperty(name="Enabled", description="Export this profile with 'Export All Profiles'", default=True)
+    armature: PointerProperty(type=bpy.types.Object, name="Armature", poll=lambda self, obj: obj.type == 'ARMATURE')
+    objects: CollectionProperty(type=MeshObject)
+    export_character: BoolProperty(name="Character", description="Export the character meshes", default=True)
+    export_animations: BoolProperty(name="Animations", description="Export the actions matching the filter", default=True)
+    export_lods: BoolProperty(name="LODs", description="Include LOD meshes skinned to the armature", default=False)
+    action_include: StringProperty(name="Include", description="Action name patterns to export, separated by ';' (e.g. 'NPC_*;Common_*')", default="*")
+    action_exclude: StringProperty(name="Exclude", description="Action name patterns to skip, separated by ';'", default="")
+    flagged_only: BoolProperty(name="Flagged Only", description="Only export matching actions that are flagged for export", default=False)
+    subdirectory: StringProperty(name="Subdirectory", description="Subdirectory of the export path for this profile (empty: the profile name)", default="")
+
 
 # --- Operators ---
-# (No changes in this section)
 class ANIM_OT_set_active_action(Operator):
     bl_idname = "anim.set_active_action"; bl_label = "Set Active Action"; bl_description = "Set this action as the active one"
     action_name: StringProperty()
@@ -166,7 +2935,7 @@ class ANIM_OT_push_actions_to_nla(Operator):
         if not armature.animation_data:
              try: armature.animation_data_create()
              except Exception as e: self.report({'ERROR'}, f"Could not create Animation Data: {e}"); return {'CANCELLED'}
-        pushed_count = 0; actions_to_push = [action for action in bpy.data.actions if getattr(action, "export", False)]
+        pushed_count = 0; actions_to_push = export_registry.flagged_actions()
         if not actions_to_push: self.report({'WARNING'}, "No actions marked for export."); return {'CANCELLED'}
         for action in actions_to_push:
             existing_track = next((track for track in armature.animation_data.nla_tracks if track.strips and track.strips[0].action == action), None)
@@ -182,10 +2951,10 @@ class ANIM_OT_delete_selected_actions(Operator):
     # If you want it to ONLY delete based on 'export' state, it's fine.
     # If you wanted it separate, it would need its own property.
     @classmethod
-    def poll(cls, context): return any(getattr(action, "export", False) for action in bpy.data.actions) # Checks 'export'
+    def poll(cls, context): return export_registry.has_any() # Checks 'export' via the cached registry
     def invoke(self, context, event): return context.window_manager.invoke_confirm(self, event)
     def execute(self, context):
-        actions_to_remove = [action for action in bpy.data.actions if getattr(action, "export", False)]; removed_count = 0 # Uses 'export'
+        actions_to_remove = export_registry.flagged_actions(); removed_count = 0 # Uses 'export'
         if not actions_to_remove: self.report({'WARNING'}, "No actions marked for export."); return {'CANCELLED'}
         for action in actions_to_remove:
              try: bpy.data.actions.remove(action, do_unlink=True); removed_count += 1
@@ -229,38 +2998,41 @@ class OBJECT_OT_batch_export_fbx(Operator):
     """Batch Export FBX"""
     bl_idname = "export.batch_fbx"
     bl_label = "Batch Export FBX"
-    bl_options = {'REGISTER', 'UNDO'}
+    bl_options = {'REGISTER'} # No undo step: the batch restores the scene itself, and a step would copy the whole file
 
     confirm_message: StringProperty()
+    watch_scope: StringProperty(options={'HIDDEN', 'SKIP_SAVE'}) # JSON ExportPlan scope of a watch mode run
 
     def invoke(self, context, event):
-        # ... (Overwrite check logic unchanged) ...
-        scene = context.scene; export_path = bpy.path.abspath(scene.batch_export_path); existing_files = []
+        # Overwrite and collision check from the export plan (one directory scan), reused by execute()
+        scene = context.scene; export_path = bpy.path.abspath(scene.batch_export_path)
         if not export_path: self.report({'ERROR'}, "Export Path not set."); return {'CANCELLED'}
         parent_dir = os.path.dirname(export_path);
         if not parent_dir or not os.path.exists(parent_dir): self.report({'ERROR'}, f"Base directory does not exist: {parent_dir}"); return {'CANCELLED'}
-        armature = scene.character_armature; character_name = scene.character_name if scene.character_name.strip() else "Character"
-        if scene.export_character:
-            char_file = os.path.join(export_path, f"{character_name}.fbx")
-            if os.path.exists(char_file): existing_files.append(os.path.basename(char_file))
-        if scene.export_animations and armature:
-            actions_to_export = [action for action in bpy.data.actions if getattr(action, "export", False)]
-            for action in actions_to_export:
-                anim_name = action.name if action.name.strip() else "UnnamedAnimation"
-                anim_file = os.path.join(export_path, f"{anim_name}.fbx")
-                if os.path.exists(anim_file): existing_files.append(os.path.basename(anim_file))
-        if existing_files:
-            num_files = len(existing_files); example_files = "\n - " + "\n - ".join(existing_files[:5]) if num_files > 0 else ""
-            self.confirm_message = f"Overwrite {num_files} existing file(s)? {example_files}"
+        self.plan = plan = ExportPlan(context)
+        existing_files = [job["file_name"] for job in plan.jobs if job["exists"] and not job["collision"]]
+        collisions = [f"{job['name']}: {job['collision']}" for job in plan.jobs if job["collision"]]
+        if existing_files or collisions:
+            lines = []
+            if existing_files: lines.append(f"Overwrite {len(existing_files)} existing file(s)?"); lines.extend(" - " + name for name in existing_files[:5])
+            if collisions: lines.append(f"{len(collisions)} job(s) will be skipped (name collisions):"); lines.extend(" - " + line for line in collisions[:5])
+            self.confirm_message = "\n".join(lines)
             return context.window_manager.invoke_props_dialog(self, width=400)
         else: return self.execute(context)
 
     def draw(self, context):
-        # ... (dialog draw unchanged) ...
         layout = self.layout; col = layout.column()
-        for i, line in enumerate(self.confirm_message.split('\n')): icon = 'ERROR' if i == 0 else 'NONE'; col.label(text=line, icon=icon)
+        for line in self.confirm_message.split('\n'): icon = 'NONE' if line.startswith(" - ") else 'ERROR'; col.label(text=line, icon=icon)
 
     def execute(self, context):
+        self.progress = BatchProgress()
+        steps = self.batch_steps(context)
+        while True:
+            try: next(steps)
+            except StopIteration as stop: return stop.value
+
+    def batch_steps(self, context):
+        """Run the batch as a generator that yields after every exported file (see the modal variant)."""
         scene = context.scene; export_path = bpy.path.abspath(scene.batch_export_path)
         if not export_path or export_path.strip() == "": self.report({'ERROR'}, "No export path set"); return {'CANCELLED'}
         if not os.path.exists(export_path):
@@ -276,13 +3048,65 @@ class OBJECT_OT_batch_export_fbx(Operator):
             if armature.animation_data: original_action = armature.animation_data.action
             original_pose_position = armature.data.pose_position
 
-        export_count = 0; error_count = 0
+        batch_phases = {}; batch_start = time.perf_counter()
+        with timed("plan", batch_phases): plan = getattr(self, "plan", None) or ExportPlan(context, json.loads(self.watch_scope) if self.watch_scope else None); self.plan = None # Built by invoke() or now, consumed once
+        export_count = 0; error_count = 0; skipped_count = 0; mismatch_count = 0; cancelled = False # Skipped files: unchanged / rig mismatch
+        last_export_results.clear(); last_export_stats.clear()
+        with timed("session_begin", batch_phases): session = ExportSession(context, armature).begin()
+        counter = DepsgraphCounter().begin() # Inside the session, so its one-off setup and restore are not counted
+        session.staging = staging = staging_pipeline(scene); transferred_late = []
+        if staging: remove_partial_files(export_path) # Left behind by a crashed or killed earlier run
+        session.proxy = deform_proxy(scene, armature)
+        self.memory = memory = memory_guard(context)
         try:
+            # --- Export character split into one file per LOD level or mesh part ---
+            if plan.export_character and scene.character_split != 'NONE':
+                if not armature: self.report({'ERROR'}, "Armature needed for character export not selected."); return {'CANCELLED'}
+                part_jobs = [job for job in plan.jobs if job["part"] is not None]
+                for job in part_jobs:
+                    if job["collision"]:
+                        self.report({'ERROR'}, f"Skipping '{job['name']}': {job['collision']}"); error_count += 1
+                        last_export_results.append(new_result(job["name"], job["path"], kind='CHARACTER', error=f"Skipped: {job['collision']}"))
+                part_jobs = [job for job in part_jobs if not job["collision"]]
+                if not part_jobs: self.report({'WARNING'}, "Exporting character but no meshes selected in list.")
+                manifest = None; fingerprints = {}
+                if scene.export_incremental:
+                    manifest = load_export_manifest(export_path); rig_hash = armature_fingerprint(armature)
+                    part_jobs, skipped_jobs, fingerprints = filter_unchanged_jobs(scene, part_jobs, lambda job: character_part_fingerprint(scene, armature, job["part"], rig_hash), manifest, plan.existing)
+                    skipped_count += len(skipped_jobs)
+                    if skipped_jobs: self.report({'INFO'}, f"Incremental export: skipping {len(skipped_jobs)} unchanged character file(s).")
+                    last_export_results.extend(new_result(job["name"], job["path"], kind='CHARACTER', status='SKIPPED') for job in skipped_jobs)
+                self.progress.add_jobs(len(part_jobs))
+                temp_action = None
+                if armature.animation_data: temp_action = armature.animation_data.action; armature.animation_data.action = None
+                worker_count = min(scene.export_workers, len(part_jobs)); texture_store = None
+                if scene.export_parallel and worker_count > 1:
+                    self.report({'INFO'}, f"Exporting {len(part_jobs)} character files across {worker_count} worker processes...")
+                    try: results = run_parallel_character_export(context, armature, [job["part"] for job in part_jobs], export_path, worker_count)
+                    except Exception as e_pool: self.report({'ERROR'}, f"Parallel export failed: {e_pool}"); error_count += 1; print(traceback.format_exc()); results = []
+                else:
+                    texture_store = TextureStore(texture_store_root(scene, export_path)) if scene.texture_mode == 'STORE' else None
+                    results = self.character_part_results(context, armature, part_jobs, export_path, texture_store)
+                for result in results:
+                    last_export_results.append(result)
+                    exported, failed = self.report_results([result] + (staging.collect() if staging else []), manifest, fingerprints); export_count += exported; error_count += failed
+                    self.progress.end_job(); yield
+                if armature.animation_data and temp_action: armature.animation_data.action = temp_action
+                if texture_store: self.report({'INFO'}, texture_store.summary())
+                if staging:
+                    # Only files that reached the export directory count as exported (and enter the manifest)
+                    exported, failed = self.report_results(staging.wait(), manifest, fingerprints); export_count += exported; error_count += failed
+                if manifest is not None:
+                    try:
+                        with timed("manifest", batch_phases): save_export_manifest(export_path, manifest)
+                    except OSError as e_manifest: self.report({'WARNING'}, f"Could not write export manifest: {e_manifest}")
+
             # --- Export character ---
-            if scene.export_character:
+            elif plan.export_character:
                 if not armature: self.report({'ERROR'}, "Armature needed for character export not selected."); return {'CANCELLED'}
                 self.report({'INFO'}, "Starting character mesh export...")
-                armature.data.pose_position = 'REST'
+                self.progress.add_jobs(1); self.progress.begin_job(scene.character_name if scene.character_name.strip() else "Character")
+                set_if_changed(armature.data, "pose_position", 'REST')
 
                 # Get explicitly listed meshes (LOD0 / Base)
                 explicit_meshes = []
@@ -297,32 +3121,22 @@ class OBJECT_OT_batch_export_fbx(Operator):
                 objects_to_export = [armature] + explicit_meshes
                 num_explicit = len(explicit_meshes)
 
-                # --- LOD Detection Logic ---
+                # --- LOD Detection Logic (from the scene's LOD index, no full scene scan) ---
                 if scene.export_lods:
-                    self.report({'INFO'}, "LOD export enabled, searching for LOD meshes...")
+                    self.report({'INFO'}, "LOD export enabled, looking up LOD meshes...")
+                    already_included = {obj.name for obj in objects_to_export}
+                    lod_groups = lod_index(scene).lod_groups(scene, armature, context.view_layer)
                     found_lods = []
-                    # Regex to find _LOD followed by 1-9 and optional digits at the end
-                    lod_pattern = re.compile(r"_LOD([1-9]\d*)$")
-
-                    for obj in scene.objects:
-                        # Check if it's a mesh, not already included, and visible in current view layer
-                        if obj.type == 'MESH' and obj not in objects_to_export and obj.name in context.view_layer.objects:
-                            # Check naming convention
-                            if lod_pattern.search(obj.name):
-                                # Check if skinned to the correct armature
-                                is_skinned = False
-                                for mod in obj.modifiers:
-                                    if mod.type == 'ARMATURE' and mod.object == armature:
-                                        is_skinned = True
-                                        break
-                                if is_skinned:
-                                    found_lods.append(obj)
+                    for base_name, levels in sorted(lod_groups.items()):
+                        group_lods = [obj for level, obj in levels if level > 0 and obj.name not in already_included]
+                        if group_lods: self.report({'INFO'}, f"LOD group '{base_name}': " + ", ".join(obj.name for obj in group_lods))
+                        found_lods.extend(group_lods)
 
                     if found_lods:
                         self.report({'INFO'}, f"Found {len(found_lods)} additional LOD meshes matching pattern.")
                         objects_to_export.extend(found_lods)
                     else:
-                         self.report({'WARNING'}, "LOD export enabled, but no additional LOD meshes found matching '_LODn' (n>0) pattern and skinned to selected armature.")
+                         self.report({'WARNING'}, f"LOD export enabled, but no additional LOD meshes found matching '{scene.lod_name_pattern}' (level > 0) and skinned to selected armature.")
                 # --- End LOD Detection ---
 
                 # Clear animation data temporarily
@@ -344,55 +3158,107 @@ class OBJECT_OT_batch_export_fbx(Operator):
                 else:
                     context.view_layer.objects.active = armature # Ensure armature active
                     char_name = scene.character_name if scene.character_name.strip() else "Character"
-                    fbx_file = os.path.join(export_path, f"{char_name}.fbx")
+                    fbx_file = os.path.join(export_path, character_file_name(scene))
+                    char_result = new_result(char_name, fbx_file, kind='CHARACTER'); start_time = time.perf_counter()
+                    texture_store = TextureStore(texture_store_root(scene, export_path)) if scene.texture_mode == 'STORE' else None
                     try:
-                        export_fbx(context, fbx_file, use_selection=True, bake_anim=False)
-                        self.report({'INFO'}, f"Exported character: {os.path.basename(fbx_file)}")
-                        export_count += 1
+                        written_file = fbx_file if texture_store else write_target(fbx_file) # Relative texture paths must resolve from the final location
+                        with timing_into(char_result["phases"]):
+                            with texture_store.referenced(material_images(valid_selection)) if texture_store else contextlib.nullcontext():
+                                export_fbx(context, written_file, use_selection=True, bake_anim=False)
+                        char_result["status"] = 'OK'
+                        char_result["duration"] = time.perf_counter() - start_time
+                        expected = export_expectation(scene, armature, meshes=[obj.name for obj in valid_selection if obj.type == 'MESH'])
+                        with timing_into(char_result["phases"]): finish_write(char_result, written_file, expected)
+                        exported, failed = self.report_results([char_result]); export_count += exported; error_count += failed
                     except Exception as e_char:
                         self.report({'ERROR'}, f"Failed exporting character: {e_char}"); error_count += 1; print(traceback.format_exc())
+                        char_result["error"] = f"Failed exporting character: {e_char}"; char_result["traceback"] = traceback.format_exc()
+                        char_result["duration"] = time.perf_counter() - start_time; char_result["peak_rss"] = peak_rss_bytes()
+                    if memory: memory.after_export(char_result)
+                    last_export_results.append(char_result)
+                    if texture_store: last_export_stats["textures"] = texture_store.stats; self.report({'INFO'}, texture_store.summary())
 
                 # Restore animation data if cleared
                 if armature.animation_data and temp_action: armature.animation_data.action = temp_action
+                self.progress.end_job(); yield
 
             # --- Export animations ---
-            if scene.export_animations:
-                # ... (Animation export logic remains unchanged) ...
+            if plan.export_animations:
                 if not armature: self.report({'ERROR'}, "Armature needed for animation export not selected."); return {'CANCELLED'}
                 if not armature.animation_data: self.report({'WARNING'}, "Armature has no Animation Data. Cannot export animations.")
                 else:
                     self.report({'INFO'}, "Starting animation export...")
-                    armature.data.pose_position = 'POSE'
-                    actions_to_export = [action for action in bpy.data.actions if getattr(action, "export", False)]
-                    if not actions_to_export: self.report({'WARNING'}, "Animation export enabled, but no actions marked for export.")
+                    set_if_changed(armature.data, "pose_position", 'POSE')
+                    actions_to_export = plan.actions()
+                    for job in plan.jobs:
+                        if job["kind"] == 'ANIMATION' and job["collision"]:
+                            self.report({'ERROR'}, f"Skipping '{job['name']}': {job['collision']}"); error_count += 1
+                            last_export_results.append(new_result(job["name"], job["path"], error=f"Skipped: {job['collision']}"))
+                    for warning in plan.warnings: self.report({'WARNING'}, f"Clip markers: {warning}")
+                    for name, match in plan.mismatches:
+                        self.report({'WARNING'}, f"Only {match:.0f}% of the bones animated by '{name}' exist on '{armature.name}'" + (" - skipped." if scene.rig_mismatch_policy == 'SKIP' else "."))
+                    mismatched = [job for job in plan.jobs if job["kind"] == 'ANIMATION' and job["skip"] and not job["collision"]]
+                    last_export_results.extend(new_result(job["name"], job["path"], status='SKIPPED', error=f"Skipped: {job['skip']}") for job in mismatched)
+                    mismatch_count += len(mismatched)
+                    take_jobs = plan.take_jobs()
+                    if not actions_to_export and not take_jobs: self.report({'WARNING'}, "Animation export enabled, but no actions marked for export.")
                     else:
-                        current_original_action = armature.animation_data.action
-                        for action in actions_to_export:
-                            bpy.ops.object.select_all(action='DESELECT')
-                            try: armature.select_set(True); context.view_layer.objects.active = armature
-                            except ReferenceError: self.report({'ERROR'}, f"Armature not found for exporting action '{action.name}'. Skipping."); error_count += 1; continue
-                            armature.data.pose_position = 'POSE'
-                            try: armature.animation_data.action = action; scene.frame_start = int(action.frame_range[0]); scene.frame_end = int(action.frame_range[1])
-                            except Exception as e_set: self.report({'ERROR'}, f"Failed setting action/range for '{action.name}': {e_set}. Skipping."); error_count += 1; continue
-                            fbx_file = os.path.join(export_path, f"{action.name}.fbx")
-                            try: export_fbx(context, fbx_file, use_selection=True, bake_anim=True, bake_anim_use_all_actions=False); self.report({'INFO'}, f"Exported animation: {os.path.basename(fbx_file)}"); export_count += 1
-                            except Exception as e_anim: self.report({'ERROR'}, f"Failed exporting animation '{action.name}': {e_anim}"); error_count += 1; print(traceback.format_exc())
-                        # Check if current_original_action still exists before assigning
-                        if armature.animation_data and current_original_action and current_original_action.name in bpy.data.actions:
-                            armature.animation_data.action = current_original_action
-                        elif armature.animation_data: # Assign None if original was deleted or invalid
-                            armature.animation_data.action = None
-
-
+                        manifest = None; fingerprints = {}
+                        if take_jobs:
+                            if scene.export_incremental:
+                                manifest = load_export_manifest(export_path)
+                                rig_hash = armature_fingerprint(armature)
+                                take_jobs, skipped_jobs, fingerprints = filter_unchanged_jobs(scene, take_jobs, lambda job: take_group_fingerprint(scene, armature, job["takes"], rig_hash), manifest, plan.existing)
+                                skipped_count += len(skipped_jobs)
+                                if skipped_jobs: self.report({'INFO'}, f"Incremental export: skipping {len(skipped_jobs)} unchanged take group(s).")
+                                last_export_results.extend(new_result(job["name"], job["path"], status='SKIPPED') for job in skipped_jobs)
+                            self.progress.add_jobs(len(take_jobs), sum(job["frames"] for job in take_jobs))
+                            results = self.take_group_results(context, armature, take_jobs, export_path)
+                        else:
+                            if scene.export_incremental:
+                                manifest = load_export_manifest(export_path)
+                                actions_to_export, skipped_actions, fingerprints = filter_unchanged_actions(scene, armature, actions_to_export, export_path, manifest, plan.existing)
+                                skipped = [new_result(target[0], os.path.join(export_path, target[1]), status='SKIPPED') for a in skipped_actions for target in action_targets(scene, a)]
+                                skipped_count += len(skipped); last_export_results.extend(skipped) # Files, like the records
+                                if skipped: self.report({'INFO'}, f"Incremental export: skipping {len(skipped)} unchanged file(s).")
+                            targets = [target for action in actions_to_export for target in action_targets(scene, action)]
+                            self.progress.add_jobs(len(targets), sum(int(end) - int(start) + 1 for name, file_name, start, end, is_clip in targets))
+                            worker_count = min(scene.export_workers, len(actions_to_export))
+                            if scene.export_parallel and worker_count > 1:
+                                self.report({'INFO'}, f"Exporting {len(actions_to_export)} actions across {worker_count} worker processes...")
+                                start_time = time.perf_counter()
+                                try: results = run_parallel_action_export(context, armature, actions_to_export, export_path, worker_count)
+                                except Exception as e_pool: self.report({'ERROR'}, f"Parallel export failed: {e_pool}"); error_count += 1; print(traceback.format_exc()); results = []
+                                if results: self.report({'INFO'}, f"Parallel export took {time.perf_counter() - start_time:.1f}s ({sum(r['duration'] for r in results):.1f}s of export time).")
+                            else:
+                                results = self.serial_action_results(context, armature, actions_to_export, export_path)
+                        for result in results:
+                            last_export_results.append(result)
+                            exported, failed = self.report_results([result] + (staging.collect() if staging else []), manifest, fingerprints); export_count += exported; error_count += failed
+                            self.progress.end_job(); yield
+                        if staging:
+                            wait_start = time.perf_counter()
+                            # Only files that reached the export directory count as exported (and enter the manifest)
+                            exported, failed = self.report_results(staging.wait(), manifest, fingerprints); export_count += exported; error_count += failed
+                            batch_phases["transfer_wait"] = time.perf_counter() - wait_start
+                        if manifest is not None:
+                            try:
+                                with timed("manifest", batch_phases): save_export_manifest(export_path, manifest)
+                            except OSError as e_manifest: self.report({'WARNING'}, f"Could not write export manifest: {e_manifest}")
+
+        except GeneratorExit: cancelled = True # Esc in the modal variant: restore the scene, then report what was done
         finally:
             # --- Restore original state ---
+            batch_phases["export"] = time.perf_counter() - batch_start - sum(batch_phases.values()); restore_start = time.perf_counter()
+            if session.proxy: session.proxy.cleanup()
             if armature and original_pose_position is not None: armature.data.pose_position = original_pose_position
-            # Action restore is handled after loop now, this is mostly redundant
-            # if armature and armature.animation_data and original_action is not None:
-            #      try:
-            #          if original_action.name in bpy.data.actions: armature.animation_data.action = original_action
-            #          else: armature.animation_data.action = None
-            #      except Exception as e_restore: print(f"Could not fully restore original action state: {e_restore}")
+            # Restore the action here (not after the loop) so a cancelled modal run restores it too
+            if armature and armature.animation_data:
+                 try:
+                     if original_action and original_action.name in bpy.data.actions: armature.animation_data.action = original_action
+                     else: armature.animation_data.action = None
+                 except Exception as e_restore: print(f"Could not fully restore original action state: {e_restore}")
             bpy.ops.object.select_all(action='DESELECT')
             for obj in original_selection:
                 try:
@@ -403,13 +3269,139 @@ class OBJECT_OT_batch_export_fbx(Operator):
                  elif context.selected_objects: context.view_layer.objects.active = context.selected_objects[0]
                  else: context.view_layer.objects.active = None
             except ReferenceError: context.view_layer.objects.active = None
+            close_start = time.perf_counter()
+            if staging: transferred_late = staging.close() # Blocks until every queued transfer is done or failed
+            close_seconds = time.perf_counter() - close_start
+            if staging: batch_phases["transfer_wait"] = batch_phases.get("transfer_wait", 0.0) + close_seconds
+            counter.end(); session.end()
+            if memory: last_export_stats.update(orphans_removed=memory.removed, rss=memory.rss)
+            batch_phases["restore"] = time.perf_counter() - restore_start - close_seconds
+            last_export_stats.update(depsgraph_updates=counter.updates, frame_changes=counter.frame_changes, evaluations=counter.evaluations)
+
+        exported, failed = self.report_results(transferred_late); export_count += exported; error_count += failed
+        if staging:
+            transferred = [record for record in last_export_results if record["transfer"]]
+            for record in transferred: print(f"  {os.path.basename(record['file'])}: write {record['duration']:.2f}s, transfer {record['transfer']:.2f}s, {record['size']} bytes")
+            last_export_stats.update(write_seconds=sum(record["duration"] for record in transferred), transfer_seconds=sum(record["transfer"] for record in transferred))
+            if transferred: self.report({'INFO'}, f"Staged {len(transferred)} file(s): write {last_export_stats['write_seconds']:.1f}s, transfer {last_export_stats['transfer_seconds']:.1f}s (overlapped with exporting).")
+        plan.calibrate(scene, last_export_results)
+        if scene.use_export_verify:
+            try:
+                with timed("index", batch_phases): update_asset_index(export_path)
+            except OSError as e_index: self.report({'WARNING'}, f"Could not update asset index: {e_index}")
+        try: write_run_log(export_path, plan, last_export_results, batch_phases, dict(last_export_stats), cancelled)
+        except OSError as e_log: self.report({'WARNING'}, f"Could not write run log: {e_log}")
+        slowest = slowest_results(3)
+        if slowest: self.report({'INFO'}, "Slowest: " + ", ".join(f"{record['name']} {record['duration'] + record['transfer']:.2f}s" for record in slowest))
 
         # --- Final report ---
+        if memory and memory.over_ceiling and not memory_handoff: self.report({'WARNING'}, f"Memory use {memory.rss // (1024 * 1024)} MB is above the {scene.export_memory_limit_mb} MB ceiling. Save and restart Blender, or export headless to hand off automatically.")
+        self.report({'INFO'}, f"Depsgraph evaluations: {counter.evaluations} ({counter.frame_changes} frame changes, {counter.updates} updates).")
+        if mismatch_count: self.report({'WARNING'}, f"Skipped {mismatch_count} file(s) whose actions don't match '{armature.name}'.")
+        if cancelled: self.report({'WARNING'}, f"Batch export cancelled after {self.progress.done} of {self.progress.total} files ({export_count} exported, {error_count} errors)."); return {'CANCELLED'}
         if error_count > 0: self.report({'WARNING'}, f"Export finished with {error_count} errors. See console for details.")
+        elif export_count == 0 and skipped_count > 0: self.report({'INFO'}, f"Batch export finished: nothing changed ({skipped_count} files up to date).")
         elif export_count == 0: self.report({'WARNING'}, "Export finished, but nothing was exported. Check settings.")
+        elif skipped_count > 0: self.report({'INFO'}, f"Batch export finished successfully ({export_count} files exported, {skipped_count} unchanged skipped).")
         else: self.report({'INFO'}, f"Batch export finished successfully ({export_count} files).")
         return {'FINISHED'}
 
+    def serial_action_results(self, context, armature, actions, export_path):
+        """Export actions one by one, yielding each result record (one per file)."""
+        memory = self.memory
+        for index, action in enumerate(actions):
+            remaining = remaining_action_names(memory, actions, index) if memory_handoff is not None else None
+            if remaining: memory_handoff.extend(remaining); return # The headless caller exports these in a fresh process
+            targets = action_targets(context.scene, action)
+            # One progress job per file, as counted by add_jobs(); clips of one bake are all written before the first is yielded
+            self.progress.begin_job(targets[0][0], int(targets[0][3]) - int(targets[0][2]) + 1)
+            for clip_index, (result, (name, file_name, start, end, is_clip)) in enumerate(zip(export_action_results(context, armature, action, export_path), targets)):
+                if clip_index: self.progress.begin_job(name, int(end) - int(start) + 1)
+                if memory: memory.after_export(result)
+                yield result
+
+    def report_results(self, records, manifest=None, fingerprints=None):
+        """Report finished records and enter exported files into the manifest; returns (exported, failed).
+
+        Staged records are skipped here and reported once their transfer is done.
+        """
+        exported = failed = 0
+        for result in records:
+            if result["status"] == 'STAGED': continue
+            if result["status"] != 'OK':
+                self.report({'ERROR'}, result["error"]); failed += 1
+                if result["traceback"]: print(result["traceback"])
+                continue
+            file_name = os.path.basename(result["file"]); reduction = result.get("reduction"); exported += 1
+            if result["kind"] == 'CHARACTER':
+                shared = f"shared evaluation {result['phases']['evaluate_shared']:.2f}s, " if "evaluate_shared" in result["phases"] else "" # Paid by the first split file
+                self.report({'INFO'}, f"Exported character file: {file_name} ({shared}write {result['phases'].get('fbx_operator', 0.0):.2f}s)")
+            elif reduction: self.report({'INFO'}, f"Exported animation: {file_name} ({result['duration']:.2f}s, keys {reduction['keys_before']} -> {reduction['keys_after']}, max error {reduction['max_error']['translation']:.3f}cm / {reduction['max_error']['rotation']:.3f}deg / {reduction['max_error']['scale']:.4f})")
+            else: self.report({'INFO'}, f"Exported animation: {file_name} ({result['duration']:.2f}s)")
+            if manifest is not None and file_name in fingerprints: manifest["entries"][file_name] = {"fingerprint": fingerprints[file_name], "exported": time.time()}
+        return exported, failed
+
+    def character_part_results(self, context, armature, jobs, export_path, texture_store=None):
+        """Export character parts one by one, yielding each result record (one per file)."""
+        for job in jobs:
+            self.progress.begin_job(job["name"])
+            result = export_character_part(context, armature, job["part"], export_path, texture_store)
+            if self.memory: self.memory.after_export(result)
+            yield result
+        if texture_store: last_export_stats["textures"] = texture_store.stats
+
+    def take_group_results(self, context, armature, jobs, export_path):
+        """Export multi-take jobs one by one, yielding each result record (one per file)."""
+        for job in jobs:
+            self.progress.begin_job(job["name"], job["frames"])
+            result = export_take_group(context, armature, job["name"], job["takes"], export_path)
+            if self.memory: self.memory.after_export(result)
+            yield result
+
+
+class OBJECT_OT_batch_export_fbx_modal(OBJECT_OT_batch_export_fbx):
+    """Batch Export FBX without blocking the UI: one file per timer tick, Esc to cancel"""
+    bl_idname = "export.batch_fbx_modal"
+    bl_label = "Batch Export FBX (Background)"
+
+    def execute(self, context):
+        global active_batch_progress
+        if active_batch_progress is not None: self.report({'WARNING'}, "A batch export is already running."); return {'CANCELLED'}
+        self.progress = BatchProgress(); self.steps = self.batch_steps(context)
+        active_batch_progress = self.progress
+        wm = context.window_manager
+        self.timer = wm.event_timer_add(0.01, window=context.window)
+        wm.modal_handler_add(self); wm.progress_begin(0, 100)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            self.steps.close() # Restores the scene and reports the cancelled batch (see batch_steps)
+            self.finish(context); return {'CANCELLED'}
+        if event.type != 'TIMER' or event.timer is not self.timer: return {'PASS_THROUGH'}
+        try: next(self.steps)
+        except StopIteration as stop:
+            self.finish(context); return stop.value or {'FINISHED'}
+        except Exception as e_step:
+            self.steps.close(); self.finish(context)
+            self.report({'ERROR'}, f"Batch export failed: {e_step}"); print(traceback.format_exc())
+            return {'CANCELLED'}
+        context.window_manager.progress_update(self.progress.fraction() * 100)
+        context.window_manager.batch_export_progress = self.progress.fraction() * 100
+        if context.workspace: context.workspace.status_text_set(self.progress.status_text())
+        for area in context.screen.areas if context.screen else []:
+            if area.type == 'VIEW_3D': area.tag_redraw()
+        return {'RUNNING_MODAL'}
+
+    def finish(self, context):
+        global active_batch_progress
+        active_batch_progress = None
+        wm = context.window_manager
+        wm.event_timer_remove(self.timer); wm.progress_end()
+        if context.workspace: context.workspace.status_text_set(None)
+        for area in context.screen.areas if context.screen else []:
+            if area.type == 'VIEW_3D': area.tag_redraw()
+
 
 # --- Panel ---
 class OBJECT_PT_batch_export_fbx_panel(Panel):
@@ -434,8 +3426,30 @@ class OBJECT_PT_batch_export_fbx_panel(Panel):
             op = warning_box.operator("scene.set_unreal_scale", icon='MODIFIER', text="Fix Scale Now")
             layout.separator()
 
+        # --- Running Background Export ---
+        if active_batch_progress is not None:
+            progress = active_batch_progress
+            progress_box = layout.box()
+            progress_box.label(text=f"Exporting {progress.done + 1}/{progress.total}: {progress.current}", icon='EXPORT')
+            row = progress_box.row(); row.enabled = False
+            row.prop(context.window_manager, "batch_export_progress", text="Progress", slider=True)
+            eta = progress.eta()
+            progress_box.label(text=f"Elapsed {format_duration(progress.elapsed())}" + (f"  |  ETA {format_duration(eta)}" if eta is not None else "") + "  |  Esc to cancel")
+            layout.separator()
+
         # --- Export Path ---
         layout.prop(scene, "batch_export_path")
+        row = layout.row(align=True)
+        row.prop(scene, "use_export_staging")
+        if scene.use_export_staging:
+            row.prop(scene, "export_transfer_threads", text="Threads"); row.prop(scene, "export_verify_checksum", text="", icon='CHECKMARK')
+            layout.prop(scene, "export_staging_dir", text="Scratch")
+        row = layout.row(align=True)
+        row.prop(scene, "use_export_verify")
+        row = layout.row(align=True)
+        row.prop(scene, "use_memory_bound")
+        sub = row.row(align=True); sub.enabled = scene.use_memory_bound
+        sub.prop(scene, "export_memory_limit_mb", text="Ceiling MB")
 
         # --- Armature selection ---
         box = layout.box()
@@ -455,6 +3469,8 @@ class OBJECT_PT_batch_export_fbx_panel(Panel):
             inner_char_box.prop(scene, "character_name")
             # *** ADDED LOD TOGGLE ***
             inner_char_box.prop(scene, "export_lods")
+            if scene.export_lods: inner_char_box.prop(scene, "lod_name_pattern", text="Pattern")
+            inner_char_box.prop(scene, "character_split", text="Files")
             inner_char_box.separator()
 
             row = inner_char_box.row()
@@ -476,14 +3492,81 @@ class OBJECT_PT_batch_export_fbx_panel(Panel):
             inner_anim_box = box_anim.box()
             inner_anim_box.enabled = anim_options_enabled # Grey out options if no armature
 
-            row = inner_anim_box.row()
+            row = inner_anim_box.row(align=True)
             row.prop(scene, "select_all_actions", text="Select All")
+            row.label(text=f"{export_registry.count()} / {len(bpy.data.actions)} flagged")
+            row.operator("anim.flag_shown_actions", text="", icon='CHECKBOX_HLT').flag = True
+            row.operator("anim.flag_shown_actions", text="", icon='CHECKBOX_DEHLT').flag = False
             row = inner_anim_box.row()
             row.template_list(ACTION_UL_list.bl_idname, "", bpy.data, "actions", scene, "action_index")
             row = inner_anim_box.row(align=True)
+            row.prop(scene, "rig_mismatch_policy", text="Rig Mismatch")
+            sub = row.row(align=True); sub.enabled = scene.rig_mismatch_policy != 'OFF'
+            sub.prop(scene, "rig_match_threshold", text="Match")
+            inner_anim_box.prop(scene, "animation_backend")
+            if scene.animation_backend == 'OPERATOR': inner_anim_box.prop(scene, "use_deform_proxy")
+            if scene.animation_backend == 'FAST':
+                row = inner_anim_box.row(align=True)
+                row.prop(scene, "use_bake_cache")
+                sub = row.row(align=True); sub.enabled = scene.use_bake_cache
+                sub.prop(scene, "bake_cache_budget_mb", text="Budget MB")
+                sub.operator("export.clear_bake_cache", text="", icon='TRASH')
+                reduce_box = inner_anim_box.column(align=True)
+                reduce_box.prop(scene, "use_key_reduction")
+                if scene.use_key_reduction:
+                    row = reduce_box.row(align=True)
+                    row.prop(scene, "reduction_translation_tolerance", text="T (cm)")
+                    row.prop(scene, "reduction_rotation_tolerance", text="R (deg)")
+                    row.prop(scene, "reduction_scale_tolerance", text="S")
+            else: inner_anim_box.label(text="Key reduction needs the Fast Animation Writer.", icon='INFO')
+            take_box = inner_anim_box.column(align=True)
+            take_box.prop(scene, "animation_file_mode")
+            if scene.animation_file_mode == 'TAKES':
+                row = take_box.row(align=True)
+                row.prop(scene, "take_grouping", text="")
+                if scene.take_grouping == 'PREFIX': row.prop(scene, "take_group_separator", text="Separator")
+            else:
+                clip_box = inner_anim_box.column(align=True)
+                clip_box.prop(scene, "split_clips_by_markers")
+                if scene.split_clips_by_markers:
+                    row = clip_box.row(align=True)
+                    row.prop(scene, "clip_marker_source", text="")
+                    row.prop(scene, "clip_name_format", text="Name")
+            row = inner_anim_box.row(align=True)
+            row.prop(scene, "export_incremental")
+            sub = row.row(align=True); sub.enabled = scene.export_incremental
+            sub.prop(scene, "export_force")
+            row = inner_anim_box.row(align=True); row.enabled = scene.animation_file_mode == 'PER_ACTION' # Take groups export serially
+            row.prop(scene, "export_parallel")
+            sub = row.row(align=True); sub.enabled = scene.export_parallel
+            sub.prop(scene, "export_workers")
+            row = inner_anim_box.row(align=True)
             row.operator("anim.push_actions_to_nla", text="Push to NLA", icon='NLA')
             row.operator("anim.delete_selected_actions", text="Delete Selected", icon='X')
 
+        # --- Character Profiles ---
+        profiles_box = layout.box()
+        profiles_box.prop(scene, "show_character_profiles", text=f"Character Profiles ({len(scene.character_profiles)})", icon='TRIA_DOWN' if scene.show_character_profiles else 'TRIA_RIGHT', emboss=False)
+        if scene.show_character_profiles:
+            row = profiles_box.row()
+            row.template_list(SCENE_UL_character_profiles.bl_idname, "", scene, "character_profiles", scene, "character_profile_index", rows=3)
+            col = row.column(align=True)
+            col.operator("scene.character_profile_capture", icon='ADD', text="").new = True
+            col.operator("scene.character_profile_remove", icon='REMOVE', text="")
+            col.separator()
+            col.operator("scene.character_profile_capture", icon='FILE_REFRESH', text="").new = False
+            col.operator("scene.character_profile_load", icon='IMPORT', text="")
+            if 0 <= scene.character_profile_index < len(scene.character_profiles):
+                profile = scene.character_profiles[scene.character_profile_index]
+                col = profiles_box.column(align=True)
+                col.prop(profile, "armature")
+                col.prop(profile, "subdirectory")
+                row = col.row(align=True); row.prop(profile, "export_character", toggle=True); row.prop(profile, "export_animations", toggle=True); row.prop(profile, "export_lods", toggle=True)
+                row = col.row(align=True); row.prop(profile, "action_include"); row.prop(profile, "action_exclude")
+                row = col.row(align=True); row.prop(profile, "flagged_only"); row.label(text=f"{sum(1 for item in profile.objects if item.object and item.export)} meshes")
+            row = profiles_box.row(); row.scale_y = 1.2
+            row.operator("export.batch_fbx_profiles", icon='EXPORT')
+
         # --- Export options Toggle ---
         main_opts_box = layout.box()
         main_opts_box.prop(scene, "show_export_options")
@@ -505,7 +3588,22 @@ class OBJECT_PT_batch_export_fbx_panel(Panel):
             options_inner_box.prop(scene, "use_armature_deform_only")
             options_inner_box.prop(scene, "use_tspace")
             options_inner_box.prop(scene, "use_mesh_edges")
-            options_inner_box.prop(scene, "embed_textures")
+            options_inner_box.prop(scene, "texture_mode")
+            if scene.texture_mode == 'STORE': options_inner_box.prop(scene, "texture_store_dir", text="Store")
+            else: options_inner_box.prop(scene, "embed_textures")
+
+        # --- Last Run Timings ---
+        if last_export_results:
+            timing_box = layout.box()
+            row = timing_box.row(align=True)
+            row.prop(scene, "show_export_timings", text="Slowest Assets (Last Run)", icon='TRIA_DOWN' if scene.show_export_timings else 'TRIA_RIGHT', emboss=False)
+            if scene.show_export_timings: row.prop(scene, "export_timings_count", text="")
+            if scene.show_export_timings:
+                col = timing_box.column(align=True)
+                for record in slowest_results(scene.export_timings_count):
+                    top_phase = max(record["phases"].items(), key=lambda item: item[1], default=None)
+                    detail = f"  ({top_phase[0]} {top_phase[1]:.2f}s)" if top_phase else ""
+                    col.label(text=f"{record['name']}: {record['duration'] + record['transfer']:.2f}s{detail}", icon='ERROR' if record["status"] == 'ERROR' else 'TIME')
 
         # --- Export Button ---
         row = layout.row()
@@ -516,8 +3614,16 @@ class OBJECT_PT_batch_export_fbx_panel(Panel):
                  armature_selected = scene.character_armature is not None
                  exporting_requires_armature = scene.export_character or scene.export_animations
                  if (exporting_requires_armature and armature_selected) or (not exporting_requires_armature): is_ready = True
-             row.enabled = is_ready
+             row.enabled = is_ready and active_batch_progress is None
              row.operator("export.batch_fbx", text="Export FBX Batch")
+             row.operator("export.batch_fbx_modal", text="", icon='TIME')
+             row.operator("export.batch_fbx_dry_run", text="", icon='VIEWZOOM')
+             row = layout.row(align=True)
+             row.prop(scene, "use_export_watch", icon='HIDE_OFF' if scene.use_export_watch else 'HIDE_ON')
+             sub = row.row(align=True); sub.enabled = scene.use_export_watch
+             sub.prop(scene, "export_watch_trigger", text="")
+             if scene.export_watch_trigger == 'IDLE': sub.prop(scene, "export_watch_delay", text="")
+             if scene.use_export_watch and export_watcher.pending(): layout.label(text="Changes waiting for re-export", icon='FILE_REFRESH')
         except Exception as e:
              print(f"ERROR drawing export button: {e}\n{traceback.format_exc()}")
              layout.label(text="Error drawing button!", icon='ERROR')
@@ -527,6 +3633,7 @@ class OBJECT_PT_batch_export_fbx_panel(Panel):
 # This function will be called when Action.export changes
 def update_export_sync(self, context):
     """Updates Action.select if it exists and has a different value."""
+    export_registry.set_flag(self, self.export)
     # Check if the 'select' property exists (i.e., Animation Manager is loaded)
     if hasattr(self, "select"):
         # Check if the value needs changing to prevent infinite loops
@@ -536,47 +3643,130 @@ def update_export_sync(self, context):
 
 
 # --- Utility Operators ---
-# (No changes in this section)
 def update_select_all(self, context):
-    # This function now toggles Action.export, which will trigger the sync
-    for action in bpy.data.actions: setattr(action, "export", self.select_all_actions)
+    # Bulk-flag all actions in one pass (no per-action update callbacks)
+    set_actions_export(bpy.data.actions, self.select_all_actions)
 
-class OBJECT_OT_character_object_add(Operator):
-    bl_idname = "object.character_object_add"; bl_label = "Add Character Object"; bl_options = {'REGISTER', 'UNDO'}
+class ANIM_OT_flag_shown_actions(Operator):
+    bl_idname = "anim.flag_shown_actions"; bl_label = "Flag Shown Actions"; bl_description = "Flag or unflag for export every action currently shown in the filtered list"; bl_options = {'REGISTER', 'UNDO'}
+    flag: BoolProperty(default=True)
+    def execute(self, context):
+        actions = [action for action in (bpy.data.actions.get(name) for name in action_list_shown) if action]
+        set_actions_export(actions, self.flag)
+        if context.area: context.area.tag_redraw()
+        self.report({'INFO'}, f"{'Flagged' if self.flag else 'Unflagged'} {len(actions)} actions."); return {'FINISHED'}
+
+class SCENE_OT_character_profile_capture(Operator):
+    bl_idname = "scene.character_profile_capture"; bl_label = "Save Character Profile"; bl_description = "Store the current armature, character name, mesh list and LOD setting as a new profile (or into the selected one)"; bl_options = {'REGISTER', 'UNDO'}
+    new: BoolProperty(default=True)
     @classmethod
-    def poll(cls, context): return context.active_object and context.active_object.type == 'MESH'
+    def poll(cls, context): return context.scene.character_armature is not None
     def execute(self, context):
-        active_obj = context.active_object
-        if active_obj:
-             if any(item.object == active_obj for item in context.scene.character_objects): self.report({'WARNING'}, f"'{active_obj.name}' already in list."); return {'CANCELLED'}
-             item = context.scene.character_objects.add(); item.object = active_obj
-             context.scene.character_object_index = len(context.scene.character_objects) - 1; return {'FINISHED'}
-        else: self.report({'WARNING'}, "No active mesh object selected."); return {'CANCELLED'}
+        scene = context.scene; profiles = scene.character_profiles
+        if self.new: profile = profiles.add(); scene.character_profile_index = len(profiles) - 1
+        elif 0 <= scene.character_profile_index < len(profiles): profile = profiles[scene.character_profile_index]
+        else: self.report({'WARNING'}, "No profile selected."); return {'CANCELLED'}
+        profile.name = scene.character_name; profile.armature = scene.character_armature; profile.export_lods = scene.export_lods
+        profile.export_character = scene.export_character; profile.export_animations = scene.export_animations
+        profile.objects.clear()
+        for item in scene.character_objects:
+            copy = profile.objects.add(); copy.object = item.object; copy.export = item.export
+        self.report({'INFO'}, f"Saved profile '{profile.name}' ({len(profile.objects)} meshes)."); return {'FINISHED'}
+
+class SCENE_OT_character_profile_load(Operator):
+    bl_idname = "scene.character_profile_load"; bl_label = "Load Character Profile"; bl_description = "Load the selected profile into the panel for editing or a single export"; bl_options = {'REGISTER', 'UNDO'}
+    @classmethod
+    def poll(cls, context): scene = context.scene; return 0 <= scene.character_profile_index < len(scene.character_profiles)
+    def execute(self, context):
+        scene = context.scene; profile = scene.character_profiles[scene.character_profile_index]
+        scene.character_name = profile.name; scene.character_armature = profile.armature; scene.export_lods = profile.export_lods
+        scene.export_character = profile.export_character; scene.export_animations = profile.export_animations
+        scene.character_objects.clear()
+        for item in profile.objects:
+            copy = scene.character_objects.add(); copy.object = item.object; copy.export = item.export
+        return {'FINISHED'}
 
-class OBJECT_OT_character_object_remove(Operator):
-    bl_idname = "object.character_object_remove"; bl_label = "Remove Character Object"; bl_options = {'REGISTER', 'UNDO'}
+class SCENE_OT_character_profile_remove(Operator):
+    bl_idname = "scene.character_profile_remove"; bl_label = "Remove Character Profile"; bl_options = {'REGISTER', 'UNDO'}
     @classmethod
-    def poll(cls, context): scene = context.scene; return scene.character_objects and 0 <= scene.character_object_index < len(scene.character_objects)
+    def poll(cls, context): scene = context.scene; return 0 <= scene.character_profile_index < len(scene.character_profiles)
     def execute(self, context):
-        scene = context.scene; index = scene.character_object_index
-        if 0 <= index < len(scene.character_objects):
-            scene.character_objects.remove(index); scene.character_object_index = min(max(0, index - 1), len(scene.character_objects) - 1); return {'FINISHED'}
-        else: self.report({'WARNING'}, "No item selected to remove."); return {'CANCELLED'}
+        scene = context.scene; index = scene.character_profile_index
+        scene.character_profiles.remove(index); scene.character_profile_index = min(max(0, index - 1), len(scene.character_profiles) - 1); return {'FINISHED'}
 
-class SCENE_OT_set_unreal_scale(Operator):
-    bl_idname = "scene.set_unreal_scale"; bl_label = "Set Unit Scale to 0.01 (UE)"; bl_description = "Set the unit scale to 0.01 for Unreal Engine compatibility"; bl_options = {'REGISTER', 'UNDO'}
+class EXPORT_OT_batch_fbx_profiles(Operator):
+    """Export every enabled character profile into its own subdirectory (concurrently when Parallel Export is on)"""
+    bl_idname = "export.batch_fbx_profiles"; bl_label = "Export All Profiles"
+    @classmethod
+    def poll(cls, context): scene = context.scene; return bool(scene.batch_export_path) and active_batch_progress is None and any(profile.enabled for profile in scene.character_profiles)
     def execute(self, context):
-        old_scale = context.scene.unit_settings.scale_length; context.scene.unit_settings.system = 'METRIC'; context.scene.unit_settings.scale_length = 0.01
-        if len(context.scene.objects) > 0 and abs(old_scale - 0.01) > 0.0001: self.report({'WARNING'}, "Scale changed from {:.4f} to 0.01. This may affect existing objects/rigs!".format(old_scale))
-        else: self.report({'INFO'}, "Unit scale set to 0.01 for Unreal Engine compatibility")
+        scene = context.scene; export_path = bpy.path.abspath(scene.batch_export_path)
+        jobs = []; summaries = {}; directories = {} # Resolved subdirectory (case-insensitive, as on Windows and macOS) -> profile name
+        for profile in scene.character_profiles:
+            if not profile.enabled: continue
+            job = profile_job(scene, profile, export_path)
+            if profile.name in summaries or any(other["character_name"] == profile.name for other in jobs): self.report({'ERROR'}, f"Duplicate profile name '{profile.name}'. Skipped."); continue
+            directory = os.path.normcase(os.path.abspath(job["export_path"])).casefold()
+            if directory in directories: self.report({'ERROR'}, f"Profile '{profile.name}' exports into the same directory as '{directories[directory]}' ({job['export_path']}). Skipped."); continue
+            directories[directory] = profile.name
+            if not profile.armature: summaries[profile.name] = error_summary(job, "Profile has no armature."); continue
+            try: os.makedirs(job["export_path"], exist_ok=True)
+            except OSError as e_dir: summaries[profile.name] = error_summary(job, f"Could not create {job['export_path']}: {e_dir}"); continue
+            jobs.append(job)
+        worker_count = min(scene.export_workers, len(jobs)) if scene.export_parallel else 1
+        start_time = time.perf_counter()
+        try: summaries.update(run_profiles_parallel(jobs, worker_count) if worker_count > 1 else run_profiles_serial(jobs))
+        except Exception as e_run: self.report({'ERROR'}, f"Profile export failed: {e_run}"); print(traceback.format_exc()); return {'CANCELLED'}
+
+        last_export_results.clear()
+        for summary in summaries.values():
+            for record in summary["files"]: last_export_results.append(dict(new_result(record["name"], record["file"]), **record))
+            files_ok = sum(1 for record in summary["files"] if record["status"] == 'OK')
+            if summary["status"] == 'OK': self.report({'INFO'}, f"Profile '{summary['job']}': {files_ok} file(s) in {summary['duration']:.1f}s.")
+            else: self.report({'ERROR'}, f"Profile '{summary['job']}': " + "; ".join(summary["errors"][:3]))
+        overview = {"duration": time.perf_counter() - start_time, "workers": worker_count,
+                    "profiles": [dict({key: summary[key] for key in ("job", "status", "duration", "errors")}, files=len(summary["files"])) for summary in summaries.values()]}
+        try:
+            with open(os.path.join(export_path, "profiles_" + PROFILE_SUMMARY_NAME), 'w', encoding='utf-8') as f: json.dump(overview, f, indent=1)
+        except OSError as e_summary: self.report({'WARNING'}, f"Could not write profile summary: {e_summary}")
+        failed = sum(1 for summary in summaries.values() if summary["status"] != 'OK')
+        if failed: self.report({'WARNING'}, f"Exported {len(summaries) - failed}/{len(summaries)} profiles in {overview['duration']:.1f}s. See console for details.")
+        else: self.report({'INFO'}, f"Exported {len(summaries)} profiles in {overview['duration']:.1f}s" + (f" on {worker_count} workers." if worker_count > 1 else "."))
         return {'FINISHED'}
 
+class EXPORT_OT_clear_bake_cache(Operator):
+    bl_idname = "export.clear_bake_cache"; bl_label = "Clear Bake Cache"; bl_description = "Delete all cached animation samples"
+    def execute(self, context):
+        bake_cache.clear(bake_cache_dir()); self.report({'INFO'}, "Bake cache cleared."); return {'FINISHED'}
+
+class EXPORT_OT_batch_fbx_dry_run(Operator):
+    """Show what the batch export would do and how long it should take, without exporting anything"""
+    bl_idname = "export.batch_fbx_dry_run"; bl_label = "Dry Run"
+    def invoke(self, context, event):
+        if not context.scene.batch_export_path: self.report({'ERROR'}, "Export Path not set."); return {'CANCELLED'}
+        self.plan = ExportPlan(context)
+        print("\n".join(["Batch FBX export plan:"] + self.plan.summary_lines() + [f"Warning: {warning}" for warning in self.plan.warnings]))
+        return context.window_manager.invoke_popup(self, width=600)
+    def draw(self, context):
+        plan = self.plan; layout = self.layout; col = layout.column(align=True)
+        existing = sum(1 for job in plan.jobs if job["exists"]); collisions = len(plan.collisions)
+        col.label(text=f"{len(plan.jobs)} job(s), {existing} overwrite(s), {collisions} collision(s) -> {plan.export_path}", icon='INFO')
+        col.label(text=f"Estimated time: {format_duration(plan.estimate_seconds())}" + (f" on {plan.workers} workers" if plan.workers > 1 else ""), icon='TIME')
+        for warning in plan.warnings[:5]: col.label(text=warning, icon='MARKER_HLT')
+        if plan.mismatches: col.label(text=f"{len(plan.mismatches)} action(s) below {context.scene.rig_match_threshold:.0f}% bone match on the rig", icon='ARMATURE_DATA')
+        col.separator()
+        for line, job in zip(plan.summary_lines(limit=25), plan.jobs):
+            col.label(text=line, icon='ERROR' if job["collision"] else ('CANCEL' if job["skip"] else ('FILE_REFRESH' if job["exists"] else 'FILE_NEW')))
+        if len(plan.jobs) > 25: col.label(text=f"... and {len(plan.jobs) - 25} more (full plan printed to the console)")
+    def execute(self, context): return {'FINISHED'}
+
 # --- Registration ---
 # Define axis items tuple (used by both properties)
 axis_items = ( ('X', "X", ""), ('Y', "Y", ""), ('Z', "Z", ""), ('-X', "-X", ""), ('-Y', "-Y", ""), ('-Z', "-Z", ""),)
 
 # Define list of classes to register
-classes = ( ACTION_UL_list, ANIM_OT_set_active_action, ANIM_OT_push_actions_to_nla, ANIM_OT_delete_selected_actions, MeshObject, OBJECT_UL_character_objects, OBJECT_OT_character_object_add, OBJECT_OT_character_object_remove, OBJECT_OT_batch_export_fbx, OBJECT_PT_batch_export_fbx_panel, SCENE_OT_set_unreal_scale,)
+classes = ( ACTION_UL_list, ANIM_OT_set_active_action, ANIM_OT_push_actions_to_nla, ANIM_OT_delete_selected_actions, MeshObject, CharacterProfile, OBJECT_UL_character_objects, SCENE_UL_character_profiles, OBJECT_OT_character_object_add, OBJECT_OT_character_object_remove, OBJECT_OT_batch_export_fbx, OBJECT_OT_batch_export_fbx_modal, OBJECT_PT_batch_export_fbx_panel, SCENE_OT_set_unreal_scale, EXPORT_OT_clear_bake_cache, ANIM_OT_flag_shown_actions, EXPORT_OT_batch_fbx_dry_run,
+            SCENE_OT_character_profile_capture, SCENE_OT_character_profile_load, SCENE_OT_character_profile_remove, EXPORT_OT_batch_fbx_profiles,)
 
 def register():
     for cls in classes: bpy.utils.register_class(cls)
@@ -606,29 +3796,108 @@ def register():
     bpy.types.Scene.character_armature = PointerProperty(type=bpy.types.Object, name="Character Armature", description="Select the armature for the character", poll=lambda self, obj: obj.type == 'ARMATURE')
     bpy.types.Scene.use_armature_deform_only = BoolProperty(name="Deform Bones Only", description="Export only deformation bones (skip control bones)", default=True)
     bpy.types.Scene.embed_textures = BoolProperty(name="Embed Textures", description="Embed texture files within the FBX", default=False)
+    bpy.types.Scene.texture_mode = EnumProperty(name="Textures", description="How character exports bring their image files along", items=[('COPY', "Copy", "Copy the images next to every FBX (or embed them)"), ('STORE', "Shared Store", "Keep each unique image once in a content-hashed store and reference it from the FBX files")], default='COPY')
+    bpy.types.Scene.texture_store_dir = StringProperty(name="Texture Store", description="Directory of the shared texture store (empty: 'Textures' in the export path)", default="", subtype='DIR_PATH')
     bpy.types.Scene.show_export_options = BoolProperty(name="Show Advanced Export Options", description="Show detailed FBX export settings like axis orientation", default=False)
     bpy.types.Scene.fbx_axis_forward = EnumProperty(name="Forward", description="Forward axis for FBX export", items=axis_items, default='-Y')
     bpy.types.Scene.fbx_axis_up = EnumProperty(name="Up", description="Up axis for FBX export", items=axis_items, default='Z')
     bpy.types.Scene.export_lods = BoolProperty(name="Export LODs (by Name)", description="Automatically find and include meshes named _LOD1, _LOD2, etc., skinned to the same armature", default=False)
+    bpy.types.Scene.character_split = EnumProperty(name="Character Files", description="How the character meshes are split into FBX files (each includes the armature)", items=[('NONE', "Single File", "All meshes and LODs in one FBX"), ('LOD', "Per LOD Level", "One FBX per LOD level ({character}_LOD0, _LOD1, ...)"), ('MESH', "Per Mesh Part", "One FBX per base mesh with its LODs ({character}_{mesh})")], default='NONE')
+    bpy.types.Scene.animation_backend = EnumProperty(name="Writer", description="Backend used to write animation FBX files", items=[('OPERATOR', "FBX Operator", "Blender's stock FBX exporter (full scene evaluation)"), ('FAST', "Fast Animation Writer", "Sample bones in bulk with NumPy and write skeleton + take directly (supports key reduction)")], default='OPERATOR')
+    bpy.types.Scene.use_deform_proxy = BoolProperty(name="Deform-Only Proxy", description="FBX operator writer: bake each action once onto a temporary armature without constraints or drivers, and export that instead of the control rig", default=False)
+    bpy.types.Scene.use_bake_cache = BoolProperty(name="Bake Cache", description="Reuse sampled bone transforms between exports (kept in memory and as .npz files in the per-user cache directory, or BATCH_FBX_CACHE_DIR)", default=True)
+    bpy.types.Scene.bake_cache_budget_mb = IntProperty(name="Bake Cache Budget (MB)", description="Disk budget of the bake cache; least recently used entries are deleted beyond it", default=2048, min=16)
+    bpy.types.Scene.use_key_reduction = BoolProperty(name="Reduce Keys", description="Remove baked keys that linear interpolation reproduces within the tolerances below. Fast Animation Writer only: the FBX Operator always writes every baked key", default=False)
+    bpy.types.Scene.reduction_translation_tolerance = FloatProperty(name="Translation Tolerance", description="Maximum translation error in centimetres (Fast Animation Writer key reduction)", default=0.01, min=0.0, precision=4)
+    bpy.types.Scene.reduction_rotation_tolerance = FloatProperty(name="Rotation Tolerance", description="Maximum rotation error in degrees per Euler channel (Fast Animation Writer key reduction)", default=0.05, min=0.0, precision=4)
+    bpy.types.Scene.reduction_scale_tolerance = FloatProperty(name="Scale Tolerance", description="Maximum scale error (Fast Animation Writer key reduction)", default=0.001, min=0.0, precision=4)
+    bpy.types.Action.export_dense = BoolProperty(name="Keep Dense", description="Never reduce keys of this action (e.g. facial animation)", default=False)
+    bpy.types.Scene.lod_name_pattern = StringProperty(name="LOD Name Pattern", description="Regular expression(s) for LOD mesh names, separated by ';'. Each needs (?P<base>...) for the base mesh name and (?P<level>...) for the LOD number", default=DEFAULT_LOD_PATTERN, update=update_lod_pattern)
+    bpy.types.Scene.export_cost_rates = StringProperty(name="Export Cost Rates", description="Measured seconds per cost unit, used for export time estimates (internal)", default="")
+    bpy.types.Scene.use_export_staging = BoolProperty(name="Stage Locally", description="Write FBX files to a local scratch directory and move them into the export path in the background (atomic, no partial files)", default=False)
+    bpy.types.Scene.export_staging_dir = StringProperty(name="Scratch Directory", subtype='DIR_PATH', default="", description="Local directory for staged files (empty: system temp directory)")
+    bpy.types.Scene.export_transfer_threads = IntProperty(name="Transfer Threads", description="Number of background threads copying staged files to the export path", default=2, min=1, max=16)
+    bpy.types.Scene.export_verify_checksum = BoolProperty(name="Verify Checksum", description="Compare SHA-256 of the staged and the copied file before renaming it into place", default=False)
+    bpy.types.Scene.use_export_watch = BoolProperty(name="Watch", description="Re-export only the actions, meshes and rig edited since the last export, in the background", default=False, update=update_export_watch)
+    bpy.types.Scene.export_watch_trigger = EnumProperty(name="Re-Export On", description="When watch mode re-exports the changed jobs", items=[('SAVE', "Save", "After the .blend is saved"), ('IDLE', "Pause", "Once edits have paused for the delay")], default='SAVE')
+    bpy.types.Scene.export_watch_delay = FloatProperty(name="Delay", description="Seconds without edits before watch mode re-exports", default=2.0, min=0.1, max=600.0, subtype='TIME', unit='TIME')
+    bpy.types.Scene.rig_mismatch_policy = EnumProperty(name="Rig Mismatch", description="What to do with flagged actions whose bones are mostly missing from the character armature", items=[('OFF', "Ignore", "Export every flagged action"), ('WARN', "Warn", "Export, but report actions below the bone match threshold"), ('SKIP', "Skip", "Don't export actions below the bone match threshold")], default='WARN')
+    bpy.types.Scene.rig_match_threshold = FloatProperty(name="Bone Match", description="Minimum percentage of an action's animated bones that must exist on the armature", default=50.0, min=0.0, max=100.0, subtype='PERCENTAGE', precision=0)
+    bpy.types.Scene.use_export_verify = BoolProperty(name="Verify Files", description="Read back every written FBX (bones, frame range, meshes) and keep an asset index of the export directory", default=False)
+    bpy.types.Scene.use_memory_bound = BoolProperty(name="Memory-Bounded", description="Remove datablocks left behind after every file and track memory use. Headless runs hand the remaining actions to a fresh process above the ceiling", default=False)
+    bpy.types.Scene.export_memory_limit_mb = IntProperty(name="Memory Ceiling (MB)", description="Resident memory above which a headless batch continues in a fresh Blender process (0: no ceiling)", default=16384, min=0)
+    bpy.types.Scene.show_export_timings = BoolProperty(name="Show Slowest Assets", description="List the slowest files of the last batch export with their slowest phase", default=False)
+    bpy.types.Scene.export_timings_count = IntProperty(name="Slowest Assets", description="Number of slowest files listed", default=5, min=1, max=50)
+    bpy.types.Scene.split_clips_by_markers = BoolProperty(name="Split Clips by Markers", description="Export each range marked with 'clip_start:Name' / 'clip_end:Name' markers as its own file, sampled once per action (fast writer)", default=False)
+    bpy.types.Scene.clip_marker_source = EnumProperty(name="Clip Markers", description="Where clip markers are read from", items=[('ACTION', "Action Markers", "Pose markers of each action"), ('TIMELINE', "Timeline Markers", "Scene timeline markers, applied to every flagged action")], default='ACTION')
+    bpy.types.Scene.clip_name_format = StringProperty(name="Clip Name", description="File name of a clip; {clip} is the marker name and {action} the action name", default="{clip}")
+    bpy.types.Scene.animation_file_mode = EnumProperty(name="Files", description="How flagged actions are split into FBX files", items=[('PER_ACTION', "One per Action", "Export every action (or marker clip) to its own FBX file"), ('TAKES', "Multi-Take", "Export each action group to one FBX file with one take per action")], default='PER_ACTION')
+    bpy.types.Scene.take_grouping = EnumProperty(name="Groups", description="Which actions share a multi-take file", items=[('PREFIX', "Name Prefix", "Group flagged actions by the part of their name before the separator"), ('NLA', "NLA Tracks", "One file with a take per strip on the armature's unmuted NLA tracks")], default='PREFIX')
+    bpy.types.Scene.take_group_separator = StringProperty(name="Separator", description="Actions whose names match up to the first separator share a file ('Hero_Walk' -> Hero.fbx)", default="_")
+    bpy.types.Scene.character_profiles = CollectionProperty(type=CharacterProfile)
+    bpy.types.Scene.character_profile_index = IntProperty()
+    bpy.types.Scene.show_character_profiles = BoolProperty(name="Show Character Profiles", description="Show the character profiles exported together by 'Export All Profiles'", default=False)
+    bpy.types.WindowManager.batch_export_progress = FloatProperty(name="Batch Export Progress", subtype='PERCENTAGE', min=0.0, max=100.0, default=0.0)
+    bpy.types.Scene.export_incremental = BoolProperty(name="Incremental", description="Skip actions whose keyframes, rig and export settings are unchanged since the last export (tracked in a manifest in the export directory)", default=False)
+    bpy.types.Scene.export_force = BoolProperty(name="Force", description="Re-export every action even if the manifest says it is unchanged", default=False)
+    bpy.types.Scene.export_parallel = BoolProperty(name="Parallel Export", description="Export animations across several headless Blender worker processes", default=False)
+    bpy.types.Scene.export_workers = IntProperty(name="Workers", description="Number of headless Blender processes used for parallel animation export", default=min(4, os.cpu_count() or 1), min=1, max=64)
+
+    # --- Handlers ---
+    bpy.app.handlers.depsgraph_update_post.append(lod_index_depsgraph_update)
+    for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post): handlers.append(lod_index_invalidate); handlers.append(export_registry_invalidate)
+    bpy.app.handlers.save_post.append(library_sidecar_save)
+    bpy.app.handlers.depsgraph_update_post.append(export_watch_depsgraph_update); bpy.app.handlers.save_post.append(export_watch_save_post)
+    bpy.app.handlers.depsgraph_update_post.append(rig_compatibility_depsgraph_update)
+    bpy.app.handlers.depsgraph_update_post.append(mesh_hash_depsgraph_update)
+    for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post): handlers.append(mesh_hash_invalidate)
 
 
 def unregister():
+    # --- Remove Handlers ---
+    for handlers, callback in ((bpy.app.handlers.depsgraph_update_post, lod_index_depsgraph_update), (bpy.app.handlers.load_post, lod_index_invalidate),
+                               (bpy.app.handlers.undo_post, lod_index_invalidate), (bpy.app.handlers.redo_post, lod_index_invalidate),
+                               (bpy.app.handlers.load_post, export_registry_invalidate), (bpy.app.handlers.undo_post, export_registry_invalidate),
+                               (bpy.app.handlers.redo_post, export_registry_invalidate), (bpy.app.handlers.save_post, library_sidecar_save),
+                               (bpy.app.handlers.depsgraph_update_post, export_watch_depsgraph_update), (bpy.app.handlers.save_post, export_watch_save_post),
+                               (bpy.app.handlers.depsgraph_update_post, rig_compatibility_depsgraph_update), (bpy.app.handlers.depsgraph_update_post, mesh_hash_depsgraph_update),
+                               (bpy.app.handlers.load_post, mesh_hash_invalidate), (bpy.app.handlers.undo_post, mesh_hash_invalidate), (bpy.app.handlers.redo_post, mesh_hash_invalidate)):
+        while callback in handlers: handlers.remove(callback)
+    if bpy.app.timers.is_registered(export_watch_tick): bpy.app.timers.unregister(export_watch_tick)
+    export_watcher.scheduled = False
+    lod_indices.clear(); export_registry.invalidate(); rig_compatibility.clear()
+
     # --- Delete Custom Properties ---
     props_to_delete = [
         "batch_export_path", "action_index", "select_all_actions",
         "use_mesh_modifiers", "mesh_smooth_type", "use_mesh_edges", "use_tspace",
         "export_character", "character_name", "character_objects", "character_object_index",
         "export_animations", "character_armature", "use_armature_deform_only",
-        "embed_textures", "show_export_options", "fbx_axis_forward", "fbx_axis_up",
-        "export_lods"
+        "embed_textures", "texture_mode", "texture_store_dir", "show_export_options", "fbx_axis_forward", "fbx_axis_up",
+        "export_lods", "character_split", "export_parallel", "export_workers",
+        "export_incremental", "export_force", "animation_backend", "use_deform_proxy",
+        "use_bake_cache", "bake_cache_budget_mb", "use_key_reduction",
+        "reduction_translation_tolerance", "reduction_rotation_tolerance", "reduction_scale_tolerance",
+        "lod_name_pattern", "export_cost_rates",
+        "use_export_staging", "export_staging_dir", "export_transfer_threads", "export_verify_checksum",
+        "show_export_timings", "export_timings_count", "use_memory_bound", "export_memory_limit_mb",
+        "use_export_watch", "export_watch_trigger", "export_watch_delay", "use_export_verify",
+        "rig_mismatch_policy", "rig_match_threshold",
+        "split_clips_by_markers", "clip_marker_source", "clip_name_format",
+        "animation_file_mode", "take_grouping", "take_group_separator",
+        "character_profiles", "character_profile_index", "show_character_profiles"
     ]
     for prop in props_to_delete:
         try: delattr(bpy.types.Scene, prop)
         except AttributeError: pass
+    if hasattr(bpy.types.WindowManager, "batch_export_progress"): del bpy.types.WindowManager.batch_export_progress
     # Delete Action property safely
     if hasattr(bpy.types.Action, "export"):
         try: del bpy.types.Action.export
         except Exception as e: print(f"Could not delete Action.export: {e}")
+    if hasattr(bpy.types.Action, "export_dense"):
+        try: del bpy.types.Action.export_dense
+        except Exception as e: print(f"Could not delete Action.export_dense: {e}")
 
     # --- Unregister Classes ---
     for cls in reversed(classes):
@@ -636,7 +3905,188 @@ def unregister():
         except RuntimeError: print(f"Could not unregister class: {cls.__name__}")
 
 
+# --- Headless Job Files ---
+# A job file (JSON or TOML) configures one export run for build machines:
+#
+#   export_path = "//Export"          armature = "Rig"            character_name = "Hero"
+#   meshes = ["Body", "Head"]         export_character = true     export_animations = true
+#   [actions]  include = ["*"]  exclude = ["*_WIP"]  flagged_only = false
+#   [options]  axis_forward = "-Y"  use_armature_deform_only = true  incremental = true ...
+#
+# The job is applied on top of the scene's saved settings for the duration of the run only;
+# every touched property is restored afterwards and the .blend is never saved.
+JOB_SCENE_KEYS = {
+    "export_path": "batch_export_path", "character_name": "character_name",
+    "export_character": "export_character", "export_animations": "export_animations", "export_lods": "export_lods", "character_split": "character_split",
+    "lod_pattern": "lod_name_pattern",
+}
+JOB_OPTION_KEYS = {
+    "axis_forward": "fbx_axis_forward", "axis_up": "fbx_axis_up", "mesh_smooth_type": "mesh_smooth_type",
+    "use_mesh_modifiers": "use_mesh_modifiers", "use_mesh_edges": "use_mesh_edges", "use_tspace": "use_tspace",
+    "use_armature_deform_only": "use_armature_deform_only", "embed_textures": "embed_textures", "textures": "texture_mode", "texture_store_dir": "texture_store_dir",
+    "incremental": "export_incremental", "force": "export_force", "parallel": "export_parallel", "workers": "export_workers",
+    "animation_backend": "animation_backend", "deform_proxy": "use_deform_proxy", "bake_cache": "use_bake_cache", "bake_cache_budget_mb": "bake_cache_budget_mb",
+    "reduce_keys": "use_key_reduction", "translation_tolerance": "reduction_translation_tolerance",
+    "rotation_tolerance": "reduction_rotation_tolerance", "scale_tolerance": "reduction_scale_tolerance",
+    "split_clips": "split_clips_by_markers", "clip_markers": "clip_marker_source", "clip_name_format": "clip_name_format",
+    "animation_files": "animation_file_mode", "take_grouping": "take_grouping", "take_separator": "take_group_separator",
+    "staging": "use_export_staging", "staging_dir": "export_staging_dir", "transfer_threads": "export_transfer_threads", "verify_checksum": "export_verify_checksum",
+    "memory_bound": "use_memory_bound", "memory_limit_mb": "export_memory_limit_mb", "verify": "use_export_verify",
+    "rig_mismatch": "rig_mismatch_policy", "rig_match_threshold": "rig_match_threshold",
+}
+
+def load_job_file(job_file):
+    """Read a JSON or TOML job file into a dict."""
+    if job_file.lower().endswith(".toml"):
+        try: import tomllib
+        except ImportError:
+            try: import tomli as tomllib
+            except ImportError: raise RuntimeError("TOML job files need Python 3.11+ (tomllib) or the 'tomli' package; use a .json job file instead.")
+        with open(job_file, 'rb') as f: return tomllib.load(f)
+    with open(job_file, 'r', encoding='utf-8') as f: return json.load(f)
+
+class JobOverrides:
+    """Context manager applying a job file to the scene and restoring everything it touched."""
+    def __init__(self, scene, job):
+        self.scene = scene; self.job = job
+        self.saved_props = {}; self.saved_objects = None; self.saved_flags = None
+
+    def set_prop(self, prop, value):
+        if prop not in self.saved_props: self.saved_props[prop] = getattr(self.scene, prop)
+        setattr(self.scene, prop, value)
+
+    def __enter__(self):
+        scene = self.scene; job = self.job
+        for key, prop in JOB_SCENE_KEYS.items():
+            if key in job: self.set_prop(prop, job[key])
+        for key, prop in JOB_OPTION_KEYS.items():
+            if key in job.get("options", {}): self.set_prop(prop, job["options"][key])
+        if "armature" in job:
+            armature = bpy.data.objects.get(job["armature"])
+            if not armature or armature.type != 'ARMATURE': raise ValueError(f"Armature '{job['armature']}' not found in {bpy.data.filepath or 'the scene'}.")
+            self.set_prop("character_armature", armature)
+        if "meshes" in job:
+            self.saved_objects = [(item.object, item.export) for item in scene.character_objects]
+            scene.character_objects.clear()
+            for name in job["meshes"]:
+                obj = bpy.data.objects.get(name)
+                if not obj or obj.type != 'MESH': raise ValueError(f"Mesh '{name}' not found.")
+                item = scene.character_objects.add(); item.object = obj
+        if "actions" in job:
+            filters = job["actions"]
+            include = filters.get("include", ["*"]); exclude = filters.get("exclude", []); flagged_only = filters.get("flagged_only", False)
+            self.saved_flags = {action.name: action.export for action in bpy.data.actions}
+            selected = []
+            for action in bpy.data.actions:
+                matches = any(fnmatch.fnmatchcase(action.name, pattern) for pattern in include) and not any(fnmatch.fnmatchcase(action.name, pattern) for pattern in exclude)
+                if matches and (action.export or not flagged_only): selected.append(action)
+            chosen = {action.name for action in selected}
+            set_actions_export(selected, True); set_actions_export([action for action in bpy.data.actions if action.name not in chosen], False)
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        scene = self.scene
+        for prop, value in self.saved_props.items():
+            try: setattr(scene, prop, value)
+            except Exception as e: print(f"Could not restore '{prop}': {e}")
+        if self.saved_objects is not None:
+            scene.character_objects.clear()
+            for obj, export in self.saved_objects:
+                item = scene.character_objects.add(); item.object = obj; item.export = export
+        if self.saved_flags is not None:
+            for value in (True, False):
+                set_actions_export([action for action in bpy.data.actions if self.saved_flags.get(action.name, action.export) == value], value)
+        return False
+
+def hand_off_job(job, scene_name, action_names):
+    """Export the actions a memory-bounded job left over in a fresh Blender process; its summary, or None if it crashed."""
+    if not bpy.data.filepath: raise RuntimeError("Handing the remaining actions to a fresh process needs a saved .blend.")
+    work_dir = tempfile.mkdtemp(prefix="batch_fbx_handoff_")
+    try:
+        child = dict(job, scene=scene_name, export_character=False, export_animations=True, actions={"include": [glob.escape(name) for name in action_names]})
+        job_file = os.path.join(work_dir, "job.json"); result_file = os.path.join(work_dir, "result.json"); log_file = os.path.join(work_dir, "handoff.log")
+        with open(job_file, 'w', encoding='utf-8') as f: json.dump(child, f)
+        with open(log_file, 'w', encoding='utf-8') as log: subprocess.run(blender_job_command(bpy.data.filepath, job_file, result_file), stdout=log, stderr=subprocess.STDOUT)
+        return read_job_summary(result_file, log_file)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def export_job(job, label):
+    """Apply a job (dict or job file path) to its scene, run the batch export and return the JSON summary."""
+    summary = {"job": label, "blend": bpy.data.filepath, "status": 'ERROR', "errors": [], "files": [], "duration": 0.0}
+    start_time = time.perf_counter()
+    try:
+        if isinstance(job, str): job = load_job_file(job)
+        scene = bpy.data.scenes.get(job["scene"]) if "scene" in job else bpy.context.scene
+        if scene is None: raise ValueError(f"Scene '{job['scene']}' not found.")
+        view_layer = bpy.context.view_layer if scene == bpy.context.scene else scene.view_layers[0]
+        global memory_handoff
+        with bpy.context.temp_override(scene=scene, view_layer=view_layer), JobOverrides(scene, job): # Background sessions have no window to switch scenes in
+            reason = unconfigured_reason(scene)
+            if not reason:
+                memory_handoff = []
+                try: outcome = bpy.ops.export.batch_fbx('EXEC_DEFAULT')
+                finally: remaining = memory_handoff; memory_handoff = None
+        if reason: summary.update(status='SKIPPED', errors=[reason]) # Nothing to export; the library report lists the file as skipped
+        else:
+            summary["files"] = [{key: record[key] for key in ("name", "kind", "file", "status", "error", "duration", "transfer", "size", "phases", "peak_rss", "rss")} for record in last_export_results]
+            summary["errors"] = [record["error"] for record in last_export_results if record["status"] == 'ERROR']
+            summary["stats"] = dict(last_export_stats)
+            if 'FINISHED' not in outcome: summary["errors"].append("Batch export was cancelled. See the log above for the reason.")
+            if remaining:
+                child = hand_off_job(job, scene.name, remaining)
+                if child is None: summary["errors"].append(f"The process exporting the last {len(remaining)} action(s) crashed. See the log above.")
+                else:
+                    summary["files"].extend(child["files"]); summary["errors"].extend(child["errors"])
+                    summary["processes"] = 1 + child.get("processes", 1)
+            summary["status"] = 'ERROR' if summary["errors"] else 'OK'
+    except Exception as e_job:
+        summary["errors"].append(f"{type(e_job).__name__}: {e_job}"); print(traceback.format_exc())
+    summary["duration"] = time.perf_counter() - start_time
+    return summary
+
+def run_job(job_file, result_file=None):
+    """Run one export job headlessly, print a JSON result and return the process exit code."""
+    summary = export_job(job_file, job_file)
+    output = json.dumps(summary, indent=1)
+    if result_file:
+        with open(result_file, 'w', encoding='utf-8') as f: f.write(output)
+    print(output)
+    return 0 if summary["status"] == 'OK' else 1
+
+
+# --- Command-Line Entry Point ---
+def main(argv):
+    """Handle `blender -b ... --python batch_export_fbx.py -- <args>` invocations."""
+    import argparse
+    parser = argparse.ArgumentParser(prog="batch_export_fbx.py")
+    parser.add_argument("--job", metavar="FILE", help="Export using the settings in a JSON/TOML job file")
+    parser.add_argument("--result", metavar="FILE", help="Also write the JSON result of --job to this file")
+    parser.add_argument("--worker", metavar="SPEC", help="Run as a parallel export worker for the given shard spec (internal)")
+    parser.add_argument("--library", metavar="DIR", help="Export every .blend below DIR with its saved settings (--job: overrides for all files)")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2), help="Concurrent Blender processes for --library")
+    parser.add_argument("--retries", type=int, default=1, help="Retries of a --library file whose process crashed")
+    parser.add_argument("--report", metavar="FILE", help=f"Consolidated --library report (default: DIR/{LIBRARY_REPORT_NAME})")
+    parser.add_argument("--index", metavar="DIR", help=f"Rebuild DIR/{ASSET_INDEX_NAME} from the FBX files in DIR and list them")
+    parser.add_argument("--find", metavar="PATTERN", help="With --index: only list files matching this name pattern")
+    args = parser.parse_args(argv)
+    if args.index:
+        return run_asset_index(args.index, args.find)
+    if args.library:
+        return run_library(args.library, args.workers, args.retries, args.report, args.job)
+    if args.worker:
+        register()
+        return run_worker(args.worker)
+    if args.job:
+        register()
+        return run_job(args.job, args.result)
+    parser.print_help()
+    return 2
+
+
 if __name__ == "__main__":
     try: unregister()
     except Exception as e: print(f"Unregistration failed silently: {e}")
+    if "--" in sys.argv:
+        sys.exit(main(sys.argv[sys.argv.index("--") + 1:]))
     register()
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+# Benchmark suite for the Batch FBX Exporter, run inside headless Blender:
+#
+#   blender -b --factory-startup --python benchmark_export.py -- --bones 150 --frames 120 --actions 3
+#
+# Builds a parameterized synthetic scene (rig with an optional control-rig overlay, skinned meshes
+# with LOD levels, unrelated clutter objects and baked actions) and times each part of the pipeline
+# separately: character export, animation export with the stock FBX operator and with the fast
+# writer (one file per action, and all actions as takes of one multi-take file), the LOD scan
+# (cold index build and warm lookup) and a full batch through the operator.
+#
+# --output writes the results as JSON. --baseline compares against such a file and fails (exit
+# code 1) when a timing is slower than the baseline by more than --threshold, so results can be
+# tracked release over release:
+#
+#   blender -b --factory-startup --python benchmark_export.py -- --output baseline.json
+#   blender -b --factory-startup --python benchmark_export.py -- --baseline baseline.json --threshold 0.15
+#
+# With --check-evaluations it also fails when a backend needs more depsgraph evaluations per
+# action than the frames it bakes plus the allowed overhead, guarding the batch session against
+# regressions that reintroduce per-file scene churn.
+
+import os
+import sys
+import json
+import time
+import math
+import argparse
+import tempfile
+
+import bpy
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import batch_export_fbx as exporter
+
+
+# --- Synthetic Scene ---
+def build_rig(bone_count, control_count=0, name="BenchRig"):
+    """Create an armature with bone_count deform bones arranged as a few branching chains.
+
+    control_count non-deform control bones are overlaid on the first deform bones, which follow
+    them through Copy Transforms constraints like a typical control rig.
+    """
+    armature_data = bpy.data.armatures.new(name)
+    rig = bpy.data.objects.new(name, armature_data)
+    bpy.context.scene.collection.objects.link(rig)
+    bpy.context.view_layer.objects.active = rig
+    bpy.ops.object.mode_set(mode='EDIT')
+    chains = max(1, bone_count // 25)
+    root = armature_data.edit_bones.new("root"); root.head = (0, 0, 0); root.tail = (0, 0, 10)
+    for index in range(1, bone_count):
+        bone = armature_data.edit_bones.new(f"bone_{index:03d}")
+        chain = index % chains
+        parent = armature_data.edit_bones[f"bone_{index - chains:03d}"] if index > chains else root
+        bone.parent = parent; bone.use_connect = False
+        bone.head = parent.tail; bone.tail = (parent.tail[0] + 2.0 * math.cos(chain), parent.tail[1] + 2.0 * math.sin(chain), parent.tail[2] + 2.0)
+    for index in range(1, min(control_count, bone_count - 1) + 1):
+        target = armature_data.edit_bones[f"bone_{index:03d}"]
+        control = armature_data.edit_bones.new(f"ctrl_{index:03d}")
+        control.head = target.head; control.tail = target.tail; control.roll = target.roll
+        control.parent = target.parent; control.use_deform = False
+    bpy.ops.object.mode_set(mode='OBJECT')
+    for index in range(1, min(control_count, bone_count - 1) + 1):
+        constraint = rig.pose.bones[f"bone_{index:03d}"].constraints.new('COPY_TRANSFORMS')
+        constraint.target = rig; constraint.subtarget = f"ctrl_{index:03d}"
+    return rig
+
+def build_action(rig, name, frame_count):
+    """Create an action with a rotation curve on every animated bone (controls instead of the deform bones they drive), keyed on every frame."""
+    action = bpy.data.actions.new(name)
+    frames = np.arange(1, frame_count + 1, dtype=np.float32)
+    driven = {pose_bone.name for pose_bone in rig.pose.bones if any(constraint.type == 'COPY_TRANSFORMS' for constraint in pose_bone.constraints)}
+    for bone_index, pose_bone in enumerate(rig.pose.bones):
+        if pose_bone.name in driven: continue
+        pose_bone.rotation_mode = 'QUATERNION'
+        angle = 0.3 * np.sin(frames / 10.0 + bone_index)
+        values = (np.cos(angle / 2), np.sin(angle / 2), np.zeros_like(angle), np.zeros_like(angle))
+        for axis, channel in enumerate(values):
+            fcurve = action.fcurves.new(f'pose.bones["{pose_bone.name}"].rotation_quaternion', index=axis, action_group=pose_bone.name)
+            fcurve.keyframe_points.add(frame_count)
+            fcurve.keyframe_points.foreach_set("co", np.column_stack((frames, channel)).astype(np.float32).ravel())
+            fcurve.update()
+    action.use_fake_user = True
+    return action
+
+def build_mesh(rig, name, vertex_count):
+    """Create a grid mesh of about vertex_count vertices, skinned to the rig's deform bones in bands."""
+    side = max(2, int(math.ceil(math.sqrt(vertex_count))))
+    xs, ys = np.meshgrid(np.linspace(-50, 50, side, dtype=np.float32), np.linspace(0, 200, side, dtype=np.float32))
+    coords = np.column_stack((xs.ravel(), np.zeros(side * side, dtype=np.float32), ys.ravel()))
+    cells = np.arange(side * side).reshape(side, side)[:-1, :-1].ravel()
+    quads = np.column_stack((cells, cells + 1, cells + side + 1, cells + side))
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(coords.tolist(), [], quads.tolist()); mesh.update()
+    obj = bpy.data.objects.new(name, mesh)
+    bpy.context.scene.collection.objects.link(obj)
+    obj.parent = rig
+    deform_bones = [bone.name for bone in rig.data.bones if bone.use_deform]
+    bands = np.array_split(np.arange(len(coords)), len(deform_bones))
+    for bone_name, band in zip(deform_bones, bands):
+        if len(band): obj.vertex_groups.new(name=bone_name).add(band.tolist(), 1.0, 'REPLACE')
+    obj.modifiers.new("Armature", 'ARMATURE').object = rig
+    return obj
+
+def build_scene(bone_count, action_count, frame_count, mesh_count=0, vertex_count=2000, lod_count=0, control_count=0, clutter_count=0):
+    """Reset to an empty scene containing one rig, its meshes, LODs, clutter and actions, configured for Unreal."""
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    scene = bpy.context.scene
+    scene.unit_settings.system = 'METRIC'; scene.unit_settings.scale_length = 0.01
+    rig = build_rig(bone_count, control_count)
+    rig.animation_data_create()
+    actions = [build_action(rig, f"Bench_{index:02d}", frame_count) for index in range(action_count)]
+    meshes = []; lods = []
+    for mesh_index in range(mesh_count):
+        meshes.append(build_mesh(rig, f"Mesh_{mesh_index:02d}", vertex_count))
+        lods.extend(build_mesh(rig, f"Mesh_{mesh_index:02d}_LOD{level}", max(4, vertex_count >> level)) for level in range(1, lod_count + 1))
+    for index in range(clutter_count):
+        clutter = bpy.data.objects.new(f"Prop_{index:04d}", None); scene.collection.objects.link(clutter)
+    exporter.register() # After the factory reset, so the scene properties exist on the new scene
+    scene.character_armature = rig
+    for mesh in meshes:
+        item = scene.character_objects.add(); item.object = mesh
+    return scene, rig, actions, meshes, lods
+
+
+# --- Timing ---
+def time_backend(context, rig, actions, backend, export_path):
+    """Export every action in one batch session and return (seconds, bytes, frame changes)."""
+    context.scene.animation_backend = backend
+    start_time = time.perf_counter(); total_bytes = 0
+    with exporter.ExportSession(context, rig), exporter.DepsgraphCounter() as counter: # Counter stops before the session restores the frame
+        for action in actions:
+            result = exporter.export_action(context, rig, action, export_path)
+            if result["status"] != 'OK': raise RuntimeError(result["error"] + "\n" + result["traceback"])
+            total_bytes += result["size"]
+    return time.perf_counter() - start_time, total_bytes, counter.frame_changes
+
+def time_takes(context, rig, actions, backend, export_path):
+    """Export every action as one take of a single multi-take file and return (seconds, bytes)."""
+    context.scene.animation_backend = backend
+    takes = [(action.name, action.name, int(action.frame_range[0]), int(action.frame_range[1])) for action in actions]
+    start_time = time.perf_counter()
+    with exporter.ExportSession(context, rig):
+        result = exporter.export_take_group(context, rig, f"BenchTakes_{backend}", takes, export_path)
+    if result["status"] != 'OK': raise RuntimeError(result["error"] + "\n" + result["traceback"])
+    return time.perf_counter() - start_time, result["size"]
+
+def time_character(context, rig, meshes, lods, export_path):
+    """Export the rig with its meshes and LODs as one character file and return (seconds, bytes)."""
+    fbx_file = os.path.join(export_path, "BenchCharacter.fbx")
+    start_time = time.perf_counter()
+    with exporter.ExportSession(context, rig):
+        exporter.select_only(context, [rig] + meshes + lods, rig)
+        exporter.export_fbx(context, fbx_file, use_selection=True, bake_anim=False)
+    return time.perf_counter() - start_time, os.path.getsize(fbx_file)
+
+def time_lod_scan(scene, rig, repeat=10):
+    """Return (cold, warm) seconds per LOD lookup: building the index from scratch vs querying a built one."""
+    start_time = time.perf_counter()
+    for _ in range(repeat): exporter.LODIndex(scene.lod_name_pattern).lod_groups(scene, rig)
+    cold = (time.perf_counter() - start_time) / repeat
+    index = exporter.LODIndex(scene.lod_name_pattern); index.lod_groups(scene, rig)
+    start_time = time.perf_counter()
+    for _ in range(repeat): index.lod_groups(scene, rig)
+    return cold, (time.perf_counter() - start_time) / repeat
+
+def time_batch(scene, export_path):
+    """Run the full batch operator (character + animations with the scene's settings) and return seconds."""
+    scene.batch_export_path = export_path; scene.export_character = True; scene.export_animations = True; scene.export_lods = True
+    start_time = time.perf_counter()
+    outcome = bpy.ops.export.batch_fbx('EXEC_DEFAULT')
+    if 'FINISHED' not in outcome or any(record["status"] == 'ERROR' for record in exporter.last_export_results): raise RuntimeError(f"Batch export failed: {exporter.last_export_results}")
+    return time.perf_counter() - start_time
+
+def evaluation_overhead(frame_changes, actions):
+    """Frame evaluations per action beyond the baked frames themselves."""
+    baked = sum(exporter.action_frame_count(action) for action in actions)
+    return (frame_changes - baked) / max(1, len(actions))
+
+def run_benchmark(context, scene, rig, actions, meshes, lods, repeat):
+    """Time every stage, keeping the fastest of repeat runs; returns (timings, sizes, frame evaluations)."""
+    timings = {}; sizes = {}; evaluations = {}
+    def keep(key, seconds): timings[key] = min(seconds, timings.get(key, seconds))
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory(prefix="batch_fbx_bench_") as export_path:
+            export_path = os.path.join(export_path, "")
+            os.environ["BATCH_FBX_CACHE_DIR"] = os.path.join(export_path, "bake_cache") # Keep the user's bake cache out of the timings
+            if meshes:
+                seconds, sizes["character"] = time_character(context, rig, meshes, lods, export_path); keep("character", seconds)
+            for key, backend in (("animation_operator", 'OPERATOR'), ("animation_fast", 'FAST')):
+                exporter.bake_cache.clear(exporter.bake_cache_dir()) # Time cold bakes
+                seconds, sizes[key], evaluations[key] = time_backend(context, rig, actions, backend, export_path); keep(key, seconds)
+            for key, backend in (("takes_operator", 'OPERATOR'), ("takes_fast", 'FAST')):
+                exporter.bake_cache.clear(exporter.bake_cache_dir())
+                seconds, sizes[key] = time_takes(context, rig, actions, backend, export_path); keep(key, seconds)
+            cold, warm = time_lod_scan(scene, rig); keep("lod_scan_cold", cold); keep("lod_scan_warm", warm)
+            scene.animation_backend = 'OPERATOR'
+            keep("batch", time_batch(scene, export_path))
+    return timings, sizes, evaluations
+
+
+# --- Baseline Comparison ---
+def compare_to_baseline(results, baseline, threshold, min_delta):
+    """Print current vs baseline per timing and return the regressions (slower by more than threshold and min_delta seconds)."""
+    if baseline.get("params") != results["params"]: print("WARNING: baseline was recorded with different scene parameters; ratios are not comparable.")
+    regressions = []
+    print(f"Compared to baseline {baseline.get('addon_version')} (Blender {baseline.get('blender')}):")
+    for key, seconds in results["timings"].items():
+        before = baseline.get("timings", {}).get(key)
+        if before is None: print(f"  {key:20s} {seconds:9.4f}s  (not in baseline)"); continue
+        ratio = seconds / max(before, 1e-9)
+        regressed = ratio > 1.0 + threshold and seconds - before > min_delta
+        print(f"  {key:20s} {seconds:9.4f}s  baseline {before:9.4f}s  {ratio:6.2f}x" + ("  REGRESSION" if regressed else ""))
+        if regressed: regressions.append(f"{key} {ratio:.2f}x slower than baseline")
+    return regressions
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="benchmark_export.py")
+    parser.add_argument("--bones", type=int, default=150)
+    parser.add_argument("--frames", type=int, default=120)
+    parser.add_argument("--actions", type=int, default=3)
+    parser.add_argument("--meshes", type=int, default=2, help="Skinned meshes on the character")
+    parser.add_argument("--vertices", type=int, default=5000, help="Vertices per mesh (LOD n has vertices / 2^n)")
+    parser.add_argument("--lods", type=int, default=2, help="LOD levels per mesh")
+    parser.add_argument("--control-bones", type=int, default=0, help="Non-deform control bones driving the first deform bones")
+    parser.add_argument("--clutter", type=int, default=500, help="Unrelated objects in the scene (what the LOD scan has to skip)")
+    parser.add_argument("--repeat", type=int, default=1, help="Run every stage this many times and keep the fastest")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against results previously written with --output")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed slowdown relative to the baseline (0.15 = 15%%)")
+    parser.add_argument("--min-delta", type=float, default=0.05, help="Ignore slowdowns smaller than this many seconds (timer noise)")
+    parser.add_argument("--check-evaluations", action="store_true", help="Fail if per-action evaluation overhead exceeds the limits below")
+    parser.add_argument("--max-operator-overhead", type=float, default=2.0, help="Allowed extra evaluations per action for the FBX operator")
+    parser.add_argument("--max-fast-overhead", type=float, default=0.0, help="Allowed extra evaluations per action for the fast writer")
+    args = parser.parse_args(argv)
+
+    params = {"bones": args.bones, "frames": args.frames, "actions": args.actions, "meshes": args.meshes, "vertices": args.vertices,
+              "lods": args.lods, "control_bones": args.control_bones, "clutter": args.clutter}
+    scene, rig, actions, meshes, lods = build_scene(args.bones, args.actions, args.frames, args.meshes, args.vertices, args.lods, args.control_bones, args.clutter)
+    timings, sizes, evaluations = run_benchmark(bpy.context, scene, rig, actions, meshes, lods, max(1, args.repeat))
+    overheads = {key: evaluation_overhead(frames, actions) for key, frames in evaluations.items()}
+    results = {"addon_version": ".".join(map(str, exporter.bl_info["version"])), "blender": bpy.app.version_string, "params": params,
+               "timings": timings, "bytes": sizes, "frame_evaluations": evaluations, "evaluation_overhead": overheads, "recorded": time.time()}
+
+    print(f"Rig: {args.bones} bones (+{args.control_bones} controls), {args.actions} actions x {args.frames} frames, {args.meshes} meshes x {args.vertices} vertices, {args.lods} LODs, {args.clutter} clutter objects")
+    for key, seconds in timings.items():
+        detail = f"  {sizes[key] / 1024:10.1f} KiB" if key in sizes else ""
+        if key in evaluations: detail += f"  {evaluations[key]:6d} frame evaluations (+{overheads[key]:.1f}/action)"
+        print(f"  {key:20s} {seconds:9.4f}s{detail}")
+    print(f"  Fast writer speedup: {timings['animation_operator'] / max(timings['animation_fast'], 1e-9):.2f}x")
+    for backend in ("operator", "fast"):
+        per_file, takes = f"animation_{backend}", f"takes_{backend}"
+        print(f"  Multi-take vs per-file ({backend}): {timings[per_file] / max(timings[takes], 1e-9):.2f}x faster, {sizes[takes] / max(sizes[per_file], 1):.2f}x the bytes")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f: json.dump(results, f, indent=1)
+        print(f"Results written to {args.output}")
+
+    failures = []
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f: baseline = json.load(f)
+        failures += compare_to_baseline(results, baseline, args.threshold, args.min_delta)
+    if args.check_evaluations:
+        if overheads["animation_operator"] > args.max_operator_overhead: failures.append(f"FBX operator overhead {overheads['animation_operator']:.1f} > {args.max_operator_overhead} evaluations per action")
+        if overheads["animation_fast"] > args.max_fast_overhead: failures.append(f"fast writer overhead {overheads['animation_fast']:.1f} > {args.max_fast_overhead} evaluations per action")
+    for failure in failures: print(f"REGRESSION: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []))
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+# Tests for the bake cache's least-recently-used eviction, run inside headless Blender:
+#
+#   blender -b --factory-startup --python tests/test_bake_cache.py
+#
+# Outside Blender (no bpy module) the tests are skipped.
+
+import os
+import sys
+import tempfile
+import unittest
+
+try: import bpy
+except ImportError: bpy = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@unittest.skipIf(bpy is None, "needs Blender: blender -b --factory-startup --python tests/test_bake_cache.py")
+class BakeCacheTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import numpy as np
+        import batch_export_fbx
+        cls.exporter = batch_export_fbx
+        cls.samples = batch_export_fbx.BakeSamples(["Root", "Spine"], np.zeros((10, 2, 3, 4), dtype=np.float32), np.zeros((10, 3, 4), dtype=np.float32))
+
+    def setUp(self):
+        self.cache = self.exporter.BakeCache()
+        self.temp = tempfile.TemporaryDirectory(prefix="batch_fbx_test_"); self.cache_dir = self.temp.name
+
+    def tearDown(self):
+        self.temp.cleanup()
+
+    def sidecars(self):
+        return sorted(name[:-len(".npz")] for name in os.listdir(self.cache_dir) if name.endswith(".npz"))
+
+    def test_memory_drops_least_recently_used(self):
+        limit = self.exporter.BAKE_CACHE_MEMORY_ENTRIES
+        for index in range(limit): self.cache.put(f"key{index}", self.samples, None, 0)
+        self.assertIs(self.cache.get("key0", None), self.samples) # Now the most recent entry
+        self.cache.put("extra", self.samples, None, 0)
+        self.assertEqual(len(self.cache.memory), limit)
+        self.assertIsNone(self.cache.get("key1", None))
+        self.assertIs(self.cache.get("key0", None), self.samples)
+
+    def test_disk_evicts_oldest_beyond_budget(self):
+        for index in range(3):
+            self.cache.put(f"key{index}", self.samples, self.cache_dir, 1 << 30)
+            os.utime(os.path.join(self.cache_dir, f"key{index}.npz"), (1000.0 + index, 1000.0 + index))
+        size = os.path.getsize(os.path.join(self.cache_dir, "key0.npz"))
+        self.cache.evict(self.cache_dir, 2 * size)
+        self.assertEqual(self.sidecars(), ["key1", "key2"])
+
+    def test_disk_read_refreshes_recency(self):
+        for index in range(3):
+            self.cache.put(f"key{index}", self.samples, self.cache_dir, 1 << 30)
+            os.utime(os.path.join(self.cache_dir, f"key{index}.npz"), (1000.0 + index, 1000.0 + index))
+        self.cache.memory.clear()
+        loaded = self.cache.get("key0", self.cache_dir)
+        self.assertEqual(loaded.bone_names, ["Root", "Spine"])
+        self.cache.evict(self.cache_dir, 2 * os.path.getsize(os.path.join(self.cache_dir, "key0.npz")))
+        self.assertEqual(self.sidecars(), ["key0", "key2"])
+
+    def test_budget_applied_on_write(self):
+        self.cache.put("key0", self.samples, self.cache_dir, 1 << 30)
+        os.utime(os.path.join(self.cache_dir, "key0.npz"), (1000.0, 1000.0))
+        self.cache.put("key1", self.samples, self.cache_dir, os.path.getsize(os.path.join(self.cache_dir, "key0.npz")))
+        self.assertEqual(self.sidecars(), ["key1"])
+
+
+if __name__ == "__main__":
+    result = unittest.main(argv=[sys.argv[0]], exit=False).result
+    sys.exit(0 if result.wasSuccessful() else 1)
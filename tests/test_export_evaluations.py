@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+# Regression test for the batch session's depsgraph evaluation budget, run inside headless Blender:
+#
+#   blender -b --factory-startup --python tests/test_export_evaluations.py
+#
+# Exports a small synthetic rig with both animation backends and fails when a backend needs more
+# frame evaluations per action than the frames it bakes plus the allowed overhead. Outside Blender
+# (no bpy module) the tests are skipped.
+
+import os
+import sys
+import tempfile
+import unittest
+
+try: import bpy
+except ImportError: bpy = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MAX_OPERATOR_OVERHEAD = 2.0 # Extra evaluations per action allowed for the FBX operator
+MAX_FAST_OVERHEAD = 0.0 # The fast writer samples exactly the baked frames
+
+@unittest.skipIf(bpy is None, "needs Blender: blender -b --factory-startup --python tests/test_export_evaluations.py")
+class ExportEvaluationTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import benchmark_export
+        cls.benchmark = benchmark_export
+        cls.scene, cls.rig, cls.actions, _, _ = benchmark_export.build_scene(bone_count=20, action_count=3, frame_count=30)
+
+    def overhead(self, backend):
+        benchmark = self.benchmark
+        with tempfile.TemporaryDirectory(prefix="batch_fbx_test_") as export_path:
+            os.environ["BATCH_FBX_CACHE_DIR"] = os.path.join(export_path, "bake_cache") # Cold bakes, away from the user's cache
+            benchmark.exporter.bake_cache.clear(benchmark.exporter.bake_cache_dir())
+            _, _, frame_changes = benchmark.time_backend(bpy.context, self.rig, self.actions, backend, os.path.join(export_path, ""))
+        return benchmark.evaluation_overhead(frame_changes, self.actions)
+
+    def test_fast_writer_overhead(self):
+        self.assertLessEqual(self.overhead('FAST'), MAX_FAST_OVERHEAD)
+
+    def test_operator_overhead(self):
+        self.assertLessEqual(self.overhead('OPERATOR'), MAX_OPERATOR_OVERHEAD)
+
+
+if __name__ == "__main__":
+    result = unittest.main(argv=[sys.argv[0]], exit=False).result
+    sys.exit(0 if result.wasSuccessful() else 1)
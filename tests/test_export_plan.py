@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+# Tests for the export plan's file name collision checks, run inside headless Blender:
+#
+#   blender -b --factory-startup --python tests/test_export_plan.py
+#
+# Outside Blender (no bpy module) the tests are skipped.
+
+import os
+import sys
+import unittest
+
+try: import bpy
+except ImportError: bpy = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@unittest.skipIf(bpy is None, "needs Blender: blender -b --factory-startup --python tests/test_export_plan.py")
+class FindCollisionsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import batch_export_fbx
+        cls.exporter = batch_export_fbx
+
+    def plan(self, character=None, actions=(), existing=()):
+        """An ExportPlan with the given jobs, without reading a scene."""
+        exporter = self.exporter
+        plan = exporter.ExportPlan.__new__(exporter.ExportPlan)
+        plan.export_path = os.path.join(os.sep, "exports"); plan.existing = set(existing); plan.jobs = []
+        if character is not None: plan.add_job('CHARACTER', character, f"{character}.fbx", 1, 10, 1)
+        for name in actions: plan.add_job('ANIMATION', name, exporter.action_file_name(name), 30, 10, 1)
+        plan.find_collisions()
+        return plan
+
+    def collisions(self, plan):
+        return {job["name"]: job["collision"] for job in plan.collisions}
+
+    def test_no_collisions(self):
+        self.assertEqual(self.collisions(self.plan("Hero", ["Walk", "Run"])), {})
+
+    def test_two_actions_one_file(self):
+        collisions = self.collisions(self.plan(actions=["Walk", "walk"])) # Case-insensitive, like SMB/NTFS shares
+        self.assertEqual(list(collisions), ["walk"])
+        self.assertIn("action 'Walk'", collisions["walk"])
+
+    def test_action_named_like_character(self):
+        collisions = self.collisions(self.plan("Hero", ["HERO", "Idle"]))
+        self.assertEqual(list(collisions), ["HERO"])
+        self.assertIn("character export 'Hero'", collisions["HERO"])
+
+    def test_invalid_file_name(self):
+        collisions = self.collisions(self.plan(actions=["Walk/Left", "Run?"]))
+        self.assertEqual(sorted(collisions), ["Run?", "Walk/Left"])
+        self.assertTrue(all("invalid" in reason for reason in collisions.values()))
+
+    def test_existing_files_flagged(self):
+        plan = self.plan("Hero", ["Walk", "Run"], existing=["Walk.fbx"])
+        self.assertEqual({job["name"]: job["exists"] for job in plan.jobs}, {"Hero": False, "Walk": True, "Run": False})
+
+
+if __name__ == "__main__":
+    result = unittest.main(argv=[sys.argv[0]], exit=False).result
+    sys.exit(0 if result.wasSuccessful() else 1)
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# Tests for the streaming FBX reader behind export verification and the asset index, run inside
+# headless Blender:
+#
+#   blender -b --factory-startup --python tests/test_fbx_reader.py
+#
+# Writes a small FBX with the add-on's own node helpers and reads it back. Outside Blender (no bpy
+# module) the tests are skipped.
+
+import os
+import sys
+import struct
+import tempfile
+import unittest
+
+try: import bpy
+except ImportError: bpy = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@unittest.skipIf(bpy is None, "needs Blender: blender -b --factory-startup --python tests/test_fbx_reader.py")
+class FBXReaderTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import numpy as np
+        import batch_export_fbx as exporter
+        cls.exporter = exporter
+        cls.temp = tempfile.TemporaryDirectory(prefix="batch_fbx_test_")
+        root = exporter.fbx_encode_bin.FBXElem(b"")
+        exporter.fbx_node(root, b"FileId", b"0123456789abcdef")
+        settings = exporter.fbx_node(root, b"GlobalSettings"); exporter.fbx_node(settings, b"Version", 1000)
+        exporter.fbx_props(settings, ("TimeMode", "enum", "", "", 6), ("CustomFrameRate", "double", "Number", "", 24.0))
+        objects = exporter.fbx_node(root, b"Objects")
+        exporter.fbx_node(objects, b"Model", np.int64(1), b"Root\x00\x01Model", b"LimbNode")
+        exporter.fbx_node(objects, b"Model", np.int64(2), b"Spine\x00\x01Model", b"LimbNode")
+        exporter.fbx_node(objects, b"Model", np.int64(3), b"Body\x00\x01Model", b"Mesh")
+        geometry = exporter.fbx_node(objects, b"Geometry", np.int64(4), b"Body\x00\x01Geometry", b"Mesh")
+        exporter.fbx_array(geometry, b"Vertices", 'f', np.arange(12, dtype=np.float32))
+        exporter.fbx_array(geometry, b"PolygonVertexIndex", 'i', [0, 1, -3, 1, 2, -4])
+        stack = exporter.fbx_node(objects, b"AnimationStack", np.int64(5), b"Walk\x00\x01AnimStack", b"")
+        exporter.fbx_props(stack, ("LocalStart", "KTime", "Time", "", 0), ("LocalStop", "KTime", "Time", "", exporter.FBX_KTIME))
+        connections = exporter.fbx_node(root, b"Connections")
+        exporter.fbx_node(connections, b"C", b"OO", np.int64(1), np.int64(0))
+        exporter.fbx_node(connections, b"C", b"OO", np.int64(4), np.int64(3))
+        cls.path = os.path.join(cls.temp.name, "Walk.fbx")
+        exporter.fbx_encode_bin.write(cls.path, root, exporter.FBX_VERSION)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp.cleanup()
+
+    def expected(self, **changes):
+        expected = {"bones": ["Root", "Spine", "Tail"], "required": ["Root", "Spine"], "frames": (0, 24), "fps": 24.0, "meshes": ["Body"]}
+        expected.update(changes)
+        return expected
+
+    def test_summary_round_trip(self):
+        summary = self.exporter.read_fbx_summary(self.path)
+        self.assertEqual(summary["version"], self.exporter.FBX_VERSION)
+        self.assertEqual(summary["fps"], 24.0)
+        self.assertEqual(summary["bones"], ["Root", "Spine"])
+        self.assertEqual(summary["meshes"], [{"name": "Body", "vertices": 4, "indices": 6}])
+        self.assertEqual(summary["takes"], [{"name": "Walk", "start": 0.0, "stop": 1.0}])
+
+    def test_array_payloads_not_decoded(self):
+        # Mark the Vertices array as compressed and fill its payload with bytes zlib can't inflate
+        with open(self.path, 'rb') as f: data = bytearray(f.read())
+        code = data.index(b"Vertices") + len(b"Vertices")
+        length, encoding, size = struct.unpack_from("<III", data, code + 1)
+        struct.pack_into("<I", data, code + 5, 1); data[code + 13:code + 13 + size] = b"\xff" * size
+        corrupt = os.path.join(self.temp.name, "corrupt_payload.fbx")
+        with open(corrupt, 'wb') as f: f.write(data)
+        self.assertEqual(self.exporter.read_fbx_summary(corrupt)["meshes"], [{"name": "Body", "vertices": 4, "indices": 6}])
+
+    def test_verify_matching_file(self):
+        self.assertEqual(self.exporter.verify_fbx(self.path, self.expected()), [])
+
+    def test_verify_reports_differences(self):
+        problems = self.exporter.verify_fbx(self.path, self.expected(bones=["Root"], required=["Root", "Spine", "Tail"], frames=(0, 30), meshes=["Body", "Head"]))
+        self.assertEqual(len(problems), 4)
+        self.assertIn("1 bone(s) missing: Tail", problems[0])
+        self.assertIn("1 unknown bone(s): Spine", problems[1])
+        self.assertIn("expected 0-30", problems[2])
+        self.assertIn("1 mesh(es) missing: Head", problems[3])
+
+    def test_verify_unreadable_file(self):
+        not_fbx = os.path.join(self.temp.name, "not_fbx.fbx")
+        with open(not_fbx, 'w', encoding='utf-8') as f: f.write("; FBX 7.4.0 project file\n")
+        self.assertIn("unreadable FBX", self.exporter.verify_fbx(not_fbx, self.expected())[0])
+
+
+if __name__ == "__main__":
+    result = unittest.main(argv=[sys.argv[0]], exit=False).result
+    sys.exit(0 if result.wasSuccessful() else 1)
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# Tests for the fast writer's error-bounded key reduction, run inside headless Blender:
+#
+#   blender -b --factory-startup --python tests/test_key_reduction.py
+#
+# Outside Blender (no bpy module) the tests are skipped.
+
+import os
+import sys
+import unittest
+
+try: import bpy
+except ImportError: bpy = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def interpolate(values, keep):
+    """Rebuild every channel by linear interpolation between its kept keys."""
+    import numpy as np
+    frames = np.arange(values.shape[1])
+    return np.array([np.interp(frames, frames[mask], row[mask]) for row, mask in zip(values, keep)])
+
+@unittest.skipIf(bpy is None, "needs Blender: blender -b --factory-startup --python tests/test_key_reduction.py")
+class ReduceKeysTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import numpy as np
+        import batch_export_fbx
+        cls.np = np
+        cls.exporter = batch_export_fbx
+        frames = np.arange(120, dtype=np.float64)
+        cls.values = np.stack([np.sin(frames * 0.1) * 10.0, np.cos(frames * 0.05) * 3.0 + frames * 0.02, np.where(frames < 60, 0.0, 5.0)])
+
+    def test_error_within_tolerance(self):
+        for tolerance in (0.001, 0.01, 0.5):
+            keep, max_error = self.exporter.reduce_keys(self.values, tolerance)
+            error = self.np.abs(interpolate(self.values, keep) - self.values).max(axis=1)
+            self.assertTrue((error <= tolerance + 1e-9).all(), (tolerance, error))
+            self.assertTrue((max_error <= tolerance + 1e-9).all())
+            self.assertLess(keep.sum(), keep.size)
+
+    def test_per_channel_tolerance(self):
+        keep, _ = self.exporter.reduce_keys(self.values[:2], [0.001, 1.0])
+        self.assertGreater(keep[0].sum(), keep[1].sum())
+
+    def test_endpoints_kept(self):
+        keep, _ = self.exporter.reduce_keys(self.values, 0.5)
+        self.assertTrue(keep[:, 0].all() and keep[:, -1].all())
+
+    def test_linear_channel_keeps_two_keys(self):
+        keep, max_error = self.exporter.reduce_keys(self.np.linspace(0.0, 7.0, 50)[None, :], 1e-6)
+        self.assertEqual(keep[0].nonzero()[0].tolist(), [0, 49])
+        self.assertLess(max_error[0], 1e-9)
+
+    def test_constant_channel_collapses(self):
+        np = self.np
+        values = np.stack([np.full(40, 2.5), 2.5 + np.sin(np.arange(40.0)) * 1e-5])
+        keep, max_error = self.exporter.reduce_keys(values, 1e-4)
+        self.assertEqual(keep.sum(axis=1).tolist(), [1, 1])
+        self.assertTrue(keep[:, 0].all())
+        self.assertAlmostEqual(max_error[0], 0.0)
+        self.assertLessEqual(max_error[1], 1e-4)
+
+    def test_curve_channels_scale_translation_tolerance(self):
+        np = self.np
+        frames = np.arange(60, dtype=np.float64)
+        wave = np.stack([np.sin(frames * 0.2) * 0.01] * 3, axis=1) # (frames, 3), in metres for non-root models
+        flat = np.zeros((60, 3))
+        curve_channels = [(1, (wave * 100.0, flat, flat + 1.0)), (2, (wave, flat, flat + 1.0))] # Root 1 is already in cm
+        keep_masks, report = self.exporter.reduce_curve_channels(curve_channels, 1, (0.05, 0.1, 0.001), 100.0)
+        np.testing.assert_array_equal(keep_masks[(1, "T")], keep_masks[(2, "T")])
+        self.assertEqual(keep_masks[(2, "R")].sum(), 3) # One key per constant channel
+        self.assertEqual(report["keys_before"], 2 * 3 * 3 * 60)
+        self.assertLessEqual(report["max_error"]["translation"], 0.05 + 1e-9)
+
+
+if __name__ == "__main__":
+    result = unittest.main(argv=[sys.argv[0]], exit=False).result
+    sys.exit(0 if result.wasSuccessful() else 1)
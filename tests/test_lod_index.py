@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# Tests for LOD name patterns and the per-scene LOD index, run inside headless Blender:
+#
+#   blender -b --factory-startup --python tests/test_lod_index.py
+#
+# Outside Blender (no bpy module) the tests are skipped.
+
+import os
+import sys
+import types
+import unittest
+
+try: import bpy
+except ImportError: bpy = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class FakeObjects(dict):
+    """Name -> object mapping that iterates over objects, like scene.objects."""
+    def __iter__(self): return iter(list(self.values()))
+
+def fake_object(name, obj_type='MESH', armature=None):
+    modifiers = [types.SimpleNamespace(type='ARMATURE', object=armature)] if armature else []
+    return types.SimpleNamespace(name=name, type=obj_type, modifiers=modifiers, as_pointer=lambda: id(name))
+
+@unittest.skipIf(bpy is None, "needs Blender: blender -b --factory-startup --python tests/test_lod_index.py")
+class LODPatternTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import batch_export_fbx
+        cls.exporter = batch_export_fbx
+
+    def test_default_pattern(self):
+        index = self.exporter.LODIndex("")
+        self.assertEqual(index.classify("Body_LOD1"), ("Body", 1))
+        self.assertEqual(index.classify("Body_LOD12"), ("Body", 12))
+        self.assertEqual(index.classify("Body"), ("Body", 0))
+        self.assertEqual(index.classify("Body_LOD0"), ("Body_LOD0", 0)) # LOD0 is the base mesh itself
+
+    def test_invalid_patterns_fall_back_to_default(self):
+        patterns = self.exporter.compile_lod_patterns("(?P<base>.+; .+_lod\\d+")
+        self.assertEqual([pattern.pattern for pattern in patterns], [self.exporter.DEFAULT_LOD_PATTERN])
+
+    def test_first_matching_pattern_wins(self):
+        index = self.exporter.LODIndex(r"^(?P<base>.+)\.lod(?P<level>\d+)$; ^(?P<base>.+?)_(?P<level>\d)$")
+        self.assertEqual(len(index.patterns), 2)
+        self.assertEqual(index.classify("Head.lod2"), ("Head", 2))
+        self.assertEqual(index.classify("Head_3"), ("Head", 3))
+        self.assertEqual(index.classify("Head_LOD1"), ("Head_LOD1", 0))
+
+    def test_groups_by_base_sorted_by_level(self):
+        rig = fake_object("Rig", 'ARMATURE'); other = fake_object("OtherRig", 'ARMATURE')
+        meshes = [fake_object("Body_LOD2", armature=rig), fake_object("Body", armature=rig), fake_object("Body_LOD1", armature=rig),
+                  fake_object("Prop", armature=other), fake_object("Loose")]
+        scene = types.SimpleNamespace(objects=FakeObjects((obj.name, obj) for obj in [rig, other] + meshes))
+        index = self.exporter.LODIndex("")
+        groups = index.lod_groups(scene, rig)
+        self.assertEqual({base: [(level, obj.name) for level, obj in levels] for base, levels in groups.items()},
+                         {"Body": [(0, "Body"), (1, "Body_LOD1"), (2, "Body_LOD2")]})
+        del scene.objects["Body_LOD2"]
+        self.assertEqual([obj.name for _, obj in index.lod_groups(scene, rig)["Body"]], ["Body", "Body_LOD1"])
+
+
+if __name__ == "__main__":
+    result = unittest.main(argv=[sys.argv[0]], exit=False).result
+    sys.exit(0 if result.wasSuccessful() else 1)
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# Tests for marker-defined clips of long takes, run inside headless Blender:
+#
+#   blender -b --factory-startup --python tests/test_marker_clips.py
+#
+# Outside Blender (no bpy module) the tests are skipped.
+
+import os
+import sys
+import types
+import unittest
+
+try: import bpy
+except ImportError: bpy = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def fake_action(markers, name="Take"):
+    pose_markers = [types.SimpleNamespace(name=marker, frame=frame) for marker, frame in markers]
+    return types.SimpleNamespace(name=name, pose_markers=pose_markers, frame_range=(1.0, 400.0))
+
+def fake_scene(source='ACTION', timeline=(), name_format="{clip}"):
+    timeline_markers = [types.SimpleNamespace(name=marker, frame=frame) for marker, frame in timeline]
+    return types.SimpleNamespace(clip_marker_source=source, timeline_markers=timeline_markers, split_clips_by_markers=True, clip_name_format=name_format)
+
+@unittest.skipIf(bpy is None, "needs Blender: blender -b --factory-startup --python tests/test_marker_clips.py")
+class MarkerClipsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import batch_export_fbx
+        cls.exporter = batch_export_fbx
+
+    def test_clips_ordered_by_start(self):
+        action = fake_action([("clip_start:Run", 50), ("clip_end:Run", 90), ("clip_start: Walk ", 1), ("clip_end:Walk", 40), ("Footstep", 12)])
+        clips, problems = self.exporter.marker_clips(fake_scene(), action)
+        self.assertEqual(clips, [("Walk", 1, 40), ("Run", 50, 90)])
+        self.assertEqual(problems, [])
+
+    def test_duplicate_markers_use_first(self):
+        action = fake_action([("clip_start:Walk", 1), ("clip_start:Walk", 10), ("clip_end:Walk", 40), ("clip_end:Walk", 45)])
+        clips, problems = self.exporter.marker_clips(fake_scene(), action)
+        self.assertEqual(clips, [("Walk", 1, 40)])
+        self.assertEqual(len(problems), 2)
+        self.assertIn("several clip_start markers", problems[0])
+        self.assertIn("several clip_end markers", problems[1])
+
+    def test_overlapping_clips_both_exported(self):
+        action = fake_action([("clip_start:Idle", 1), ("clip_end:Idle", 60), ("clip_start:IdleToWalk", 40), ("clip_end:IdleToWalk", 80)])
+        clips, problems = self.exporter.marker_clips(fake_scene(), action)
+        self.assertEqual(clips, [("Idle", 1, 60), ("IdleToWalk", 40, 80)])
+        self.assertEqual(problems, [])
+
+    def test_unpaired_and_reversed_markers_reported(self):
+        action = fake_action([("clip_start:Open", 1), ("clip_end:Back", 20), ("clip_start:Back", 30), ("clip_end:Lone", 5)])
+        clips, problems = self.exporter.marker_clips(fake_scene(), action)
+        self.assertEqual(clips, [])
+        self.assertEqual(len(problems), 3)
+        self.assertTrue(any("'Open' has no clip_end" in problem for problem in problems))
+        self.assertTrue(any("'Back' ends before it starts" in problem for problem in problems))
+        self.assertTrue(any("'Lone' has no clip_start" in problem for problem in problems))
+
+    def test_timeline_markers(self):
+        scene = fake_scene('TIMELINE', [("clip_start:Jump", 5), ("clip_end:Jump", 25)])
+        clips, _ = self.exporter.marker_clips(scene, fake_action([("clip_start:Ignored", 1), ("clip_end:Ignored", 2)]))
+        self.assertEqual(clips, [("Jump", 5, 25)])
+
+    def test_targets_use_name_format(self):
+        scene = fake_scene(name_format="{action}_{clip}")
+        targets = self.exporter.action_targets(scene, fake_action([("clip_start:Walk", 1), ("clip_end:Walk", 40)]))
+        self.assertEqual([(name, file_name, start, end) for name, file_name, start, end, is_clip in targets], [("Take_Walk", "Take_Walk.fbx", 1, 40)])
+
+    def test_no_clips_exports_whole_action(self):
+        targets = self.exporter.action_targets(fake_scene(), fake_action([]))
+        self.assertEqual(targets, [("Take", "Take.fbx", 1, 400, False)])
+
+
+if __name__ == "__main__":
+    result = unittest.main(argv=[sys.argv[0]], exit=False).result
+    sys.exit(0 if result.wasSuccessful() else 1)
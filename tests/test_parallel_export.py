@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+# Tests for the parallel action export, run inside headless Blender:
+#
+#   blender -b --factory-startup --python tests/test_parallel_export.py
+#
+# Checks how actions are split across workers and that the worker pool writes the same FBX content
+# as the serial export. Outside Blender (no bpy module) the tests are skipped.
+
+import os
+import sys
+import types
+import struct
+import zlib
+import tempfile
+import unittest
+
+try: import bpy
+except ImportError: bpy = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Top-level nodes that differ between any two exports of the same data: the creation time and the
+# metadata (source .blend path, export date). Workers export from a snapshot, so these never match.
+VOLATILE_NODES = {"FBXHeaderExtension", "FileId", "CreationTime"}
+SCALAR_FORMATS = {"Y": "<h", "C": "<?", "I": "<i", "F": "<f", "D": "<d", "L": "<q"}
+
+def read_nodes(data, offset, end):
+    """Parse binary FBX node records (7.4 layout) into (name, properties, children) tuples."""
+    nodes = []
+    while offset < end:
+        node_end, prop_count, _, name_length = struct.unpack_from("<IIIB", data, offset)
+        if node_end == 0: break # Null record closing a node list
+        offset += 13
+        name = data[offset:offset + name_length].decode(); offset += name_length
+        props = []
+        for _ in range(prop_count):
+            kind = chr(data[offset]); offset += 1
+            if kind in SCALAR_FORMATS:
+                fmt = SCALAR_FORMATS[kind]; props.append(struct.unpack_from(fmt, data, offset)[0]); offset += struct.calcsize(fmt)
+            elif kind in "SR":
+                size, = struct.unpack_from("<I", data, offset); props.append(data[offset + 4:offset + 4 + size]); offset += 4 + size
+            else: # Array: length, encoding, byte size, then raw or zlib data
+                _, encoding, size = struct.unpack_from("<III", data, offset); raw = data[offset + 12:offset + 12 + size]
+                props.append(zlib.decompress(raw) if encoding else raw); offset += 12 + size
+        nodes.append((name, props, read_nodes(data, offset, node_end)))
+        offset = node_end
+    return nodes
+
+def fbx_content(filepath):
+    """Return the comparable content of a binary FBX file: volatile nodes dropped, object IDs renumbered."""
+    with open(filepath, 'rb') as f: data = f.read()
+    version, = struct.unpack_from("<I", data, 23)
+    assert version < 7500, f"Unsupported FBX version {version}" # 7.5 uses 64-bit record offsets
+    nodes = [node for node in read_nodes(data, 27, len(data)) if node[0] not in VOLATILE_NODES]
+    # The exporter derives object IDs from Python's per-process string hash, so they are renumbered
+    # in order of appearance before comparing.
+    ids = {}
+    for name, _, children in nodes:
+        if name in ("Objects", "Documents"):
+            for _, props, _ in children:
+                if props and isinstance(props[0], int): ids.setdefault(props[0], len(ids))
+    def renumber(node):
+        name, props, children = node
+        return (name, [ids.get(prop, prop) if isinstance(prop, int) and not isinstance(prop, bool) else prop for prop in props], [renumber(child) for child in children])
+    return [renumber(node) for node in nodes]
+
+
+@unittest.skipIf(bpy is None, "needs Blender: blender -b --factory-startup --python tests/test_parallel_export.py")
+class ShardActionsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import batch_export_fbx
+        cls.exporter = batch_export_fbx
+        clip = lambda name, end: types.SimpleNamespace(name=name, frame_range=(1.0, float(end)))
+        cls.actions = [clip("walk", 30), clip("run", 20), clip("idle", 120), clip("jump", 40), clip("turn", 10)]
+
+    def test_balances_by_frame_count(self):
+        self.assertEqual(self.exporter.shard_actions(self.actions, 3), [["idle"], ["jump", "turn"], ["walk", "run"]])
+
+    def test_every_action_once(self):
+        for worker_count in (1, 2, 4):
+            shards = self.exporter.shard_actions(self.actions, worker_count)
+            self.assertEqual(sorted(name for shard in shards for name in shard), sorted(action.name for action in self.actions))
+
+    def test_no_empty_shards(self):
+        self.assertEqual(len(self.exporter.shard_actions(self.actions, 8)), len(self.actions))
+
+    def test_zero_workers_means_one_shard(self):
+        self.assertEqual(len(self.exporter.shard_actions(self.actions, 0)), 1)
+
+
+@unittest.skipIf(bpy is None, "needs Blender: blender -b --factory-startup --python tests/test_parallel_export.py")
+class ShardPartsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import batch_export_fbx
+        cls.exporter = batch_export_fbx
+        cls.parts = [{"name": name, "cost": cost} for name, cost in (("Body", 900), ("Head", 500), ("Hair", 400), ("Boots", 300), ("Socket", 0))]
+
+    def names(self, shards):
+        return [[part["name"] for part in shard] for shard in shards]
+
+    def test_balances_by_vertex_count(self):
+        self.assertEqual(self.names(self.exporter.shard_parts(self.parts, 2)), [["Body", "Boots"], ["Head", "Hair", "Socket"]])
+
+    def test_empty_parts_still_count(self):
+        shards = self.exporter.shard_parts([{"name": "A", "cost": 0}, {"name": "B", "cost": 0}], 2)
+        self.assertEqual(self.names(shards), [["A"], ["B"]])
+
+    def test_no_empty_shards(self):
+        self.assertEqual(len(self.exporter.shard_parts(self.parts, 8)), len(self.parts))
+        self.assertEqual(self.names(self.exporter.shard_parts(self.parts, 0)), [["Body", "Head", "Hair", "Boots", "Socket"]])
+
+
+@unittest.skipIf(bpy is None, "needs Blender: blender -b --factory-startup --python tests/test_parallel_export.py")
+class ParallelExportTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import batch_export_fbx
+        cls.exporter = batch_export_fbx
+        bpy.ops.wm.read_factory_settings(use_empty=True)
+        batch_export_fbx.register()
+        scene = bpy.context.scene
+        rig = bpy.data.objects.new("TestRig", bpy.data.armatures.new("TestRig"))
+        scene.collection.objects.link(rig); bpy.context.view_layer.objects.active = rig
+        bpy.ops.object.mode_set(mode='EDIT')
+        parent = None
+        for index in range(4):
+            bone = rig.data.edit_bones.new(f"Bone{index}"); bone.head = (0.0, 0.0, index); bone.tail = (0.0, 0.0, index + 1.0); bone.parent = parent; parent = bone
+        bpy.ops.object.mode_set(mode='OBJECT')
+        rig.animation_data_create()
+        cls.actions = []
+        for clip in range(3):
+            action = bpy.data.actions.new(f"Clip{clip}"); action.use_fake_user = True; rig.animation_data.action = action
+            for frame in range(1, 10 * (clip + 1) + 1, 3):
+                for index, bone in enumerate(rig.pose.bones):
+                    bone.rotation_quaternion = (1.0, 0.05 * frame, 0.02 * index * clip, 0.0); bone.keyframe_insert("rotation_quaternion", frame=frame)
+            cls.actions.append(action)
+        cls.rig = rig
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.exporter.unregister()
+
+    def test_parallel_matches_serial(self):
+        exporter = self.exporter
+        with tempfile.TemporaryDirectory(prefix="batch_fbx_test_") as root:
+            serial_path = os.path.join(root, "serial"); parallel_path = os.path.join(root, "parallel")
+            os.makedirs(serial_path); os.makedirs(parallel_path)
+            serial = [exporter.export_action(bpy.context, self.rig, action, serial_path) for action in self.actions]
+            parallel = exporter.run_parallel_action_export(bpy.context, self.rig, self.actions, parallel_path, 2)
+            self.assertEqual([record["status"] for record in serial], ['OK'] * len(self.actions))
+            self.assertEqual(sorted(record["name"] for record in parallel if record["status"] == 'OK'), sorted(action.name for action in self.actions))
+            for action in self.actions:
+                file_name = f"{action.name}.fbx"
+                self.assertEqual(fbx_content(os.path.join(parallel_path, file_name)), fbx_content(os.path.join(serial_path, file_name)), file_name)
+
+
+if __name__ == "__main__":
+    result = unittest.main(argv=[sys.argv[0]], exit=False).result
+    sys.exit(0 if result.wasSuccessful() else 1)
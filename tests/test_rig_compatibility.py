@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# Tests for the cached action-to-rig bone compatibility index, run inside headless Blender:
+#
+#   blender -b --factory-startup --python tests/test_rig_compatibility.py
+#
+# Outside Blender (no bpy module) the tests are skipped.
+
+import os
+import sys
+import types
+import unittest
+
+try: import bpy
+except ImportError: bpy = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def fake_action(*data_paths):
+    fcurves = [types.SimpleNamespace(data_path=path) for path in data_paths]
+    return types.SimpleNamespace(fcurves=fcurves, as_pointer=lambda: id(fcurves))
+
+def fake_armature(*bone_names):
+    bones = [types.SimpleNamespace(name=name) for name in bone_names]
+    data = types.SimpleNamespace(bones=bones, as_pointer=lambda: id(bones))
+    return types.SimpleNamespace(data=data)
+
+def fake_scene(policy='SKIP', threshold=80.0):
+    return types.SimpleNamespace(rig_mismatch_policy=policy, rig_match_threshold=threshold)
+
+@unittest.skipIf(bpy is None, "needs Blender: blender -b --factory-startup --python tests/test_rig_compatibility.py")
+class RigCompatibilityTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import batch_export_fbx
+        cls.exporter = batch_export_fbx
+
+    def setUp(self):
+        self.index = self.exporter.RigCompatibility()
+        self.rig = fake_armature("root", "spine", "head", 'arm "L"')
+
+    def test_match_percentage(self):
+        action = fake_action('pose.bones["root"].location', 'pose.bones["root"].rotation_quaternion', 'pose.bones["spine"].rotation_quaternion',
+                             'pose.bones["tail"].location', 'pose.bones["wing"].location')
+        self.assertAlmostEqual(self.index.match(action, self.rig), 50.0)
+
+    def test_escaped_bone_names(self):
+        action = fake_action('pose.bones["arm \\"L\\""].rotation_euler')
+        self.assertEqual(self.index.action_bones(action), frozenset(['arm "L"']))
+        self.assertEqual(self.index.match(action, self.rig), 100.0)
+
+    def test_action_without_bones(self):
+        action = fake_action('location', 'rotation_euler')
+        self.assertIsNone(self.index.match(action, self.rig))
+        self.assertEqual(self.exporter.rig_mismatch(fake_scene(), action, self.rig), (None, False))
+
+    def test_cache_refreshed_on_edit(self):
+        action = fake_action('pose.bones["tail"].location')
+        self.assertEqual(self.index.match(action, self.rig), 0.0)
+        action.fcurves.append(types.SimpleNamespace(data_path='pose.bones["head"].location'))
+        self.assertEqual(self.index.match(action, self.rig), 50.0)
+        self.rig.data.bones.append(types.SimpleNamespace(name="tail"))
+        self.assertEqual(self.index.match(action, self.rig), 100.0)
+
+    def test_forget(self):
+        action = fake_action('pose.bones["root"].location')
+        self.index.match(action, self.rig)
+        self.index.forget(action); self.index.forget(self.rig.data)
+        self.assertEqual((self.index.actions, self.index.rigs), ({}, {}))
+
+    def test_mismatch_policy(self):
+        action = fake_action('pose.bones["root"].location', 'pose.bones["tail"].location')
+        self.assertEqual(self.exporter.rig_mismatch(fake_scene(), action, self.rig), (50.0, True))
+        self.assertEqual(self.exporter.rig_mismatch(fake_scene(threshold=50.0), action, self.rig), (50.0, False))
+        self.assertEqual(self.exporter.rig_mismatch(fake_scene('OFF'), action, self.rig), (None, False))
+
+
+if __name__ == "__main__":
+    result = unittest.main(argv=[sys.argv[0]], exit=False).result
+    sys.exit(0 if result.wasSuccessful() else 1)
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# Tests for grouping actions into multi-take files, run inside headless Blender:
+#
+#   blender -b --factory-startup --python tests/test_take_groups.py
+#
+# Outside Blender (no bpy module) the tests are skipped.
+
+import os
+import sys
+import types
+import unittest
+
+try: import bpy
+except ImportError: bpy = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def fake_action(name, start=1.0, end=30.0):
+    return types.SimpleNamespace(name=name, frame_range=(start, end))
+
+def fake_scene(grouping='PREFIX', separator="_", character="Hero"):
+    return types.SimpleNamespace(take_grouping=grouping, take_group_separator=separator, character_name=character)
+
+def fake_strip(name, action, mute=False):
+    return types.SimpleNamespace(name=name, action=action, mute=mute)
+
+@unittest.skipIf(bpy is None, "needs Blender: blender -b --factory-startup --python tests/test_take_groups.py")
+class TakeGroupTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import batch_export_fbx
+        cls.exporter = batch_export_fbx
+
+    def test_group_name_up_to_first_separator(self):
+        scene = fake_scene()
+        self.assertEqual(self.exporter.take_group_name(scene, "Hero_Walk_Fast"), "Hero")
+        self.assertEqual(self.exporter.take_group_name(scene, "Idle"), "Idle")
+
+    def test_group_name_custom_and_empty_separator(self):
+        self.assertEqual(self.exporter.take_group_name(fake_scene(separator="."), "Hero.Walk_Fast"), "Hero")
+        self.assertEqual(self.exporter.take_group_name(fake_scene(separator=""), "Hero_Walk"), "Hero_Walk")
+
+    def test_prefix_groups_keep_action_order(self):
+        actions = [fake_action("Hero_Walk", 1, 30), fake_action("Enemy_Run", 5, 25), fake_action("Hero_Jump", 1, 12)]
+        groups = self.exporter.take_groups(fake_scene(), None, actions)
+        self.assertEqual({name: [(take, start, end) for take, action, start, end in takes] for name, takes in groups.items()},
+                         {"Hero": [("Hero_Walk", 1, 30), ("Hero_Jump", 1, 12)], "Enemy": [("Enemy_Run", 5, 25)]})
+
+    def test_nla_groups_unmuted_strips(self):
+        walk = fake_action("Walk", 1, 30); run = fake_action("Run", 1, 20)
+        tracks = [types.SimpleNamespace(mute=False, strips=[fake_strip("Walk", walk), fake_strip("Muted", run, mute=True), fake_strip("Empty", None)]),
+                  types.SimpleNamespace(mute=True, strips=[fake_strip("Run", run)])]
+        armature = types.SimpleNamespace(animation_data=types.SimpleNamespace(nla_tracks=tracks))
+        groups = self.exporter.take_groups(fake_scene('NLA'), armature, [])
+        self.assertEqual(groups, {"Hero_Anims": [("Walk", walk, 1, 30)]})
+        self.assertEqual(self.exporter.take_groups(fake_scene('NLA'), types.SimpleNamespace(animation_data=None), []), {})
+
+
+if __name__ == "__main__":
+    result = unittest.main(argv=[sys.argv[0]], exit=False).result
+    sys.exit(0 if result.wasSuccessful() else 1)
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+# Tests for the content-addressed texture store, run inside headless Blender:
+#
+#   blender -b --factory-startup --python tests/test_texture_store.py
+#
+# Outside Blender (no bpy module) the tests are skipped.
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+try: import bpy
+except ImportError: bpy = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@unittest.skipIf(bpy is None, "needs Blender: blender -b --factory-startup --python tests/test_texture_store.py")
+class TextureStoreTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import batch_export_fbx
+        cls.exporter = batch_export_fbx
+
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory(prefix="batch_fbx_test_")
+        self.root = os.path.join(self.temp.name, "Textures")
+
+    def tearDown(self):
+        self.temp.cleanup()
+
+    def image(self, name, data):
+        path = os.path.join(self.temp.name, name)
+        with open(path, 'wb') as f: f.write(data)
+        return path
+
+    def test_identical_content_stored_once(self):
+        store = self.exporter.TextureStore(self.root)
+        first = store.add(self.image("skin.png", b"pixels" * 100)); second = store.add(self.image("Skin_copy.PNG", b"pixels" * 100))
+        self.assertEqual(first, second)
+        self.assertTrue(first.endswith(".png"))
+        self.assertEqual(os.listdir(self.root), [os.path.basename(first)])
+        self.assertEqual((store.stats["images"], store.stats["copied"] + store.stats["cloned"], store.stats["reused"]), (2, 1, 1))
+
+    def test_different_content_stored_apart(self):
+        store = self.exporter.TextureStore(self.root)
+        self.assertNotEqual(store.add(self.image("a.png", b"a" * 64)), store.add(self.image("b.png", b"b" * 64)))
+        self.assertEqual(store.stats["reused"], 0)
+
+    def test_unchanged_file_not_hashed_again(self):
+        source = self.image("skin.png", b"pixels" * 100)
+        store = self.exporter.TextureStore(self.root); stored = store.add(source); store.save()
+        store = self.exporter.TextureStore(self.root) # A later batch, reading the saved index
+        with mock.patch.object(self.exporter, "file_sha256", side_effect=AssertionError("hashed again")):
+            self.assertEqual(store.add(source), stored)
+        self.assertEqual(store.stats["reused"], 1)
+
+    def test_changed_file_hashed_again(self):
+        source = self.image("skin.png", b"pixels" * 100)
+        store = self.exporter.TextureStore(self.root); stored = store.add(source)
+        with open(source, 'ab') as f: f.write(b"more")
+        changed = store.add(source)
+        self.assertNotEqual(changed, stored)
+        with open(changed, 'rb') as f: self.assertTrue(f.read().endswith(b"more"))
+
+    def test_put_skips_existing_target(self):
+        store = self.exporter.TextureStore(self.root)
+        def write(partial):
+            with open(partial, 'wb') as f: f.write(b"data")
+            return False
+        target = store.put("abc.png", 4, write)
+        self.assertEqual(store.put("abc.png", 4, lambda partial: self.fail("rewrote a stored file")), target)
+        self.assertFalse(os.path.exists(target + ".partial"))
+        self.assertEqual((store.stats["copied"], store.stats["bytes_copied"], store.stats["reused"]), (1, 4, 1))
+
+
+if __name__ == "__main__":
+    result = unittest.main(argv=[sys.argv[0]], exit=False).result
+    sys.exit(0 if result.wasSuccessful() else 1)